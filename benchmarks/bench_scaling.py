@@ -0,0 +1,216 @@
+'''
+Scaling benchmark of the simulation, run from the repo root:
+
+    python -m benchmarks.bench_scaling                    # compare with benchmarks/baseline.json
+    python -m benchmarks.bench_scaling --save-baseline    # store the results as the new baseline
+
+Every case runs one of the traffic generators through a Building, and measures the simulated ticks per second,
+the scheduler decisions (passengers assigned to an elevator) per second and the peak memory.
+The cases sweep the elevator count, floor count and passenger volume one at a time around a default building.
+
+Run times depend on the machine, so the baseline doesn't store them: the throughput of a case is stored relative to a
+calibration workload, a fixed pure-Python loop that doesn't use any of the simulation code, which is timed in turns with the
+case. TicksPerCalibration is the number of ticks the simulation runs in the time the calibration loop takes (likewise
+DecisionsPerCalibration), so a slowdown of the simulation shows up in every case, including the default building.
+A case is reported as a regression when such a throughput drops (or its memory grows) by more than the tolerance.
+The simulated ticks and decisions of the seeded traffic don't depend on the machine or the timing at all, so any change
+in them is reported as a change of the behaviour of the simulation.
+'''
+from building import Building
+from common.enums import Engine
+from src.traffic import TRAFFIC_GENERATORS
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+DEFAULT_BUILDING = dict(elevators=8, floors=50, passengers=1000)
+SWEEP = dict(
+    elevators=[2, 8, 32],
+    floors=[20, 50, 200],
+    passengers=[250, 1000, 4000],
+)
+MAX_PASSENGERS_PER_ELEVATOR = 10
+SEED = 0
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# iterations of the calibration loop, about as long as a run of the default building
+CALIBRATION_ITERATIONS = 250000
+
+# throughput relative to the calibration loop, higher is better
+THROUGHPUT_METRICS = ['TicksPerCalibration', 'DecisionsPerCalibration']
+# metrics that are better when lower
+MEMORY_METRICS = ['PeakMemoryMB']
+# simulated counts of the seeded traffic, which have to match the baseline exactly
+COUNT_METRICS = ['Ticks', 'Decisions']
+# what is stored in the baseline, none of it depends on the machine
+BASELINE_METRICS = COUNT_METRICS + THROUGHPUT_METRICS + MEMORY_METRICS
+
+
+def get_cases(patterns: List[str]) -> List[Dict]:
+    cases = []
+    for pattern in patterns:
+        for parameter, values in SWEEP.items():
+            for value in values:
+                case = dict(DEFAULT_BUILDING, pattern=pattern)
+                case[parameter] = value
+                if case not in cases:
+                    cases.append(case)
+
+    return cases
+
+
+def case_name(case: Dict) -> str:
+    return '{0}_e{1}_f{2}_p{3}'.format(case['pattern'], case['elevators'], case['floors'], case['passengers'])
+
+
+def make_building(case: Dict, engine: Engine) -> Building:
+    requests = TRAFFIC_GENERATORS[case['pattern']](SEED, case['floors'], no_of_passengers=case['passengers'])
+    return Building(no_of_elevators=case['elevators'], no_of_floors=case['floors'], max_passengers_per_elevator=MAX_PASSENGERS_PER_ELEVATOR,
+                    request_list=requests, engine=engine, write_outputs=False)
+
+
+def time_call(function) -> float:
+    # cpu time of a call. the cpu time of the process is disturbed less than the wall time by the rest of the machine.
+    # like timeit, the garbage collector is kept from running at different points of different runs
+    gc.collect()
+    gc.disable()
+    try:
+        start_time = time.process_time()
+        function()
+        return time.process_time() - start_time
+    finally:
+        gc.enable()
+
+
+def calibration_loop(iterations: int = CALIBRATION_ITERATIONS) -> int:
+    '''
+    a fixed mix of the operations the simulation spends its time on (dict and list lookups, bisection, comparisons and
+    integer arithmetic), without any of the simulation code, so its speed only depends on the machine and the interpreter.
+    '''
+    floors = list(range(0, 200, 2))
+    counts = dict()
+    total = 0
+    for i in range(iterations):
+        floor = i * 7919 % 199
+        counts[floor] = counts.get(floor, 0) + 1
+        j = bisect_left(floors, floor)
+        if j < len(floors) and floors[j] == floor:
+            total += counts[floor]
+        else:
+            total -= 1
+
+    return total
+
+
+def time_run(case: Dict, engine: Engine) -> Tuple[int, int, float]:
+    # simulated ticks, scheduler decisions (passengers handed to the scheduler) and cpu time of a run of the case
+    building = make_building(case, engine)
+    decisions = [0]
+    schedule_elevator = building.scheduler.schedule_elevator
+
+    def counting_schedule_elevator(passengers):
+        decisions[0] += len(passengers)
+        return schedule_elevator(passengers)
+
+    # wrapping the method on this instance only
+    building.scheduler.schedule_elevator = counting_schedule_elevator
+
+    run_time = time_call(building.schedule)
+    return building.run_timer, decisions[0], run_time
+
+
+def run_case(case: Dict, engine: Engine, repeat: int = 1) -> Dict:
+    # the calibration loop is timed right before every run of the case, so each pair is measured under the same
+    # conditions. the median over the pairs of the throughput relative to the calibration loop leaves out the pairs in
+    # which only one of the two was disturbed
+    runs, calibration_times = [], []
+    for _ in range(repeat):
+        calibration_times.append(time_call(calibration_loop))
+        runs.append(time_run(case, engine))
+
+    ticks, decisions, _ = runs[0]
+    run_time = min(run[2] for run in runs)
+    runs_per_calibration = [calibration_time / run[2] for run, calibration_time in zip(runs, calibration_times)]
+
+    # tracemalloc slows the simulation down, so the memory is measured in a separate run
+    tracemalloc.start()
+    make_building(case, engine).schedule()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(Case=case_name(case), Ticks=ticks, Decisions=decisions, RunTime=round(run_time, 4),
+                TicksPerSecond=round(ticks / run_time, 1), DecisionsPerSecond=round(decisions / run_time, 1),
+                TicksPerCalibration=round(ticks * statistics.median(runs_per_calibration), 1),
+                DecisionsPerCalibration=round(decisions * statistics.median(runs_per_calibration), 1),
+                PeakMemoryMB=round(peak_memory / 2 ** 20, 3))
+
+
+def find_regressions(results: List[Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    regressions = []
+    for result in results:
+        expected = baseline.get(result['Case'])
+        if expected is None:
+            continue
+
+        for metric in COUNT_METRICS:
+            if result[metric] != expected[metric]:
+                regressions.append('{0}: {1} {2} != baseline {3}, the simulation behaves differently'.format(
+                    result['Case'], metric, result[metric], expected[metric]))
+        for metric in THROUGHPUT_METRICS:
+            if result[metric] < expected[metric] * (1 - tolerance):
+                regressions.append('{0}: {1} {2} < baseline {3}'.format(result['Case'], metric, result[metric], expected[metric]))
+        for metric in MEMORY_METRICS:
+            if result[metric] > expected[metric] * (1 + tolerance):
+                regressions.append('{0}: {1} {2} > baseline {3}'.format(result['Case'], metric, result[metric], expected[metric]))
+
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Scaling benchmark of the elevator simulation.')
+    parser.add_argument('--patterns', nargs='+', default=sorted(TRAFFIC_GENERATORS), choices=sorted(TRAFFIC_GENERATORS))
+    parser.add_argument('--engine', default=Engine.TICK.name, choices=[engine.name for engine in Engine])
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--repeat', type=int, default=7, help='times every case is run, with the median throughput and the fastest run time reported')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative change before a case is a regression')
+    args = parser.parse_args(argv)
+
+    results = []
+    for case in get_cases(args.patterns):
+        result = run_case(case, Engine[args.engine], args.repeat)
+        results.append(result)
+        print('{Case:<28} ticks={Ticks:<7} ticks/s={TicksPerSecond:<10} decisions/s={DecisionsPerSecond:<9} peak={PeakMemoryMB}MB'.format(**result))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(dict((result['Case'], dict((metric, result[metric]) for metric in BASELINE_METRICS)) for result in results),
+                      f, indent=2, sort_keys=True)
+        print('Saved baseline to {}'.format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}, run with --save-baseline first'.format(args.baseline))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION {}'.format(regression))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
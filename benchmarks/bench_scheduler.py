@@ -0,0 +1,107 @@
+'''
+Cost of a scheduler call by elevator count, run from the repo root:
+
+    python -m benchmarks.bench_scheduler            # print the table
+    python -m benchmarks.bench_scheduler --check    # also exit with 1 if the VectorizedScheduler doesn't scale better
+
+Every case runs a building with moving elevators for a few ticks, then schedules a burst of calls from random floors,
+once as a single batch (like the calls of a tick) and once one call at a time (like the re-schedules of full elevators
+in Dispatcher.dispatch). The cost per call is reported for the Scheduler, the VectorizedScheduler (which falls back to
+the Scheduler below MIN_VECTORIZED_ELEVATORS), and the VectorizedScheduler vectorizing every call.
+'''
+from building import Building
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+from src.traffic import interfloor
+from src.vectorized_scheduler import VectorizedScheduler
+
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List, Type
+
+ELEVATORS = [16, 128, 512]
+NO_OF_FLOORS = 100
+MAX_PASSENGERS_PER_ELEVATOR = 10
+CALLS = 2000
+WARM_UP_TICKS = 60
+SEED = 0
+
+
+class AlwaysVectorizedScheduler(VectorizedScheduler):
+    MIN_VECTORIZED_ELEVATORS = 0
+
+
+SCHEDULERS = [Scheduler, VectorizedScheduler, AlwaysVectorizedScheduler]
+
+
+def make_building(no_of_elevators: int, scheduler_cls: Type[Scheduler]) -> Building:
+    # a building whose elevators are spread over the floors and moving, after WARM_UP_TICKS of interfloor traffic
+    requests = interfloor(SEED, NO_OF_FLOORS, no_of_passengers=2 * no_of_elevators, duration=WARM_UP_TICKS // 2)
+    building = Building(no_of_elevators=no_of_elevators, no_of_floors=NO_OF_FLOORS, max_passengers_per_elevator=MAX_PASSENGERS_PER_ELEVATOR,
+                        request_list=requests, scheduler_cls=scheduler_cls, write_outputs=False)
+    for _ in range(WARM_UP_TICKS):
+        building.step()
+
+    return building
+
+
+def make_calls(run_timer: int) -> List[Passenger]:
+    rnd = random.Random(SEED)
+    return [Passenger('call_{}'.format(i), *rnd.sample(range(1, NO_OF_FLOORS + 1), 2), run_timer) for i in range(CALLS)]
+
+
+def time_calls(no_of_elevators: int, scheduler_cls: Type[Scheduler], batch: bool) -> float:
+    # wall time per call in microseconds
+    building = make_building(no_of_elevators, scheduler_cls)
+    calls = make_calls(building.run_timer)
+    start_time = time.perf_counter()
+    if batch:
+        building.scheduler.schedule_elevator(calls)
+    else:
+        for passenger in calls:
+            building.scheduler.schedule_elevator([passenger])
+
+    return (time.perf_counter() - start_time) / CALLS * 1e6
+
+
+def run_cases() -> List[Dict]:
+    rows = []
+    for no_of_elevators in ELEVATORS:
+        for scheduler_cls in SCHEDULERS:
+            rows.append(dict(Elevators=no_of_elevators, Scheduler=scheduler_cls.__name__,
+                             BatchCallMicros=time_calls(no_of_elevators, scheduler_cls, batch=True),
+                             SingleCallMicros=time_calls(no_of_elevators, scheduler_cls, batch=False)))
+
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Cost of a scheduler call by elevator count.')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 unless the VectorizedScheduler is faster than the Scheduler with the most elevators')
+    args = parser.parse_args()
+
+    rows = run_cases()
+    print('{0:>10}  {1:<28}{2:>18}{3:>18}'.format('Elevators', 'Scheduler', 'Batch (us/call)', 'Single (us/call)'))
+    for row in rows:
+        print('{Elevators:>10}  {Scheduler:<28}{BatchCallMicros:>18.1f}{SingleCallMicros:>18.1f}'.format(**row))
+
+    # growth of the cost per call from the fewest to the most elevators
+    for scheduler_cls in SCHEDULERS:
+        costs = [row['BatchCallMicros'] for row in rows if row['Scheduler'] == scheduler_cls.__name__]
+        print('{0:<28} x{1:.1f} per call from {2} to {3} elevators'.format(scheduler_cls.__name__, costs[-1] / costs[0], ELEVATORS[0], ELEVATORS[-1]))
+
+    if args.check:
+        largest = dict((row['Scheduler'], row) for row in rows if row['Elevators'] == ELEVATORS[-1])
+        for mode in ['BatchCallMicros', 'SingleCallMicros']:
+            if largest['VectorizedScheduler'][mode] >= largest['Scheduler'][mode]:
+                print('FAIL: the VectorizedScheduler is not faster than the Scheduler with {0} elevators ({1})'.format(ELEVATORS[-1], mode))
+                return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
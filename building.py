@@ -2,111 +2,308 @@ from src.scheduler import Scheduler
 from src.elevator import Elevator
 from src.passenger import Passenger
 from src.dispatcher import Dispatcher
-from common.enums import Status
+from src.event_log import EventLog
+from src.passenger_store import PassengerStore
+from src.profiler import Profiler
+from src.recorder import ElevatorStateRecorder
+from src.stats import PassengerStats
+from src.trace import TraceWriter, MAX_FLOOR
+from src.request_stream import RequestStream
+from common.enums import Status, Engine
 
 import datetime
-import pandas as pd
-from typing import List, Dict
+import os
+import pickle
+import zlib
+from typing import TYPE_CHECKING, Iterable, Dict, List, Tuple, Type, Union
+
+if TYPE_CHECKING:
+    # pandas is only imported when the outputs are written, so it doesn't slow down the start of a run
+    import pandas as pd
 
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+SNAPSHOT_VERSION = 3
+
 
 class Building:
 
-    def __init__(self, no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int, request_list: List[Dict]) -> None:
-        self.dispatcher = Dispatcher(no_of_floors=no_of_floors)
-        self.scheduler = Scheduler(dispatcher=self.dispatcher)
+    def __init__(self, no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int, request_list: Union[Iterable[Dict], RequestStream],
+                 engine: Engine = Engine.TICK, scheduler_cls: Type[Scheduler] = Scheduler,
+                 output_dir: str = './outputs', run_name: str = None, write_outputs: bool = True, profiler: Profiler = None,
+                 stats_window: int = 3600, trace_path: str = None, event_log: EventLog = None) -> None:
+        # wait and total time percentiles over the run, per elevator and per stats_window ticks
+        self.passenger_stats = PassengerStats(window_size=stats_window)
+        self.dispatcher = Dispatcher(no_of_floors=no_of_floors, passenger_stats=self.passenger_stats)
+        self.scheduler = scheduler_cls(dispatcher=self.dispatcher)
 
         self.no_of_elevators = no_of_elevators
         self.max_elevator_passengers = max_passengers_per_elevator
         self.run_timer = 0
         self.total_floors = no_of_floors
+        self.engine = engine
+
+        # output files are named <type>_<run_name>.csv, where the run name defaults to the time they are written at
+        self.output_dir = output_dir
+        self.run_name = run_name
+        self.write_outputs = write_outputs
+        self.debug_logging = self.is_debug_logging()
 
-        self.request_list = request_list
-        self.request_element = 0
+        # requests can be any iterable of request dicts (e.g. read_csv_requests / read_jsonl_requests),
+        # they are streamed in the order of their arrival time
+        self.requests = request_list if isinstance(request_list, RequestStream) else RequestStream(request_list)
 
-        self.passengers = []
+        # passengers only stay alive while they are queued or on board, their timings are logged in the store
+        self.passengers = PassengerStore()
 
-        self.elevator_states = pd.DataFrame()
         self.__create_elevators()
 
+        # with a trace path the elevator states are streamed to a binary trace (see TraceReader) instead of kept in memory
+        self.trace_path = trace_path
+        elevator_names = [elevator.name for elevator in self.dispatcher.elevators]
+        if self.trace_path:
+            if no_of_floors > MAX_FLOOR:
+                raise ValueError('Traces can hold up to {0} floors, got {1}'.format(MAX_FLOOR, no_of_floors))
+            self.elevator_states = TraceWriter(self.trace_path, elevator_names=elevator_names)
+        else:
+            self.elevator_states = ElevatorStateRecorder(elevator_names=elevator_names)
+
+        # times the phases of the simulation loop, see Profiler
+        self.profiler = profiler
+        if self.profiler:
+            self.profiler.attach(self)
+
+        # logs the assignments, pick-ups, drop-offs and direction changes of the run, see EventLog
+        self.event_log = event_log
+        if self.event_log:
+            self.event_log.attach(self)
+
     def __create_elevators(self) -> None:
         for i in range(self.no_of_elevators):
             self.dispatcher.add_elevator(Elevator(name=str(i+1), total_floors=self.total_floors, status=Status.IDLE, no_of_persons=self.max_elevator_passengers))
 
-        self.elevator_states = self.elevator_states.reindex(columns=['RunTimer'] + ['Elevator {}'.format(i+1) for i in range(self.no_of_elevators)])
-
     def get_next_scheduled_requests(self):
-        i = self.request_element
+        return self.requests.pop_requests(self.run_timer)
 
-        while i < len(self.request_list) and self.request_list[i]['time'] == self.run_timer:
-            i += 1
-
-        timer_request = [] if i == self.request_element else self.request_list[self.request_element: i]
-        self.request_element = i
-        return timer_request
+    def next_request_time(self):
+        return self.requests.next_request_time()
 
     def are_all_requests_completed(self):
-        return self.request_element >= len(self.request_list)
+        return self.requests.is_empty()
 
     def record_elevator_state(self):
-        state = dict(RunTimer=self.run_timer)
+        self.elevator_states.record(self.run_timer, [elevator.at_floor() for elevator in self.dispatcher.elevators])
+
+    def discard_history(self, run_timer: int):
+        '''
+        drops the elevator states recorded before the run timer, and the passengers that completed their trip before it
+        (see PassengerStore.discard_completed_before), to bound the memory of a building that runs indefinitely.
+        the passenger stats keep covering all passengers. a trace is on disk already, so it is left as is.
+        '''
+        if not self.trace_path:
+            self.elevator_states.discard_before(run_timer)
+        self.passengers.discard_completed_before(run_timer)
+
+    def record_elevator_state_span(self, ticks: int):
+        # records the state of the elevators for the next ticks, in which the elevators only move
+        floors = [elevator.at_floor() for elevator in self.dispatcher.elevators]
+        steps = [0 if elevator.is_idle() else elevator.floor_after(1) - elevator.at_floor() for elevator in self.dispatcher.elevators]
+        self.elevator_states.record_span(self.run_timer, floors, steps, ticks)
+
+    def ticks_to_next_event(self) -> int:
+        '''
+        number of upcoming ticks in which no request arrives and no elevator reaches a floor where it has to
+        drop-off or pick-up passengers or change its direction, i.e. the elevators only move.
+        '''
+        ticks = []
+        if not self.are_all_requests_completed():
+            ticks.append(self.next_request_time() - self.run_timer)
+
         for elevator in self.dispatcher.elevators:
-            state['Elevator {}'.format(elevator.name)] = elevator.at_floor()
-        self.elevator_states = self.elevator_states.append(state, ignore_index = True)
+            if not elevator.is_idle():
+                floors = self.dispatcher.floors_to_next_stop(elevator)
+                # the elevator is moved at the start of a tick, so it reaches the stop on the tick it moves the last floor
+                ticks.append(0 if floors is None else floors - 1)
+
+        return max(0, min(ticks)) if ticks else 0
+
+    def skip_to_next_event(self, max_ticks: int = None):
+        ticks = self.ticks_to_next_event()
+        if max_ticks is not None:
+            ticks = min(ticks, max_ticks)
+        if ticks:
+            self.record_elevator_state_span(ticks)
+            self.dispatcher.move_elevators(ticks)
+            self.run_timer += ticks
+
+    def snapshot(self) -> bytes:
+        '''
+        compressed pickle of the state of the simulation: the run timer, the read position and heap of the requests,
+        the elevators with their passengers and queues, and the passenger logs and stats (see Building.restore).
+        the scheduler isn't included, so a snapshot can be restored with a different scheduler.
+        with a trace path, the elevator states recorded so far stay in the trace and aren't included either.
+        '''
+        # the profiler and the event log wrap methods of the dispatcher, which can't be pickled, so they are detached meanwhile
+        hooks = [hook for hook in (self.profiler, self.event_log) if hook]
+        for hook in reversed(hooks):
+            hook.detach()
+        try:
+            return self.__snapshot()
+        finally:
+            for hook in hooks:
+                hook.attach(self)
+
+    def __snapshot(self) -> bytes:
+        state = dict(version=SNAPSHOT_VERSION, no_of_elevators=self.no_of_elevators, no_of_floors=self.total_floors,
+                     max_passengers_per_elevator=self.max_elevator_passengers, engine=self.engine, scheduler_cls=type(self.scheduler),
+                     run_timer=self.run_timer, requests=self.requests, dispatcher=self.dispatcher, passengers=self.passengers,
+                     elevator_states=None if self.trace_path else self.elevator_states)
+        return zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def restore(cls, snapshot: bytes, request_list: Iterable[Dict], scheduler_cls: Type[Scheduler] = None, **building_kwargs) -> 'Building':
+        '''
+        creates a building from a snapshot, which continues the run from the tick it was taken at.
+        every restore gets its own copy of the state, so many runs can be branched off the same snapshot.
+
+        request_list: the requests the snapshotted building was created with, in the same order. the requests it had
+                      already read are skipped.
+        scheduler_cls: defaults to the scheduler of the snapshotted building.
+        building_kwargs: any other Building arguments, e.g. output_dir, run_name, profiler, event_log or trace_path.
+        '''
+        state = pickle.loads(zlib.decompress(snapshot))
+        if state['version'] != SNAPSHOT_VERSION:
+            raise ValueError('Unsupported snapshot version {}'.format(state['version']))
+
+        # the profiler wraps the dispatcher and scheduler, so it can only be attached once they are restored
+        profiler = building_kwargs.pop('profiler', None)
+        event_log = building_kwargs.pop('event_log', None)
+        building_kwargs.setdefault('engine', state['engine'])
+        building = cls(no_of_elevators=state['no_of_elevators'], no_of_floors=state['no_of_floors'],
+                       max_passengers_per_elevator=state['max_passengers_per_elevator'], request_list=[],
+                       scheduler_cls=scheduler_cls or state['scheduler_cls'], **building_kwargs)
+
+        building.run_timer = state['run_timer']
+        building.requests = state['requests']
+        building.requests.resume(request_list)
+        building.dispatcher = state['dispatcher']
+        building.passenger_stats = building.dispatcher.passenger_stats
+        building.scheduler = type(building.scheduler)(dispatcher=building.dispatcher)
+        building.passengers = state['passengers']
+        if state['elevator_states'] is not None and not building.trace_path:
+            building.elevator_states = state['elevator_states']
+
+        building.profiler = profiler
+        if building.profiler:
+            building.profiler.attach(building)
+        building.event_log = event_log
+        if building.event_log:
+            building.event_log.attach(building)
+
+        return building
+
+    def get_output_path(self, file_type: str, extension: str = 'csv') -> str:
+        run_name = self.run_name or datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_dir, '{0}_{1}.{2}'.format(file_type, run_name, extension))
+
+    def passenger_states(self) -> 'pd.DataFrame':
+        return self.passengers.to_dataframe()
 
     def print_passenger_stats(self):
-        passenger_state = pd.DataFrame(dict(
-            Name=pd.Series(dtype='str'),
-            StartTime=pd.Series(dtype='int'),
-            PickUpTime=pd.Series(dtype='int'),
-            EndTime=pd.Series(dtype='int'),
-            WaitTime=pd.Series(dtype='int'),
-            TotalTime=pd.Series(dtype='int'),
-            TripCompleted=pd.Series(dtype='bool')))
-
-        passenger_data_rows = []
-        for passenger in self.passengers:
-            passenger_data_rows.append(dict(
-                Name=passenger.id, StartTime=passenger.start_time, PickUpTime=passenger.pick_up_time,
-                EndTime=passenger.end_time, WaitTime=passenger.total_wait_time(), TotalTime=passenger.total_wait_time(),
-                TripCompleted=passenger.is_trip_complete
-            ))
-
-        passenger_state = passenger_state.append(passenger_data_rows, ignore_index=True)
-
-        logger.debug('--------------- PASSENGER STATS: MIN ---------------')
-        logger.debug(passenger_state[['PickUpTime', 'WaitTime', 'TotalTime']].min())
-        logger.debug('--------------- PASSENGER STATS: MAX ---------------')
-        logger.debug(passenger_state[['PickUpTime', 'WaitTime', 'TotalTime']].max())
-        logger.debug('--------------- PASSENGER STATS: MEAN --------------')
-        logger.debug(passenger_state[['PickUpTime', 'WaitTime', 'TotalTime']].mean())
-        passenger_state.to_csv('./outputs/passenger_states_{}.csv'.format(datetime.datetime.now().strftime('%Y%m%d_%H%M%S')), index=False)
+        import pandas as pd
+
+        stats = self.passengers.stats()
+        for stat in ['min', 'max', 'mean']:
+            logger.debug('--------------- PASSENGER STATS: {:<4} ---------------'.format(stat.upper()))
+            for column, column_stats in stats.items():
+                logger.debug('{0:<12}{1}'.format(column, column_stats[stat] if column_stats else 'N/A'))
+
+        summary = self.passenger_stats.summary()
+        logger.debug('--------------- PASSENGER STATS: PERCENTILES ---------------')
+        for row in summary:
+            if row['Scope'] == 'All':
+                logger.debug('{Metric:<12}P50: {P50}  P95: {P95}  P99: {P99}'.format(**row))
+
+        self.passenger_states().to_csv(self.get_output_path('passenger_states'), index=False)
+        pd.DataFrame(summary).to_csv(self.get_output_path('passenger_stats'), index=False)
 
     def write_stats(self):
-        self.elevator_states.to_csv('./outputs/elevator_states_{}.csv'.format(datetime.datetime.now().strftime('%Y%m%d_%H%M%S')), index=False)
+        if not self.trace_path:
+            self.elevator_states.to_dataframe().to_csv(self.get_output_path('elevator_states'), index=False)
 
-    def schedule(self):
-        while True:
-            self.dispatcher.move_elevators()
+    def write_profile(self):
+        report = self.profiler.report()
+        logger.info('--------------- PROFILE ---------------\n{}'.format(report))
+        with open(self.get_output_path('profile', extension='txt'), 'w') as f:
+            f.write(report + '\n')
+
+    def is_debug_logging(self) -> bool:
+        # the debug messages are only formatted when they go somewhere
+        return logger.isEnabledFor(logging.DEBUG) and logger.hasHandlers()
+
+    def step(self) -> Tuple[List[Passenger], List[Passenger]]:
+        '''
+        runs a single tick: moves the elevators, schedules the requests that arrived, and drops off and picks up passengers.
+        returns the passengers of the requests that arrived, and the passengers that were dropped off.
+        '''
+        self.dispatcher.move_elevators()
 
-            req_list = self.get_next_scheduled_requests()
-            if req_list:
-                passengers = [Passenger(req['id'], req['source'], req['dest'], self.run_timer) for req in req_list]
-                self.passengers.extend(passengers)
-                self.scheduler.schedule_elevator(passengers)
+        passengers = []
+        req_list = self.get_next_scheduled_requests()
+        if req_list:
+            passengers = [Passenger(req['id'], req['source'], req['dest'], req['time']) for req in req_list]
+            self.passengers.add(passengers)
+            self.scheduler.schedule_elevator(passengers)
 
-            self.dispatcher.dispatch(run_timer=self.run_timer, scheduler=self.scheduler)
+        dropped_passengers = self.dispatcher.dispatch(run_timer=self.run_timer, scheduler=self.scheduler)
+        self.passengers.complete(dropped_passengers)
 
+        if self.debug_logging:
             logger.debug('---------- TIMER: {0} ----------------'.format(self.run_timer))
             logger.debug(self.scheduler)
-            self.record_elevator_state()
+        self.record_elevator_state()
+        if self.debug_logging:
             logger.debug('--------------------------------------')
-            self.run_timer += 1
+        self.run_timer += 1
+
+        return passengers, dropped_passengers
+
+    def schedule(self, until: int = None) -> bool:
+        '''
+        runs the simulation till all requests are completed, and returns True.
+        until: pauses the run when the run timer reaches it and returns False, e.g. to take a snapshot.
+               calling schedule again continues the run.
+        '''
+        self.debug_logging = self.is_debug_logging()
+        if self.profiler:
+            self.profiler.start()
+
+        while True:
+            self.step()
 
             if self.dispatcher.are_all_elevators_idle() and self.are_all_requests_completed():
-                self.print_passenger_stats()
-                self.write_stats()
-                return
\ No newline at end of file
+                if self.profiler:
+                    self.profiler.stop()
+                if self.trace_path:
+                    self.elevator_states.close()
+                if self.write_outputs:
+                    self.print_passenger_stats()
+                    self.write_stats()
+                    if self.profiler:
+                        self.write_profile()
+                    if self.event_log:
+                        self.event_log.write_csv(self.get_output_path('event_log'))
+                return True
+
+            if self.engine == Engine.EVENT:
+                # jump straight to the next tick in which something other than elevator movement happens
+                self.skip_to_next_event(None if until is None else until - self.run_timer)
+
+            if until is not None and self.run_timer >= until:
+                if self.profiler:
+                    self.profiler.stop()
+                if self.trace_path:
+                    self.elevator_states.flush()
+                return False
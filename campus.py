@@ -0,0 +1,214 @@
+from building import Building
+from src.scheduler import Scheduler
+from common.enums import Engine
+
+from collections import deque
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple, Type
+
+if TYPE_CHECKING:
+    # pandas is only imported when the trips table is made, so importing the campus doesn't pay for it
+    import pandas as pd
+
+import logging
+logger = logging.getLogger(__name__)
+
+# a campus run that doesn't drop off every leg within this many ticks is taken to loop forever
+MAX_TICKS = 1000000
+
+
+class Bank:
+
+    def __init__(self, name: str, no_of_elevators: int, served_floors: Iterable[int], max_passengers_per_elevator: int = 10,
+                 scheduler_cls: Type[Scheduler] = Scheduler) -> None:
+        '''
+        A group of elevators that serve the same floors, e.g. a low-rise bank serving the lobby and floors 2-20,
+        or a high-rise bank serving the lobby, the sky lobby at 40 and floors 41-60.
+        Each bank is simulated by its own Building, with its own Dispatcher and Scheduler.
+        '''
+        self.name = name
+        self.no_of_elevators = no_of_elevators
+        self.served_floors = frozenset(served_floors)
+        self.max_passengers_per_elevator = max_passengers_per_elevator
+        self.scheduler_cls = scheduler_cls
+
+    def serves(self, floor: int) -> bool:
+        return floor in self.served_floors
+
+
+def run_bank(connection: Connection, bank: Bank, requests: List[Dict], building_kwargs: Dict):
+    '''
+    Simulates a bank in a worker process, one time window at a time.
+
+    Every message from the campus is (until, new requests): the requests are added to the building, which is run till
+    the run timer reaches until, and the (id, pick-up time, drop-off time) of the passengers dropped off in the window
+    are sent back. A message of None ends the worker.
+    '''
+    building = Building(no_of_elevators=bank.no_of_elevators, no_of_floors=max(bank.served_floors),
+                        max_passengers_per_elevator=bank.max_passengers_per_elevator, request_list=sorted(requests, key=lambda req: req['time']),
+                        scheduler_cls=bank.scheduler_cls, write_outputs=False, **building_kwargs)
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+
+        until, new_requests = message
+        for request in new_requests:
+            building.requests.push(request)
+
+        dropped_off = []
+        while building.run_timer < until:
+            _, dropped_passengers = building.step()
+            dropped_off.extend((passenger.id, passenger.pick_up_time, passenger.end_time) for passenger in dropped_passengers)
+            if building.engine == Engine.EVENT:
+                building.skip_to_next_event(until - building.run_timer)
+
+        connection.send(dropped_off)
+
+    connection.close()
+
+
+class Campus:
+
+    def __init__(self, banks: List[Bank], transfer_time: int = 5, **building_kwargs) -> None:
+        '''
+        Elevator banks serving disjoint floor ranges, connected at the floors they share (lobbies and sky lobbies).
+
+        A call is routed to a bank that serves both its floors, otherwise it is split into legs over the fewest banks,
+        changing banks at a shared floor. A leg starts transfer_time ticks (walking to the next bank) after the
+        previous leg was dropped off.
+
+        Every bank runs in its own process. The banks are run in lockstep, transfer_time ticks at a time: a passenger
+        dropped off in a window can only call the next bank after the window, so the banks don't depend on each other
+        within a window, and the legs of the next window are sent to the banks between the windows.
+        building_kwargs: passed on to the Building of every bank, e.g. engine.
+        '''
+        if transfer_time < 1:
+            raise ValueError('The transfer time has to be at least one tick')
+
+        self.banks = dict((bank.name, bank) for bank in banks)
+        self.transfer_time = transfer_time
+        self.building_kwargs = building_kwargs
+
+    def __transfer_floors(self, from_bank: Bank, to_bank: Bank) -> List[int]:
+        return sorted(from_bank.served_floors & to_bank.served_floors)
+
+    def route(self, source: int, dest: int) -> List[Tuple[str, int, int]]:
+        '''
+        legs (bank name, from floor, to floor) of a trip, using the fewest banks.
+        the transfer floor between two banks is the shared floor closest to the destination.
+        raises ValueError if no bank serves one of the floors, or the banks serving them aren't connected.
+        '''
+        if source == dest:
+            raise ValueError('Trip from floor {0} to the same floor'.format(source))
+
+        for bank in self.banks.values():
+            if bank.serves(source) and bank.serves(dest):
+                return [(bank.name, source, dest)]
+
+        # breadth first search over the banks, from the banks serving the source floor
+        previous = dict((bank.name, None) for bank in self.banks.values() if bank.serves(source))
+        queue = deque(previous)
+        while queue:
+            bank = self.banks[queue.popleft()]
+            if bank.serves(dest):
+                path = [bank.name]
+                while previous[path[-1]] is not None:
+                    path.append(previous[path[-1]])
+                return self.__legs(path[::-1], source, dest)
+
+            for other_bank in self.banks.values():
+                if other_bank.name not in previous and self.__transfer_floors(bank, other_bank):
+                    previous[other_bank.name] = bank.name
+                    queue.append(other_bank.name)
+
+        raise ValueError('No route from floor {0} to floor {1}'.format(source, dest))
+
+    def __legs(self, path: List[str], source: int, dest: int) -> List[Tuple[str, int, int]]:
+        legs = []
+        from_floor = source
+        for bank_name, next_bank_name in zip(path, path[1:]):
+            transfer_floors = self.__transfer_floors(self.banks[bank_name], self.banks[next_bank_name])
+            to_floor = min(transfer_floors, key=lambda floor: abs(floor - dest))
+            legs.append((bank_name, from_floor, to_floor))
+            from_floor = to_floor
+
+        legs.append((path[-1], from_floor, dest))
+        # transferring at the floor a trip started at (or ends at) is not a leg
+        return [leg for leg in legs if leg[1] != leg[2]]
+
+    def run(self, requests: Iterable[Dict], max_ticks: int = MAX_TICKS) -> 'pd.DataFrame':
+        '''
+        simulates the requests (dicts of time, id, source and dest) across the banks, and returns a table with one
+        row per trip: its legs, the time it was picked up on its first leg and dropped off on its last leg.
+        raises TimeoutError if the banks haven't dropped off every leg after max_ticks, e.g. because the elevators of a
+        bank never finish, after terminating the workers of the banks.
+        '''
+        import pandas as pd
+
+        trips = dict((request['id'], dict(request, legs=self.route(request['source'], request['dest']))) for request in requests)
+
+        # the first legs are known up front, the next legs are sent to their bank when the previous leg is dropped off
+        first_legs = dict((bank_name, []) for bank_name in self.banks)
+        for trip in trips.values():
+            bank_name, from_floor, to_floor = trip['legs'][0]
+            first_legs[bank_name].append(dict(time=trip['time'], id='{0}#0'.format(trip['id']), source=from_floor, dest=to_floor))
+
+        connections = dict()
+        workers = []
+        for bank_name, bank in self.banks.items():
+            connections[bank_name], worker_connection = Pipe()
+            workers.append(Process(target=run_bank, args=(worker_connection, bank, first_legs[bank_name], self.building_kwargs), daemon=True))
+            workers[-1].start()
+
+        leg_times = dict()
+        next_legs = dict((bank_name, []) for bank_name in self.banks)
+        remaining_legs = sum(len(trip['legs']) for trip in trips.values())
+        until = 0
+        finished = False
+        try:
+            while remaining_legs:
+                if until >= max_ticks:
+                    raise TimeoutError('{0} legs were not dropped off within {1} ticks'.format(remaining_legs, max_ticks))
+
+                until += self.transfer_time
+                for bank_name, connection in connections.items():
+                    connection.send((until, next_legs[bank_name]))
+                    next_legs[bank_name] = []
+
+                for connection in connections.values():
+                    for leg_id, pick_up_time, end_time in connection.recv():
+                        leg_times[leg_id] = (pick_up_time, end_time)
+                        remaining_legs -= 1
+
+                        trip_id, leg = leg_id.rsplit('#', 1)
+                        legs = trips[trip_id]['legs']
+                        if int(leg) + 1 < len(legs):
+                            bank_name, from_floor, to_floor = legs[int(leg) + 1]
+                            next_legs[bank_name].append(dict(time=end_time + self.transfer_time, id='{0}#{1}'.format(trip_id, int(leg) + 1),
+                                                             source=from_floor, dest=to_floor))
+            finished = True
+        finally:
+            if finished:
+                for connection in connections.values():
+                    connection.send(None)
+            else:
+                # a bank didn't finish or a worker failed, the other workers may still be in the middle of a window
+                for worker in workers:
+                    worker.terminate()
+            for worker in workers:
+                worker.join()
+
+        rows = []
+        for trip in trips.values():
+            leg_ids = ['{0}#{1}'.format(trip['id'], i) for i in range(len(trip['legs']))]
+            completed = all(leg_id in leg_times for leg_id in leg_ids)
+            end_time = leg_times[leg_ids[-1]][1] if completed else None
+            rows.append(dict(Name=trip['id'], Source=trip['source'], Dest=trip['dest'], StartTime=trip['time'],
+                             Banks='>'.join(leg[0] for leg in trip['legs']), Transfers=len(trip['legs']) - 1,
+                             PickUpTime=leg_times[leg_ids[0]][0] if leg_ids[0] in leg_times else None, EndTime=end_time,
+                             TotalTime=end_time - trip['time'] + 1 if completed else None, TripCompleted=completed))
+
+        return pd.DataFrame(rows, columns=['Name', 'Source', 'Dest', 'StartTime', 'Banks', 'Transfers', 'PickUpTime', 'EndTime', 'TotalTime', 'TripCompleted'])
@@ -0,0 +1,96 @@
+from common.enums import Engine
+from src.traffic import TRAFFIC_GENERATORS
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+from typing import Dict, Iterable, List
+
+# schedulers by name, as module:class. only the chosen one is imported
+SCHEDULERS = dict(
+    default='src.scheduler:Scheduler',
+    vectorized='src.vectorized_scheduler:VectorizedScheduler',
+    batch='src.batch_scheduler:BatchScheduler',
+    eta='src.eta_scheduler:EtaScheduler',
+    reservation='src.reservation_scheduler:ReservationScheduler',
+)
+
+
+def get_scheduler_cls(name: str):
+    module_name, class_name = SCHEDULERS[name].split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_requests(args: argparse.Namespace) -> Iterable[Dict]:
+    if args.requests:
+        from src.request_stream import read_csv_requests, read_jsonl_requests
+        return read_jsonl_requests(args.requests) if args.requests.endswith('.jsonl') else read_csv_requests(args.requests)
+
+    return TRAFFIC_GENERATORS[args.traffic](args.seed, args.floors, no_of_passengers=args.passengers, duration=args.duration)
+
+
+def add_building_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('-e', '--elevators', type=int, default=2, help='number of elevators')
+    parser.add_argument('-f', '--floors', type=int, default=50, help='number of floors')
+    parser.add_argument('-c', '--capacity', type=int, default=10, help='max passengers per elevator')
+
+
+def add_request_arguments(parser: argparse.ArgumentParser):
+    requests = parser.add_mutually_exclusive_group(required=True)
+    requests.add_argument('-r', '--requests', help='.csv or .jsonl file with the requests (time, id, source, dest)')
+    requests.add_argument('-t', '--traffic', choices=list(TRAFFIC_GENERATORS), help='generate the requests for a traffic pattern')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated traffic')
+    parser.add_argument('--passengers', type=int, default=1000, help='number of passengers of the generated traffic')
+    parser.add_argument('--duration', type=int, default=3600, help='ticks over which the generated passengers arrive')
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Simulates the elevators of a building for a list of requests.')
+    add_building_arguments(parser)
+    add_request_arguments(parser)
+
+    parser.add_argument('--engine', choices=[engine.name.lower() for engine in Engine], default='tick',
+                        help='tick runs every tick, event skips the ticks in which the elevators only move')
+    parser.add_argument('--scheduler', choices=list(SCHEDULERS), default='default')
+    parser.add_argument('-o', '--output-dir', default='./outputs', help='directory the output files are written to')
+    parser.add_argument('--run-name', help='name of the output files, defaults to the time they are written at')
+    parser.add_argument('--no-outputs', action='store_true', help="don't write the output files (and don't import pandas)")
+    parser.add_argument('--trace', help='stream the elevator states to this binary trace instead of a .csv file')
+    parser.add_argument('--profile', action='store_true', help='time the phases of the simulation loop and print the report')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log every tick (slow)')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    if args.verbose:
+        # the building only formats its debug messages when a handler is configured
+        logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+
+    # imported here, so --help and argument errors don't pay for importing the simulation
+    from building import Building
+    from src.profiler import Profiler
+    from src.stats import PERCENTILES
+
+    if not args.no_outputs:
+        os.makedirs(args.output_dir, exist_ok=True)
+    building = Building(no_of_elevators=args.elevators, no_of_floors=args.floors, max_passengers_per_elevator=args.capacity,
+                        request_list=get_requests(args), engine=Engine[args.engine.upper()], scheduler_cls=get_scheduler_cls(args.scheduler),
+                        output_dir=args.output_dir, run_name=args.run_name, write_outputs=not args.no_outputs,
+                        profiler=Profiler() if args.profile else None, trace_path=args.trace)
+    building.schedule()
+
+    print('Passengers: {0}  Ticks: {1}'.format(len(building.passengers), building.run_timer))
+    for metric, sketch in building.passenger_stats.overall.items():
+        percentiles = '  '.join('P{0}: {1:.1f}'.format(percentile, sketch.quantile(percentile / 100)) for percentile in PERCENTILES) if sketch.count else ''
+        print('{0:<10} count: {1}  mean: {2}  {3}'.format(metric, sketch.count, round(sketch.mean(), 2) if sketch.count else 'N/A', percentiles))
+    if args.profile:
+        print(building.profiler.report())
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,4 +8,8 @@ class Status(Enum):
 
 class Direction(Enum):
     UP = 1
-    DOWN = 2
\ No newline at end of file
+    DOWN = 2
+
+class Engine(Enum):
+    TICK = 1
+    EVENT = 2
@@ -0,0 +1,133 @@
+from cli import SCHEDULERS, add_building_arguments, add_request_arguments, get_requests, get_scheduler_cls
+from common.enums import Engine
+from src.event_log import DROP_OFF, KINDS, PICK_UP, Event, EventLog, canonical, first_divergence, write_csv
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# a variant is <engine>:<scheduler>, e.g. tick:default or event:vectorized, or replica for the ReplicaEngine
+REPLICA = 'replica'
+
+
+def check_variant(variant: str) -> str:
+    if variant != REPLICA:
+        engine, _, scheduler = variant.partition(':')
+        if engine.upper() not in Engine.__members__ or scheduler not in SCHEDULERS:
+            raise argparse.ArgumentTypeError('{0} is not {1} or <{2}>:<{3}>'.format(
+                variant, REPLICA, '|'.join(engine.name.lower() for engine in Engine), '|'.join(SCHEDULERS)))
+
+    return variant
+
+
+def variant_kinds(variant: str) -> Tuple[str, ...]:
+    # the kinds of events a variant logs, the ReplicaEngine only keeps the pick-up and drop-off times
+    return (PICK_UP, DROP_OFF) if variant == REPLICA else KINDS
+
+
+def run_variant(variant: str, requests: List[Dict], no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int,
+                event_log: EventLog = None) -> List[Event]:
+    '''
+    runs the requests with a variant, and returns its events (in the order they were logged) if an event log is given.
+    '''
+    if variant == REPLICA:
+        from src.replica_engine import ReplicaEngine
+        engine = ReplicaEngine(no_of_elevators, no_of_floors, max_passengers_per_elevator, [requests])
+        engine.run()
+        return engine.events(0) if event_log is not None else []
+
+    from building import Building
+    engine, scheduler = variant.split(':')
+    building = Building(no_of_elevators=no_of_elevators, no_of_floors=no_of_floors, max_passengers_per_elevator=max_passengers_per_elevator,
+                        request_list=requests, engine=Engine[engine.upper()], scheduler_cls=get_scheduler_cls(scheduler),
+                        write_outputs=False, event_log=event_log)
+    building.schedule()
+    return event_log.events if event_log is not None else []
+
+
+def time_variant(variant: str, requests: List[Dict], no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int,
+                 repeat: int = 1) -> float:
+    # best wall time of the runs of a variant in seconds, without an event log so the logging isn't timed
+    wall_times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run_variant(variant, requests, no_of_elevators, no_of_floors, max_passengers_per_elevator)
+        wall_times.append(time.perf_counter() - start_time)
+
+    return min(wall_times)
+
+
+def diff(reference: str, candidate: str, requests: List[Dict], no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int,
+         repeat: int = 1) -> Dict:
+    '''
+    runs the same requests with a reference and a candidate variant, and compares their canonical event logs over the
+    kinds of events both log. returns the logs, the first divergence (see first_divergence), and the best wall time
+    of each variant over repeat runs without an event log, with the speedup of the candidate over the reference.
+    '''
+    kinds = [kind for kind in variant_kinds(reference) if kind in variant_kinds(candidate)]
+    logs = dict()
+    for variant in (reference, candidate):
+        events = run_variant(variant, requests, no_of_elevators, no_of_floors, max_passengers_per_elevator, event_log=EventLog())
+        logs[variant] = canonical(event for event in events if event.kind in kinds)
+
+    reference_time = time_variant(reference, requests, no_of_elevators, no_of_floors, max_passengers_per_elevator, repeat)
+    candidate_time = time_variant(candidate, requests, no_of_elevators, no_of_floors, max_passengers_per_elevator, repeat)
+    return dict(Reference=reference, Candidate=candidate, Kinds=kinds, ReferenceLog=logs[reference], CandidateLog=logs[candidate],
+                Divergence=first_divergence(logs[reference], logs[candidate]), ReferenceTime=reference_time, CandidateTime=candidate_time,
+                Speedup=reference_time / candidate_time if candidate_time else float('inf'))
+
+
+def report(result: Dict, context: int = 3) -> str:
+    # the report of a diff, with up to context events of the reference before the first divergence
+    lines = ['Compared {0} against {1} over {2}'.format(result['Candidate'], result['Reference'], ', '.join(result['Kinds'])),
+             'Events: {0} (reference), {1} (candidate)'.format(len(result['ReferenceLog']), len(result['CandidateLog']))]
+
+    if result['Divergence'] is None:
+        lines.append('The event logs are identical')
+    else:
+        index, reference_event, candidate_event = result['Divergence']
+        lines.append('First divergence at event {0}:'.format(index))
+        for event in result['ReferenceLog'][max(0, index - context):index]:
+            lines.append('    both       {}'.format(event))
+        lines.append('    reference  {}'.format(reference_event))
+        lines.append('    candidate  {}'.format(candidate_event))
+
+    lines.append('Wall time: {0:.3f}s (reference), {1:.3f}s (candidate), speedup {2:.2f}x'.format(
+        result['ReferenceTime'], result['CandidateTime'], result['Speedup']))
+    return '\n'.join(lines)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Runs the same requests with two variants of the simulation, reports the first '
+                                                 'event at which they diverge and the speedup of the candidate.')
+    parser.add_argument('reference', type=check_variant, help='<engine>:<scheduler> (e.g. tick:default) or replica')
+    parser.add_argument('candidate', type=check_variant, help='<engine>:<scheduler> (e.g. event:vectorized) or replica')
+    add_building_arguments(parser)
+    add_request_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each variant to take the best wall time of')
+    parser.add_argument('--context', type=int, default=3, help='events to show before the first divergence')
+    parser.add_argument('--save-logs', metavar='DIR', help='write the canonical event log of each variant to a .csv file in the directory')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    # exits with 1 if the event logs diverge, so it can be used as a check
+    args = parse_args(argv)
+    # the requests are read once, so both variants get the same ones
+    requests = list(get_requests(args))
+    result = diff(args.reference, args.candidate, requests, args.elevators, args.floors, args.capacity, repeat=args.repeat)
+    print(report(result, context=args.context))
+
+    if args.save_logs:
+        os.makedirs(args.save_logs, exist_ok=True)
+        for role in ('Reference', 'Candidate'):
+            path = os.path.join(args.save_logs, 'event_log_{0}_{1}.csv'.format(role.lower(), result[role].replace(':', '_')))
+            write_csv(result['{}Log'.format(role)], path)
+
+    return 0 if result['Divergence'] is None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
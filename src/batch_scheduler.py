@@ -0,0 +1,105 @@
+from typing import List
+
+import numpy as np
+
+from src.dispatcher import Dispatcher
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+
+UNASSIGNABLE_COST = 1 << 40
+
+
+def min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    '''
+    Hungarian algorithm for a rectangular cost matrix with no more rows than columns.
+    Returns, for every row, the column it is assigned to, such that the total cost is minimal.
+    The inner loop over the columns is vectorized, so it takes O(rows^2) numpy passes over the columns.
+    '''
+    rows, columns = cost.shape
+    u = np.zeros(rows + 1, dtype=np.int64)
+    v = np.zeros(columns + 1, dtype=np.int64)
+    row_of_column = np.zeros(columns + 1, dtype=np.int64)     # 1-indexed row assigned to each column, column 0 is a sentinel
+    way = np.zeros(columns + 1, dtype=np.int64)
+    infinity = np.iinfo(np.int64).max
+
+    for i in range(1, rows + 1):
+        row_of_column[0] = i
+        j0 = 0
+        min_v = np.full(columns + 1, infinity, dtype=np.int64)
+        used = np.zeros(columns + 1, dtype=bool)
+
+        while True:
+            used[j0] = True
+            i0 = row_of_column[j0]
+            reduced_cost = cost[i0 - 1] - u[i0] - v[1:]
+
+            improved = ~used[1:] & (reduced_cost < min_v[1:])
+            min_v[1:][improved] = reduced_cost[improved]
+            way[1:][improved] = j0
+
+            free_min_v = np.where(used[1:], infinity, min_v[1:])
+            j1 = int(np.argmin(free_min_v)) + 1
+            delta = free_min_v[j1 - 1]
+
+            u[row_of_column[used]] += delta
+            v[used] -= delta
+            min_v[~used] -= delta
+
+            j0 = j1
+            if row_of_column[j0] == 0:
+                break
+
+        while j0:
+            j1 = way[j0]
+            row_of_column[j0] = row_of_column[j1]
+            j0 = j1
+
+    assignment = np.empty(rows, dtype=np.int64)
+    assigned_columns = np.flatnonzero(row_of_column[1:]) + 1
+    assignment[row_of_column[assigned_columns] - 1] = assigned_columns - 1
+    return assignment
+
+
+class BatchScheduler(Scheduler):
+
+    def __init__(self, dispatcher: Dispatcher) -> None:
+        '''
+        Scheduler that assigns all passengers that call at the same time together, instead of one at a time.
+
+        It builds a passenger x elevator matrix of pick-up times (using the Scheduler's pick-up time rules), and solves
+        a min-cost assignment where every elevator can take as many passengers as it has room for, i.e.
+        max passengers less the passengers on board and the ones queued to be picked up in its current direction.
+        Passengers that don't fit into any elevator are scheduled one at a time like the Scheduler does.
+        '''
+        super().__init__(dispatcher=dispatcher)
+
+    def __get_free_capacity(self, elevator) -> int:
+        queued_passengers = self.dispatcher.elevator_passenger_queue[elevator.name].get_passenger_queue().passenger_count()
+        return max(0, elevator.max_passengers - elevator.passenger_count() - queued_passengers)
+
+    def schedule_elevator(self, passengers: List[Passenger]):
+        if len(passengers) <= 1:
+            return super().schedule_elevator(passengers)
+
+        # every elevator gets a column for each passenger it can still take
+        slot_elevators = []
+        for elevator in self.dispatcher.elevators:
+            slot_elevators.extend([elevator] * min(self.__get_free_capacity(elevator), len(passengers)))
+
+        cost = np.full((len(passengers), len(slot_elevators) + len(passengers)), UNASSIGNABLE_COST, dtype=np.int64)
+        for i, passenger in enumerate(passengers):
+            elevator_cost = dict()
+            for elevator in set(slot_elevators):
+                # on equal pick-up time prefer an elevator that is already moving, like the Scheduler does
+                elevator_cost[elevator.name] = 2 * self._get_cached_pick_up_time(elevator, passenger.start_floor, passenger.direction()) + \
+                                               (1 if elevator.is_idle() else 0)
+            cost[i, :len(slot_elevators)] = [elevator_cost[elevator.name] for elevator in slot_elevators]
+
+        unassigned_passengers = []
+        for passenger, slot in zip(passengers, min_cost_assignment(cost)):
+            if slot < len(slot_elevators):
+                self.dispatcher.add_passenger_to_elevator_queue(slot_elevators[slot], passenger)
+            else:
+                unassigned_passengers.append(passenger)
+
+        super().schedule_elevator(unassigned_passengers)
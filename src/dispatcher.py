@@ -1,8 +1,10 @@
-from typing import List, Dict
-
 from common.enums import Status, Direction
 from src.elevator import Elevator
+from src.floor_queue import FloorQueue
 from src.passenger import Passenger
+from src.stats import PassengerStats
+
+from typing import List
 
 
 class ElevatorPassengerQueue:
@@ -14,41 +16,58 @@ class ElevatorPassengerQueue:
         a) CURRENT -> passengers going in the same direction yet to be picked up with the floor yet to arrive
         b) NEXT -> passengers going in the opposite direction which are yet to be picked up
         c) FUTURE -> passengers going in the same direction yet to be picked up, but elevator has passed the floor
+
+        Each queue is a FloorQueue, which keeps its pick-up floors sorted.
+        The version is bumped whenever a queue changes, like the version of the elevator.
         '''
-        self.dispatch_queue = dict(CURRENT=dict(), NEXT=dict(), FUTURE=dict())
+        self.dispatch_queue = dict(CURRENT=FloorQueue(), NEXT=FloorQueue(), FUTURE=FloorQueue())
         self.elevator = elevator
+        self.version = 0
+
+    def get_queue_key(self, start_floor: int, direction: Direction) -> str:
+        # the queue a passenger calling from the floor to go in the direction is added to
+        if direction != self.elevator.passenger_direction:
+            return 'NEXT'
+
+        # passenger wants to move in the same direction as the elevators passengers
+        if self.elevator.direction != self.elevator.passenger_direction:
+            # elevator is moving, but yet to pick up passengers.
+            return 'CURRENT'
+
+        # elevator is already moving in the direction to pick/drop-off passengers
+        if self.elevator.passenger_direction == Direction.UP:
+            return 'CURRENT' if self.elevator.at_floor() <= start_floor else 'FUTURE'
+
+        return 'CURRENT' if self.elevator.at_floor() >= start_floor else 'FUTURE'
 
     def add_to_queue(self, passenger: Passenger):
-        dispatch_queue_key = 'CURRENT'
-
-        if passenger.direction() == self.elevator.passenger_direction:
-            # passenger wants to move in the same direction as the elevators passengers
-            if self.elevator.direction == self.elevator.passenger_direction:
-                # elevator is already moving in the direction to pick/drop-off passengers
-                if self.elevator.passenger_direction == Direction.UP:
-                    dispatch_queue_key = 'CURRENT' if self.elevator.at_floor() <= passenger.start_floor else 'FUTURE'
-                else:
-                    dispatch_queue_key = 'CURRENT' if self.elevator.at_floor() >= passenger.start_floor else 'FUTURE'
-            else:
-                # elevator is moving, but yet to pick up passengers.
-                # in this case we make sure we keep moving till we get to the highest/lowest pick-up spot
-                dispatch_queue_key = 'CURRENT'
-                self.elevator.update_pick_up_floor(passenger.start_floor, passenger.direction())
+        dispatch_queue_key = self.get_queue_key(passenger.start_floor, passenger.direction())
+        if dispatch_queue_key == 'CURRENT' and self.elevator.direction != self.elevator.passenger_direction:
+            # the elevator is yet to pick up passengers,
+            # in this case we make sure we keep moving till we get to the highest/lowest pick-up spot
+            self.elevator.update_pick_up_floor(passenger.start_floor, passenger.direction())
 
-        else:
-            dispatch_queue_key = 'NEXT'
+        self.dispatch_queue[dispatch_queue_key].add(passenger.start_floor, passenger)
+        self.version += 1
 
-        pick_up_floor_pass_list = self.dispatch_queue[dispatch_queue_key].get(passenger.start_floor, [])
-        pick_up_floor_pass_list.append(passenger)
-        self.dispatch_queue[dispatch_queue_key][passenger.start_floor] = pick_up_floor_pass_list
+    def defer_passenger(self, passenger: Passenger):
+        # the elevator has passed the passenger's floor, so the passenger waits till the elevator comes back
+        self.dispatch_queue['FUTURE'].add(passenger.start_floor, passenger)
+        self.version += 1
+
+    def pop_current_passengers(self, floor: int) -> List[Passenger]:
+        # removes the passengers waiting at the floor from the CURRENT queue, to be picked up (or re-scheduled)
+        self.version += 1
+        return self.dispatch_queue['CURRENT'].pop(floor)
 
     def set_current_direction(self, direction: Direction):
         self.dispatch_queue['CURRENT'] = self.dispatch_queue['NEXT']
         self.dispatch_queue['NEXT'] = self.dispatch_queue['FUTURE']
-        self.dispatch_queue['FUTURE'] = dict()
+        self.dispatch_queue['FUTURE'] = FloorQueue()
         self.current_direction = direction
+        self.version += 1
 
-    def get_passenger_queue(self) -> Dict[int, List[Passenger]]:
+    def get_passenger_queue(self) -> FloorQueue:
         return self.dispatch_queue['CURRENT']
 
     def serviced_current_passengers(self) -> bool:
@@ -58,15 +77,23 @@ class ElevatorPassengerQueue:
         return not(len(self.dispatch_queue['NEXT']) == 0 and len(self.dispatch_queue['FUTURE']) == 0)
 
     def reset_passenger_queue(self):
-        self.dispatch_queue = dict(CURRENT=dict(), NEXT=dict(), FUTURE=dict())
+        self.dispatch_queue = dict(CURRENT=FloorQueue(), NEXT=FloorQueue(), FUTURE=FloorQueue())
         self.current_direction = None
+        self.version += 1
 
 class Dispatcher:
-    def __init__(self, no_of_floors: int) -> None:
+    def __init__(self, no_of_floors: int, passenger_stats: PassengerStats = None) -> None:
         self.no_of_floors = no_of_floors
+        self.passenger_stats = passenger_stats  # updated as passengers are picked up and dropped off, if given
         self.elevators = list()
         self.elevator_passenger_queue = dict() # for each elevator, store a queue of passengers for every floor
 
+        # running totals of the passengers moved, and of the passengers a full elevator couldn't take
+        self.picked_up_count = 0
+        self.dropped_off_count = 0
+        self.reschedule_count = 0
+        self.deferred_count = 0
+
     def add_elevator(self, elevator: Elevator) -> None:
         self.elevators.append(elevator)
         self.elevator_passenger_queue[elevator.name] = ElevatorPassengerQueue(elevator=elevator)
@@ -100,14 +127,17 @@ class Dispatcher:
             # if elevator was going DOWN, we now want to go UP and pick up the first available passenger (or passengers at the next highest floor)
             ele_pass_q_obj.set_current_direction(Direction.DOWN if elevator.direction == Direction.UP else Direction.UP)
             if not ele_pass_q_obj.serviced_current_passengers():
+                # the first pick-up can be further along than the floor the elevator is at, so move towards it
                 if elevator.direction == Direction.UP:
-                    elevator.update_elevator_direction(elevator.at_floor(), Direction.DOWN)
+                    pick_up_floor = ele_pass_q_obj.get_passenger_queue().max_floor()
+                    elevator.update_elevator_direction(pick_up_floor, Direction.DOWN)
                     elevator.update_passenger_direction(Direction.DOWN)
-                    elevator.update_pick_up_floor(max(ele_pass_q_obj.get_passenger_queue().keys()), Direction.DOWN)
+                    elevator.update_pick_up_floor(pick_up_floor, Direction.DOWN)
                 else:
-                    elevator.update_elevator_direction(elevator.at_floor(), Direction.UP)
+                    pick_up_floor = ele_pass_q_obj.get_passenger_queue().min_floor()
+                    elevator.update_elevator_direction(pick_up_floor, Direction.UP)
                     elevator.update_passenger_direction(Direction.UP)
-                    elevator.update_pick_up_floor(min(ele_pass_q_obj.get_passenger_queue().keys()), Direction.UP)
+                    elevator.update_pick_up_floor(pick_up_floor, Direction.UP)
 
                 return
 
@@ -119,11 +149,11 @@ class Dispatcher:
                 if elevator.direction == Direction.UP:
                     elevator.update_elevator_direction(elevator.at_floor(), Direction.DOWN)
                     elevator.update_passenger_direction(Direction.UP)
-                    elevator.update_pick_up_floor(min(ele_pass_q_obj.get_passenger_queue().keys()), Direction.UP)
+                    elevator.update_pick_up_floor(ele_pass_q_obj.get_passenger_queue().min_floor(), Direction.UP)
                 else:
                     elevator.update_elevator_direction(elevator.at_floor(), Direction.UP)
                     elevator.update_passenger_direction(Direction.DOWN)
-                    elevator.update_pick_up_floor(max(ele_pass_q_obj.get_passenger_queue().keys()), Direction.DOWN)
+                    elevator.update_pick_up_floor(ele_pass_q_obj.get_passenger_queue().max_floor(), Direction.DOWN)
 
                 return
 
@@ -134,32 +164,89 @@ class Dispatcher:
             ele_pass_q_obj.reset_passenger_queue()
 
 
-    def move_elevators(self):
+    def floors_to_next_stop(self, elevator: Elevator):
+        '''
+        number of floors the elevator can move in its current direction before it reaches a floor where
+        it has to drop-off or pick-up passengers, or might change its direction.
+        returns None if there is no such floor in the direction the elevator is moving.
+        '''
+        if elevator.direction is None:
+            return None
+
+        stops = [elevator.next_drop_off_floor(), self.elevator_passenger_queue[elevator.name].get_passenger_queue().next_floor(elevator.at_floor(), elevator.direction)]
+        if elevator.pick_up_floor() != elevator.at_floor() and (elevator.pick_up_floor() > elevator.at_floor()) == (elevator.direction == Direction.UP):
+            stops.append(elevator.pick_up_floor())
+
+        floors = [abs(stop - elevator.at_floor()) for stop in stops if stop is not None]
+        return min(floors) if floors else None
+
+    def pick_up_passenger(self, elevator: Elevator, passenger: Passenger, run_timer: int):
+        elevator.add_passenger(passenger, run_timer)
+        self.picked_up_count += 1
+        if self.passenger_stats:
+            self.passenger_stats.record_pick_up(elevator.name, passenger)
+
+    def move_elevators(self, ticks: int = 1):
         for elevator in self.elevators:
             if not elevator.is_idle():
-                elevator.update_at_floor()
+                elevator.update_at_floor(ticks)
+
+    def pick_up_passengers_left_behind(self, elevator: Elevator, run_timer: int):
+        '''
+        passengers can be queued at the floor an elevator is at after the elevator was dispatched, i.e. when the elevator
+        switched over to its next queue, or when it was re-scheduled to pick up passengers that a full elevator couldn't take.
+        as the elevator is about to move away from that floor, pick them up now, or if it is full let them wait till it comes back.
+        '''
+        ele_pass_q_obj = self.elevator_passenger_queue[elevator.name]
+        if elevator.direction == elevator.passenger_direction and elevator.at_floor() in ele_pass_q_obj.get_passenger_queue():
+            for passenger in ele_pass_q_obj.pop_current_passengers(elevator.at_floor()):
+                if elevator.is_at_max_capacity():
+                    ele_pass_q_obj.defer_passenger(passenger)
+                    self.deferred_count += 1
+                else:
+                    self.pick_up_passenger(elevator, passenger, run_timer)
 
-    def dispatch(self, run_timer: int, scheduler):
+    def dispatch(self, run_timer: int, scheduler) -> List[Passenger]:
+        '''
+        drops off and picks up the passengers of every elevator at its floor, and returns the passengers that were dropped off.
+
+        a passenger a full elevator can't take is re-scheduled, unless the scheduler lets it wait for the elevator to come back
+        (deferred to the FUTURE queue). once every elevator was dispatched, the passengers left queued at the floor an elevator is at
+        are picked up, or deferred if it is full (see pick_up_passengers_left_behind).
+        '''
+        dropped_passengers = []
         for elevator in self.elevators:
             if not elevator.is_idle():
-                elevator.drop_passengers(run_timer)
+                elevator_dropped_passengers = elevator.drop_passengers(run_timer)
+                if elevator_dropped_passengers:
+                    dropped_passengers.extend(elevator_dropped_passengers)
+                    if self.passenger_stats:
+                        self.passenger_stats.record_drop_off(elevator.name, elevator_dropped_passengers)
 
                 elevator_pass_q = self.elevator_passenger_queue[elevator.name].get_passenger_queue()
 
                 if elevator_pass_q:
                     # passengers still left to be serviced
                     if elevator.is_moving_in_pass_direction() and elevator_pass_q.get(elevator.at_floor(), None):
-                        passenger_q = elevator_pass_q.pop(elevator.at_floor())
+                        passenger_q = self.elevator_passenger_queue[elevator.name].pop_current_passengers(elevator.at_floor())
                         for passenger in passenger_q:
                             if elevator.is_at_max_capacity():
                                 # elevator arrived to pick-up passenger but was full.
-                                # so we need to re-schedule the passenger
-                                scheduler.schedule_elevator([passenger])
+                                # so we need to re-schedule the passenger, unless the scheduler lets it wait for the elevator to come back
+                                if scheduler.reschedule_passenger(elevator, passenger):
+                                    passenger.reschedule_count += 1
+                                    self.reschedule_count += 1
+                                else:
+                                    self.elevator_passenger_queue[elevator.name].defer_passenger(passenger)
+                                    self.deferred_count += 1
                             else:
-                                elevator.add_passenger(passenger, run_timer)
+                                self.pick_up_passenger(elevator, passenger, run_timer)
 
                 self.update_elevator_status(elevator=elevator)
 
+        for elevator in self.elevators:
+            if not elevator.is_idle():
+                self.pick_up_passengers_left_behind(elevator=elevator, run_timer=run_timer)
 
-
-
+        self.dropped_off_count += len(dropped_passengers)
+        return dropped_passengers
@@ -1,10 +1,15 @@
 from common.enums import Status, Direction
+from src.floor_queue import FloorQueue
 from src.passenger import Passenger
 
+from typing import List
+
 import logging
 logger = logging.getLogger(__name__)
 
 class Elevator:
+    __slots__ = ('name', 'status', 'total_number_of_floors', 'direction', 'passenger_direction', 'max_passengers', 'version',
+                 '__pick_up_floor', '__passengers', '__passenger_count', '__current_floor')
 
     def __init__(self, name: str, total_floors: int, status: Status = None, no_of_persons: int = 10) -> None:
         self.name = name
@@ -17,10 +22,14 @@ class Elevator:
         self.__pick_up_floor = 1
 
         self.max_passengers = no_of_persons
-        self.__passengers = dict()
+        self.__passengers = FloorQueue()   # passengers on board, by drop-off floor
         self.__passenger_count = 0
         self.__current_floor = 1
 
+        # bumped by every method that changes the state of the elevator, so anything computed from the state
+        # (e.g. the scheduler's pick-up times) can be cached for as long as the version stays the same
+        self.version = 0
+
     def __str__(self) -> str:
         return 'Elevator ID: {0} Floor: {1} Passengers: {2} Status: {3}'.format(self.name, self.at_floor(), self.__passenger_count, self.status.name) + \
                 '\t\t[Direction: {0}, Passenger Direction: {1}]'.format(self.direction, self.passenger_direction)
@@ -33,6 +42,7 @@ class Elevator:
 
     def update_status(self, status: Status):
         self.status = status
+        self.version += 1
 
     def is_at_max_capacity(self) -> bool:
         return self.__passenger_count == self.max_passengers
@@ -45,6 +55,7 @@ class Elevator:
             # in the event the elevator is moving in the direction of the pick-up,
             # change it's direction to move in the direction of the passenger
             self.direction = self.passenger_direction
+            self.version += 1
 
         return self.direction == self.passenger_direction
 
@@ -54,23 +65,54 @@ class Elevator:
     def at_floor(self):
         return self.__current_floor
 
+    def floor_after(self, ticks: int) -> int:
+        # floor the elevator will be at after moving for the given number of ticks in its current direction
+        if self.direction == Direction.UP:
+            return self.__current_floor + ticks
+        elif self.direction == Direction.DOWN:
+            return self.__current_floor - ticks
+
+        return self.__current_floor
+
+    def pick_up_floor(self) -> int:
+        return self.__pick_up_floor
+
+    def next_drop_off_floor(self):
+        # the nearest floor ahead of the elevator where a passenger has to be dropped off, None if there is none
+        return self.__passengers.next_floor(self.at_floor(), self.direction)
+
+    def furthest_drop_off_floor(self, direction: Direction):
+        # the highest (UP) or lowest (DOWN) floor a passenger on board goes to, None if there are no passengers
+        if not self.__passengers:
+            return None
+
+        return self.__passengers.max_floor() if direction == Direction.UP else self.__passengers.min_floor()
+
+    def count_drop_offs_beyond(self, floor: int, direction: Direction) -> int:
+        # number of passengers on board that go beyond the floor in the direction
+        return self.__passengers.count_end_floors_beyond(floor, direction)
+
     def add_passenger(self, passenger: Passenger, pick_up_time: int):
         passenger.pick_up_time = pick_up_time
-        if passenger.end_floor in self.__passengers:
-            self.__passengers[passenger.end_floor].append(passenger)
-        else:
-            self.__passengers[passenger.end_floor] = [passenger]
-
+        self.__passengers.add(passenger.end_floor, passenger)
         self.__passenger_count += 1
-
-    def drop_passengers(self, time: int):
-        if self.at_floor() in self.__passengers:
-            passengers = self.__passengers.pop(self.at_floor())
-            self.__passenger_count -= len(passengers)
-            for passenger in passengers:
-                passenger.set_end_time(time)
+        self.version += 1
+
+    def drop_passengers(self, time: int) -> List[Passenger]:
+        # drops the passengers going to the current floor, and returns them
+        if self.at_floor() not in self.__passengers:
+            return []
+
+        passengers = self.__passengers.pop(self.at_floor())
+        self.__passenger_count -= len(passengers)
+        self.version += 1
+        for passenger in passengers:
+            passenger.set_end_time(time)
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug('Dropped ==> {0} '.format(passenger))
 
+        return passengers
+
     def update_pick_up_floor(self, floor_no: int, direction: Direction):
 
         if direction == Direction.UP:
@@ -79,6 +121,8 @@ class Elevator:
         elif direction == Direction.DOWN:
             self.__pick_up_floor = max(self.__pick_up_floor, floor_no)
 
+        self.version += 1
+
     def update_elevator_direction(self, floor_no: int, direction: Direction):
         '''
         when updating elevator direction, check to see which floor we need to move to,
@@ -94,12 +138,13 @@ class Elevator:
         else:
             self.direction = Direction.UP
 
+        self.version += 1
+
     def update_passenger_direction(self, direction: Direction):
         self.passenger_direction = direction
+        self.version += 1
 
-    def update_at_floor(self):
-        if self.direction == Direction.UP:
-            self.__current_floor += 1
-        elif self.direction == Direction.DOWN:
-            self.__current_floor -= 1
+    def update_at_floor(self, ticks: int = 1):
+        self.__current_floor = self.floor_after(ticks)
+        self.version += 1
 
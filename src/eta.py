@@ -0,0 +1,88 @@
+import sys
+from typing import Iterable, Tuple
+
+from common.enums import Direction
+from src.dispatcher import Dispatcher
+from src.elevator import Elevator
+from src.floor_queue import FloorQueue
+
+
+def opposite(direction: Direction) -> Direction:
+    return Direction.DOWN if direction == Direction.UP else Direction.UP
+
+
+def furthest(direction: Direction, floors: Iterable[int]) -> int:
+    # the highest (UP) or lowest (DOWN) of the floors, ignoring None
+    floors = [floor for floor in floors if floor is not None]
+    return max(floors) if direction == Direction.UP else min(floors)
+
+
+class EtaModel:
+
+    def __init__(self, dispatcher: Dispatcher) -> None:
+        '''
+        Estimates when an elevator gets to a call from the route it has planned, instead of the worst case.
+
+        An elevator serves its queues in sweeps: it finishes the CURRENT sweep in the passenger direction (dropping off
+        everyone on board and everyone it picks up on the way), then turns to the first pick-up of its NEXT queue and
+        sweeps the other way, and then does the same for its FUTURE queue. A sweep only ends at the furthest floor one
+        of its passengers is picked up at or goes to, and elevators move one floor per tick without stopping time, so
+        the time to reach a floor is the length of the route up to it.
+
+        The furthest floors are read from the sorted indexes of the FloorQueues (pick-up and end floors) and of the
+        passengers on board, which are kept up to date as stops are added and served, so an estimate takes constant
+        time however many passengers are queued.
+        '''
+        self.dispatcher = dispatcher
+
+    def __sweep(self, from_floor: int, ticks: int, queue: FloorQueue, direction: Direction) -> Tuple[int, int]:
+        # floor and time the elevator ends a sweep of the queue in the direction, starting from the given floor and time
+        start_floor = queue.max_floor() if direction == Direction.DOWN else queue.min_floor()
+        end_floor = furthest(direction, [start_floor, queue.max_floor(), queue.min_floor(), queue.max_end_floor(), queue.min_end_floor()])
+        return end_floor, ticks + abs(from_floor - start_floor) + abs(end_floor - start_floor)
+
+    def end_of_current_sweep(self, elevator: Elevator) -> Tuple[int, int]:
+        # floor and time (in ticks from now) the elevator ends its CURRENT sweep
+        direction = elevator.passenger_direction
+        queue = self.dispatcher.elevator_passenger_queue[elevator.name].get_passenger_queue()
+        # an elevator that isn't moving in the passenger direction first goes to its pick-up floor
+        start_floor = elevator.at_floor() if elevator.direction == direction else elevator.pick_up_floor()
+
+        floors = [start_floor, elevator.furthest_drop_off_floor(direction)]
+        if queue:
+            floors += [queue.max_floor(), queue.min_floor(), queue.max_end_floor(), queue.min_end_floor()]
+        end_floor = furthest(direction, floors)
+        return end_floor, abs(elevator.at_floor() - start_floor) + abs(end_floor - start_floor)
+
+    def pick_up_time(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction) -> int:
+        # ticks till the elevator gets to a call from the floor in the direction, if the call was added to its queues
+        if elevator.is_at_max_capacity():
+            return sys.maxsize
+
+        at_floor = elevator.at_floor()
+        if elevator.is_idle():
+            return abs(pick_up_floor - at_floor)
+
+        passenger_direction = elevator.passenger_direction
+        if pick_up_direction == passenger_direction:
+            if elevator.direction != passenger_direction:
+                # on its way to the first pick-up of the sweep, which becomes the call's floor if that is further out
+                turn_floor = furthest(opposite(passenger_direction), [elevator.pick_up_floor(), pick_up_floor])
+                return abs(at_floor - turn_floor) + abs(pick_up_floor - turn_floor)
+
+            is_ahead = pick_up_floor >= at_floor if passenger_direction == Direction.UP else pick_up_floor <= at_floor
+            if is_ahead:
+                # the call is picked up on the way
+                return abs(pick_up_floor - at_floor)
+
+        queues = self.dispatcher.elevator_passenger_queue[elevator.name].dispatch_queue
+        end_floor, ticks = self.end_of_current_sweep(elevator)
+        if pick_up_direction == passenger_direction and queues['NEXT']:
+            # the call goes into the FUTURE queue, which is served after the NEXT sweep
+            end_floor, ticks = self.__sweep(end_floor, ticks, queues['NEXT'], opposite(passenger_direction))
+
+        # the call goes into the NEXT (or FUTURE) queue, whose sweep starts at its furthest pick-up against the direction
+        queue = queues['NEXT'] if pick_up_direction != passenger_direction else queues['FUTURE']
+        floors = [pick_up_floor] + ([queue.max_floor(), queue.min_floor()] if queue else [])
+        turn_floor = furthest(opposite(pick_up_direction), floors)
+        return ticks + abs(end_floor - turn_floor) + abs(pick_up_floor - turn_floor)
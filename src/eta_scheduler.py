@@ -0,0 +1,23 @@
+from src.dispatcher import Dispatcher
+from src.elevator import Elevator
+from src.eta import EtaModel
+from src.scheduler import Scheduler
+from common.enums import Direction
+
+
+class EtaScheduler(Scheduler):
+
+    def __init__(self, dispatcher: Dispatcher) -> None:
+        '''
+        Scheduler that picks the elevator by the pick-up time the EtaModel derives from the route of each elevator,
+        instead of the worst case pick-up time rules of the Scheduler. Ties are broken the same way.
+        '''
+        super().__init__(dispatcher=dispatcher)
+        self.eta_model = EtaModel(dispatcher)
+
+    def _cost_state_key(self, elevator: Elevator):
+        # the route also depends on the queues of the elevator, which change without changing the elevator
+        return elevator.version, self.dispatcher.elevator_passenger_queue[elevator.name].version
+
+    def _get_elevator_pick_up_time(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction):
+        return self.eta_model.pick_up_time(elevator, pick_up_floor, pick_up_direction)
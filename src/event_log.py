@@ -0,0 +1,169 @@
+import csv
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from common.enums import Direction
+from src.hooks import MethodHooks
+
+# kinds of events
+ASSIGN = 'ASSIGN'
+RESCHEDULE = 'RESCHEDULE'
+PICK_UP = 'PICK_UP'
+DEFER = 'DEFER'
+DROP_OFF = 'DROP_OFF'
+DIRECTION = 'DIRECTION'
+KINDS = (ASSIGN, RESCHEDULE, PICK_UP, DEFER, DROP_OFF, DIRECTION)
+
+
+class Event(NamedTuple):
+    '''
+    time: tick of the event. elevator: name of the elevator. floor: pick-up floor (ASSIGN, RESCHEDULE, PICK_UP, DEFER),
+    drop-off floor (DROP_OFF), or the floor the elevator is at (DIRECTION).
+    passenger: id of the passenger, empty for DIRECTION. detail: direction/passenger direction of the elevator for
+    DIRECTION (NONE/NONE when it is idle), the elevator the passenger was taken off for RESCHEDULE, empty otherwise.
+    '''
+    time: int
+    kind: str
+    elevator: str
+    floor: int
+    passenger: str = ''
+    detail: str = ''
+
+
+def direction_name(direction: Direction) -> str:
+    return 'NONE' if direction is None else direction.name
+
+
+def canonical(events: Iterable[Event]) -> List[Event]:
+    '''
+    events sorted by time, kind, elevator, passenger, floor and detail.
+    the order of the events within a tick depends on the order the elevators and passengers are looped over, which
+    doesn't change the outcome of the run, so two runs are equivalent if their canonical logs are equal.
+    '''
+    return sorted(events, key=lambda event: (event.time, KINDS.index(event.kind), event.elevator, event.passenger, event.floor, event.detail))
+
+
+def first_divergence(reference: List[Event], candidate: List[Event]) -> Optional[Tuple[int, Optional[Event], Optional[Event]]]:
+    '''
+    index of the first event at which two canonical logs differ, with the event of each log at that index
+    (None for a log that ended before it). returns None if the logs are equal.
+    '''
+    for i, (reference_event, candidate_event) in enumerate(zip(reference, candidate)):
+        if reference_event != candidate_event:
+            return i, reference_event, candidate_event
+
+    if len(reference) != len(candidate):
+        i = min(len(reference), len(candidate))
+        return i, reference[i] if i < len(reference) else None, candidate[i] if i < len(candidate) else None
+
+    return None
+
+
+def write_csv(events: Iterable[Event], path: str):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(Event._fields)
+        writer.writerows(events)
+
+
+def read_csv(path: str) -> List[Event]:
+    with open(path, newline='') as f:
+        return [Event(int(row['time']), row['kind'], row['elevator'], int(row['floor']), row['passenger'], row['detail'])
+                for row in csv.DictReader(f)]
+
+
+class EventLog:
+
+    def __init__(self) -> None:
+        '''
+        Records what happens to the passengers and elevators of a run: every assignment of a passenger to an elevator,
+        the re-schedules and deferrals of passengers a full elevator couldn't take, the pick-ups and drop-offs, and the
+        direction changes of the elevators (logged at the end of a tick, so an elevator that turns twice within a tick
+        logs its last direction only).
+
+        Like the Profiler, the events are logged by wrapping the methods on the building, dispatcher and elevator passenger
+        queue instances when the log is attached, so a building without an event log runs the loop without any hooks.
+        The direction changes are checked at the end of every tick the building runs, the ticks the event engine skips
+        only move the elevators.
+        '''
+        self.events: List[Event] = []
+        self.building = None
+        # direction and passenger direction of each elevator at the last direction event
+        self.__directions: Dict[str, str] = dict()
+        self.__hooks = MethodHooks()
+
+    def attach(self, building):
+        self.building = building
+        dispatcher = building.dispatcher
+
+        def log_assign(method):
+            def add_passenger_to_elevator_queue(elevator, passenger):
+                if passenger.assigned_elevator is not None:
+                    self.events.append(Event(building.run_timer, RESCHEDULE, elevator.name, passenger.start_floor, str(passenger.id), passenger.assigned_elevator))
+                self.events.append(Event(building.run_timer, ASSIGN, elevator.name, passenger.start_floor, str(passenger.id)))
+                return method(elevator, passenger)
+            return add_passenger_to_elevator_queue
+
+        def log_pick_up(method):
+            def pick_up_passenger(elevator, passenger, run_timer):
+                self.events.append(Event(run_timer, PICK_UP, elevator.name, passenger.start_floor, str(passenger.id)))
+                return method(elevator, passenger, run_timer)
+            return pick_up_passenger
+
+        def log_drop_off(method):
+            def dispatch(run_timer, scheduler):
+                dropped_passengers = method(run_timer, scheduler)
+                self.events.extend(Event(run_timer, DROP_OFF, passenger.assigned_elevator, passenger.end_floor, str(passenger.id))
+                                   for passenger in dropped_passengers)
+                return dropped_passengers
+            return dispatch
+
+        def log_directions(method):
+            def record_elevator_state():
+                self.log_directions()
+                return method()
+            return record_elevator_state
+
+        self.__hooks.wrap(dispatcher, 'add_passenger_to_elevator_queue', log_assign)
+        self.__hooks.wrap(dispatcher, 'pick_up_passenger', log_pick_up)
+        self.__hooks.wrap(dispatcher, 'dispatch', log_drop_off)
+        self.__hooks.wrap(building, 'record_elevator_state', log_directions)
+
+        for elevator_name, elevator_passenger_queue in dispatcher.elevator_passenger_queue.items():
+            def log_defer(method, elevator_name=elevator_name):
+                def defer_passenger(passenger):
+                    self.events.append(Event(building.run_timer, DEFER, elevator_name, passenger.start_floor, str(passenger.id)))
+                    return method(passenger)
+                return defer_passenger
+
+            self.__hooks.wrap(elevator_passenger_queue, 'defer_passenger', log_defer)
+
+        # the directions the elevators have when the log is attached aren't changes
+        for elevator in dispatcher.elevators:
+            self.__directions[elevator.name] = self.__direction_detail(elevator)
+
+    def detach(self):
+        # removes the wrappers, so the building calls the methods it had before the log was attached again
+        self.__hooks.unwrap_all()
+
+    @staticmethod
+    def __direction_detail(elevator) -> str:
+        return '{0}/{1}'.format(direction_name(elevator.direction), direction_name(elevator.passenger_direction))
+
+    def log_directions(self):
+        for elevator in self.building.dispatcher.elevators:
+            detail = self.__direction_detail(elevator)
+            if detail != self.__directions[elevator.name]:
+                self.__directions[elevator.name] = detail
+                self.events.append(Event(self.building.run_timer, DIRECTION, elevator.name, elevator.at_floor(), detail=detail))
+
+    def canonical(self) -> List[Event]:
+        return canonical(self.events)
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict((kind, 0) for kind in KINDS)
+        for event in self.events:
+            counts[event.kind] += 1
+        return counts
+
+    def write_csv(self, path: str):
+        write_csv(self.canonical(), path)
@@ -0,0 +1,151 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Tuple
+
+from common.enums import Direction
+from src.passenger import Passenger
+
+
+class FloorQueue:
+
+    def __init__(self) -> None:
+        '''
+        Passengers grouped by floor, with the floors kept in a sorted index.
+
+        The index answers the lowest/highest floor in O(1) and the next floor in a direction in O(log n),
+        so the elevators don't have to scan every pending floor when they change direction.
+        Adding or removing a floor finds its place by bisection, but inserting into or deleting from the list
+        shifts the floors after it, so it is O(n) in the number of pending floors. n is at most the number of
+        floors of the building, so the shift is a short memmove, cheaper than a balanced tree would be here.
+        The end floors of the passengers can be kept sorted as well, so the furthest floor they go to is known in O(1),
+        and so can the pick-up and end floors of the passengers going each way, which the ReservationScheduler counts
+        the passengers riding past a floor with in O(log p). These lists hold a floor per passenger, not per floor, so
+        adding or removing a passenger shifts them in O(p), where p is the number of queued passengers. That can be
+        thousands in a lobby surge. Only the EtaModel and the ReservationScheduler ask for them, so they are built the
+        first time they are used, and only kept up to date from then on. The default schedulers don't pay for them.
+        '''
+        self.__passengers: Dict[int, List[Passenger]] = dict()
+        self.__floors: List[int] = []
+        self.__end_floors: List[int] = None     # sorted end floors of the passengers, None till they are asked for
+        # sorted pick-up and end floors of the passengers going each way, None till they are asked for
+        self.__floors_by_direction: Dict[Direction, Tuple[List[int], List[int]]] = None
+        self.__passenger_count = 0
+
+    def __len__(self) -> int:
+        return len(self.__floors)
+
+    def __contains__(self, floor: int) -> bool:
+        return floor in self.__passengers
+
+    def __iter__(self):
+        return iter(self.__floors)
+
+    def keys(self) -> List[int]:
+        # floors in ascending order
+        return list(self.__floors)
+
+    def values(self) -> List[List[Passenger]]:
+        return [self.__passengers[floor] for floor in self.__floors]
+
+    def items(self):
+        return [(floor, self.__passengers[floor]) for floor in self.__floors]
+
+    def get(self, floor: int, default=None):
+        return self.__passengers.get(floor, default)
+
+    def add(self, floor: int, passenger: Passenger):
+        self.extend(floor, [passenger])
+
+    def extend(self, floor: int, passengers: List[Passenger]):
+        if floor in self.__passengers:
+            self.__passengers[floor].extend(passengers)
+        else:
+            self.__passengers[floor] = list(passengers)
+            insort(self.__floors, floor)
+
+        if self.__end_floors is not None:
+            for passenger in passengers:
+                insort(self.__end_floors, passenger.end_floor)
+        if self.__floors_by_direction is not None:
+            for passenger in passengers:
+                pick_up_floors, end_floors = self.__floors_by_direction[passenger.direction()]
+                insort(pick_up_floors, passenger.start_floor)
+                insort(end_floors, passenger.end_floor)
+        self.__passenger_count += len(passengers)
+
+    def pop(self, floor: int) -> List[Passenger]:
+        passengers = self.__passengers.pop(floor)
+        del self.__floors[bisect_left(self.__floors, floor)]
+        if self.__end_floors is not None:
+            for passenger in passengers:
+                del self.__end_floors[bisect_left(self.__end_floors, passenger.end_floor)]
+        if self.__floors_by_direction is not None:
+            for passenger in passengers:
+                pick_up_floors, end_floors = self.__floors_by_direction[passenger.direction()]
+                del pick_up_floors[bisect_left(pick_up_floors, passenger.start_floor)]
+                del end_floors[bisect_left(end_floors, passenger.end_floor)]
+        self.__passenger_count -= len(passengers)
+        return passengers
+
+    def passenger_count(self) -> int:
+        return self.__passenger_count
+
+    def min_floor(self) -> int:
+        return self.__floors[0]
+
+    def max_floor(self) -> int:
+        return self.__floors[-1]
+
+    def __get_end_floors(self) -> List[int]:
+        if self.__end_floors is None:
+            self.__end_floors = sorted(passenger.end_floor for passengers in self.__passengers.values() for passenger in passengers)
+
+        return self.__end_floors
+
+    def min_end_floor(self) -> int:
+        return self.__get_end_floors()[0]
+
+    def max_end_floor(self) -> int:
+        return self.__get_end_floors()[-1]
+
+    def count_end_floors_beyond(self, floor: int, direction: Direction) -> int:
+        # number of passengers going beyond the floor in the direction, i.e. still on board when an elevator leaves it
+        end_floors = self.__get_end_floors()
+        if direction == Direction.UP:
+            return len(end_floors) - bisect_right(end_floors, floor)
+
+        return bisect_left(end_floors, floor)
+
+    def __get_floors_by_direction(self) -> Dict[Direction, Tuple[List[int], List[int]]]:
+        if self.__floors_by_direction is None:
+            self.__floors_by_direction = dict((direction, ([], [])) for direction in (Direction.UP, Direction.DOWN))
+            for passengers in self.__passengers.values():
+                for passenger in passengers:
+                    pick_up_floors, end_floors = self.__floors_by_direction[passenger.direction()]
+                    pick_up_floors.append(passenger.start_floor)
+                    end_floors.append(passenger.end_floor)
+            for pick_up_floors, end_floors in self.__floors_by_direction.values():
+                pick_up_floors.sort()
+                end_floors.sort()
+
+        return self.__floors_by_direction
+
+    def count_riding_past(self, floor: int, direction: Direction) -> int:
+        # number of passengers picked up at or before the floor in the direction that go beyond it.
+        # only the passengers going in the direction can, and those picked up beyond the floor also end beyond it,
+        # so they are the ones ending beyond the floor less the ones picked up beyond it
+        pick_up_floors, end_floors = self.__get_floors_by_direction()[direction]
+        if direction == Direction.UP:
+            return bisect_right(pick_up_floors, floor) - bisect_right(end_floors, floor)
+
+        return bisect_left(end_floors, floor) - bisect_left(pick_up_floors, floor)
+
+    def next_floor(self, floor: int, direction: Direction):
+        # the nearest floor beyond the given floor in the direction, None if there is none
+        if direction == Direction.UP:
+            i = bisect_right(self.__floors, floor)
+            return self.__floors[i] if i < len(self.__floors) else None
+        elif direction == Direction.DOWN:
+            i = bisect_left(self.__floors, floor)
+            return self.__floors[i - 1] if i > 0 else None
+
+        return None
@@ -0,0 +1,55 @@
+from typing import Callable, List, Tuple
+
+# value of an attribute that wasn't set on the instance itself
+MISSING = object()
+
+
+class MethodHook:
+    __slots__ = ('method', 'wrapped', 'previous', 'active')
+
+    def __init__(self, method: Callable, wrapped: Callable, previous) -> None:
+        self.method = method        # the method that was wrapped
+        self.wrapped = wrapped      # the method wrapped by the hook
+        self.previous = previous    # what the instance attribute was before the hook was set
+        self.active = True
+
+    def __call__(self, *args, **kwargs):
+        return (self.wrapped if self.active else self.method)(*args, **kwargs)
+
+
+class MethodHooks:
+
+    def __init__(self) -> None:
+        '''
+        Wraps methods on object instances, e.g. to time or log them, and removes the wrappers again.
+
+        Removing a hook sets the instance attribute back to exactly what it was before, which is another hook if
+        several objects (e.g. a Profiler and an EventLog) wrapped the same method. If a hook is removed while another
+        one still wraps it, it only stops wrapping the method, and is dropped once the hook wrapping it is removed.
+        '''
+        # (owner, method name, hook) of every wrapped method
+        self.__hooks: List[Tuple[object, str, MethodHook]] = []
+
+    def wrap(self, owner, method_name: str, wrapper: Callable[[Callable], Callable]):
+        method = getattr(owner, method_name)
+        hook = MethodHook(method, wrapper(method), vars(owner).get(method_name, MISSING))
+        setattr(owner, method_name, hook)
+        self.__hooks.append((owner, method_name, hook))
+
+    def unwrap_all(self):
+        for owner, method_name, hook in reversed(self.__hooks):
+            hook.active = False
+            if vars(owner).get(method_name) is not hook:
+                # another hook wraps this one, this one is dropped when that one is removed
+                continue
+
+            previous = hook.previous
+            while isinstance(previous, MethodHook) and not previous.active:
+                previous = previous.previous
+
+            if previous is MISSING:
+                delattr(owner, method_name)
+            else:
+                setattr(owner, method_name, previous)
+
+        self.__hooks = []
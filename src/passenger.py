@@ -1,6 +1,10 @@
 from common.enums import Direction
 
 class Passenger:
+    # passengers are created for every request, so they don't get a per-instance __dict__
+    __slots__ = ('id', 'start_floor', 'end_floor', 'start_time', 'pick_up_time', 'end_time', 'assigned_elevator', 'is_trip_complete', 'index',
+                 'reschedule_count')
+
     def __init__(self, id: str, start_floor: int, end_floor: int, start_time: int) -> None:
         self.id = id
         self.start_floor = start_floor
@@ -10,6 +14,8 @@ class Passenger:
         self.end_time = None
         self.assigned_elevator = None
         self.is_trip_complete = False
+        self.index = None   # row of the passenger in the PassengerStore
+        self.reschedule_count = 0   # times a full elevator couldn't take the passenger and it was scheduled again
 
     def __str__(self) -> str:
         return 'Passenger: {0}; Trip Completed: {1}; Elevator: {2}; Duration: {3} (Wait Time: {4})'.format(
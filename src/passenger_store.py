@@ -0,0 +1,134 @@
+from typing import Dict, List
+
+import numpy as np
+
+from src.passenger import Passenger
+
+# time of a passenger that wasn't picked up / dropped off yet
+MISSING_TIME = -1
+
+
+class PassengerStore:
+
+    def __init__(self, capacity: int = 1024) -> None:
+        '''
+        Columnar log of all passengers of a run.
+
+        The floors and timings are kept in preallocated int64 arrays with one entry per passenger, which are doubled
+        when they are full, like the ElevatorStateRecorder does. A passenger is added when its request comes in and
+        completed when it is dropped off, so the Passenger objects only have to be kept alive while they are queued
+        or on board, and the statistics are computed straight from the arrays.
+
+        discard_completed_before drops the oldest completed passengers, e.g. for a building that runs indefinitely.
+        The rows of the remaining passengers move up, but their indexes stay the same.
+        '''
+        self.ids: List[str] = []
+        self.__columns = dict((name, np.full(max(capacity, 1), MISSING_TIME, dtype=np.int64))
+                              for name in ['StartFloor', 'EndFloor', 'StartTime', 'PickUpTime', 'EndTime', 'Reschedules'])
+        self.__size = 0
+        self.discarded = 0     # passengers dropped by discard_completed_before, the index of the first row
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __getstate__(self):
+        # only pickle the logged passengers, not the spare capacity
+        state = self.__dict__.copy()
+        state['_PassengerStore__columns'] = dict((name, values[:max(self.__size, 1)].copy()) for name, values in self.__columns.items())
+        return state
+
+    def __reserve(self, rows: int):
+        capacity = self.__columns['StartTime'].shape[0]
+        if self.__size + rows <= capacity:
+            return
+
+        while capacity < self.__size + rows:
+            capacity *= 2
+
+        for name, values in self.__columns.items():
+            column = np.full(capacity, MISSING_TIME, dtype=np.int64)
+            column[:self.__size] = values[:self.__size]
+            self.__columns[name] = column
+
+    def add(self, passengers: List[Passenger]):
+        self.__reserve(len(passengers))
+        for passenger in passengers:
+            i = self.__size
+            passenger.index = self.discarded + i
+            self.ids.append(passenger.id)
+            self.__columns['StartFloor'][i] = passenger.start_floor
+            self.__columns['EndFloor'][i] = passenger.end_floor
+            self.__columns['StartTime'][i] = passenger.start_time
+            self.__size += 1
+
+    def complete(self, passengers: List[Passenger]):
+        # records the timings and re-schedule counts of passengers that were dropped off
+        for passenger in passengers:
+            i = passenger.index - self.discarded
+            self.__columns['PickUpTime'][i] = passenger.pick_up_time
+            self.__columns['EndTime'][i] = passenger.end_time
+            self.__columns['Reschedules'][i] = passenger.reschedule_count
+
+    def discard_completed_before(self, end_time: int):
+        '''
+        drops the passengers that completed their trip before the end time, up to the first one that didn't.
+        only the oldest passengers are dropped, so a passenger that is still waiting keeps the ones after it.
+        the capacity is kept, so a store that is trimmed regularly stops growing.
+        '''
+        end_times = self.column('EndTime')
+        completed = (end_times != MISSING_TIME) & (end_times < end_time)
+        discarded = len(completed) if completed.all() else int(np.argmin(completed))
+        if not discarded:
+            return
+
+        for values in self.__columns.values():
+            values[:self.__size - discarded] = values[discarded:self.__size]
+            # the rows of new passengers start out missing their timings
+            values[self.__size - discarded:self.__size] = MISSING_TIME
+        del self.ids[:discarded]
+        self.__size -= discarded
+        self.discarded += discarded
+
+    def column(self, name: str) -> np.ndarray:
+        # view of a column, without copying it
+        return self.__columns[name][:self.__size]
+
+    def trip_completed(self) -> np.ndarray:
+        return self.column('EndTime') != MISSING_TIME
+
+    def wait_times(self) -> np.ndarray:
+        return self.column('PickUpTime') - self.column('StartTime') + 1
+
+    def total_times(self) -> np.ndarray:
+        return self.column('EndTime') - self.column('StartTime') + 1
+
+    def stat_columns(self) -> Dict[str, np.ndarray]:
+        # columns of the passenger statistics, for the passengers that completed their trip
+        completed = self.trip_completed()
+        return dict(PickUpTime=self.column('PickUpTime')[completed], WaitTime=self.wait_times()[completed], TotalTime=self.total_times()[completed])
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        '''
+        min, max and mean of the passenger statistics, e.g. stats()['WaitTime']['mean'].
+        The stats are None when no passenger has completed its trip.
+        '''
+        stats = dict()
+        for name, values in self.stat_columns().items():
+            stats[name] = dict(min=values.min(), max=values.max(), mean=values.mean()) if len(values) else None
+
+        return stats
+
+    def to_dataframe(self):
+        import pandas as pd
+        completed = self.trip_completed()
+        picked_up = self.column('PickUpTime') != MISSING_TIME
+
+        def optional(values: np.ndarray, mask: np.ndarray):
+            # missing timings are left empty, like None was in the passenger table
+            return values if mask.all() else pd.Series(values).where(mask)
+
+        return pd.DataFrame(dict(
+            Name=self.ids, StartTime=self.column('StartTime'), PickUpTime=optional(self.column('PickUpTime'), picked_up),
+            EndTime=optional(self.column('EndTime'), completed), WaitTime=optional(self.wait_times(), picked_up),
+            TotalTime=optional(self.total_times(), completed), TripCompleted=completed, Reschedules=optional(self.column('Reschedules'), completed)
+        ), columns=['Name', 'StartTime', 'PickUpTime', 'EndTime', 'WaitTime', 'TotalTime', 'TripCompleted', 'Reschedules'])
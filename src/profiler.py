@@ -0,0 +1,95 @@
+from src.hooks import MethodHooks
+
+import time
+from typing import Callable, Dict, List
+
+# phase -> (attribute of the building holding the object, method timed as the phase)
+PHASES = dict(
+    requests=(None, 'get_next_scheduled_requests'),
+    schedule_elevator=('scheduler', 'schedule_elevator'),
+    dispatch=('dispatcher', 'dispatch'),
+    update_elevator_status=('dispatcher', 'update_elevator_status'),
+    move_elevators=('dispatcher', 'move_elevators'),
+    record_elevator_state=(None, 'record_elevator_state'),
+    record_elevator_state_span=(None, 'record_elevator_state_span'),
+    ticks_to_next_event=(None, 'ticks_to_next_event'),
+)
+
+# hook called after every call of a phase with the phase name and the wall time of the call in seconds
+PhaseHook = Callable[[str, float], None]
+
+
+class Profiler:
+
+    def __init__(self, hooks: List[PhaseHook] = None) -> None:
+        '''
+        Records the calls and wall time of each phase of the simulation loop, and the passengers moved and rescheduled.
+
+        The phases are timed by wrapping the methods on the building, dispatcher and scheduler instances when the
+        profiler is attached, so a building that isn't profiled runs the loop without any instrumentation at all.
+        Wall times are inclusive, e.g. dispatch includes update_elevator_status and the reschedules in schedule_elevator.
+        '''
+        self.hooks = list(hooks or [])
+        self.calls = dict((phase, 0) for phase in PHASES)
+        self.wall_time = dict((phase, 0.0) for phase in PHASES)
+        self.building = None
+        self.__hooks = MethodHooks()
+        self.__start_time = None
+        self.run_time = 0.0
+
+    def add_hook(self, hook: PhaseHook):
+        self.hooks.append(hook)
+
+    def __timed(self, phase: str) -> Callable[[Callable], Callable]:
+        def timed(method: Callable) -> Callable:
+            def timed_method(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    wall_time = time.perf_counter() - start_time
+                    self.calls[phase] += 1
+                    self.wall_time[phase] += wall_time
+                    for hook in self.hooks:
+                        hook(phase, wall_time)
+
+            return timed_method
+        return timed
+
+    def attach(self, building):
+        self.building = building
+        for phase, (owner, method_name) in PHASES.items():
+            target = building if owner is None else getattr(building, owner)
+            self.__hooks.wrap(target, method_name, self.__timed(phase))
+
+    def detach(self):
+        # removes the wrappers, so the building calls the methods it had before the profiler was attached again
+        self.__hooks.unwrap_all()
+
+    def start(self):
+        self.__start_time = time.perf_counter()
+
+    def stop(self):
+        self.run_time += time.perf_counter() - self.__start_time
+
+    def phase_stats(self) -> List[Dict]:
+        return [dict(Phase=phase, Calls=self.calls[phase], WallTime=self.wall_time[phase],
+                     Share=self.wall_time[phase] / self.run_time if self.run_time else 0.0) for phase in PHASES]
+
+    def totals(self) -> Dict:
+        dispatcher = self.building.dispatcher
+        ticks = self.building.run_timer
+        return dict(RunTime=self.run_time, Ticks=ticks, TicksPerSecond=ticks / self.run_time if self.run_time else 0.0,
+                    PickedUp=dispatcher.picked_up_count, DroppedOff=dispatcher.dropped_off_count,
+                    Reschedules=dispatcher.reschedule_count, Deferred=dispatcher.deferred_count)
+
+    def report(self) -> str:
+        lines = ['{0:<28}{1:>10}{2:>14}{3:>9}'.format('Phase', 'Calls', 'WallTime(s)', 'Share')]
+        for row in self.phase_stats():
+            lines.append('{Phase:<28}{Calls:>10}{WallTime:>14.4f}{Share:>9.1%}'.format(**row))
+
+        lines.append('')
+        for name, value in self.totals().items():
+            lines.append('{0:<28}{1:>10}'.format(name, round(value, 4) if isinstance(value, float) else value))
+
+        return '\n'.join(lines)
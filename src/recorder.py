@@ -0,0 +1,76 @@
+from typing import List
+
+import numpy as np
+
+
+class ElevatorStateRecorder:
+
+    def __init__(self, elevator_names: List[str], capacity: int = 1024) -> None:
+        '''
+        Records the floor of each elevator at every run-time state.
+
+        The states are stored in a preallocated int32 array with one row per tick, where the first column is
+        the run timer and the following columns are the floors of the elevators. When the array is full,
+        its capacity is doubled, so recording a state is amortised O(1).
+        '''
+        self.columns = ['RunTimer'] + ['Elevator {}'.format(name) for name in elevator_names]
+        self.__states = np.empty((max(capacity, 1), len(self.columns)), dtype=np.int32)
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __getstate__(self):
+        # only pickle the recorded states, not the spare capacity
+        state = self.__dict__.copy()
+        state['_ElevatorStateRecorder__states'] = self.__states[:max(self.__size, 1)].copy()
+        return state
+
+    def __reserve(self, rows: int):
+        capacity = self.__states.shape[0]
+        if self.__size + rows <= capacity:
+            return
+
+        while capacity < self.__size + rows:
+            capacity *= 2
+
+        states = np.empty((capacity, len(self.columns)), dtype=np.int32)
+        states[:self.__size] = self.__states[:self.__size]
+        self.__states = states
+
+    def record(self, run_timer: int, floors: List[int]):
+        self.__reserve(1)
+        row = self.__states[self.__size]
+        row[0] = run_timer
+        row[1:] = floors
+        self.__size += 1
+
+    def record_span(self, run_timer: int, floors: List[int], steps: List[int], ticks: int):
+        '''
+        records the states for the next ticks, in which every elevator moves steps[i] floors per tick
+        (+1 for UP, -1 for DOWN and 0 for an idle elevator), starting from floors[i].
+        '''
+        self.__reserve(ticks)
+        elapsed = np.arange(1, ticks + 1, dtype=np.int32)[:, None]
+        span = self.__states[self.__size: self.__size + ticks]
+        span[:, 0] = run_timer + elapsed[:, 0] - 1
+        span[:, 1:] = np.asarray(floors, dtype=np.int32) + elapsed * np.asarray(steps, dtype=np.int32)
+        self.__size += ticks
+
+    def discard_before(self, run_timer: int):
+        '''
+        drops the states recorded before the run timer, e.g. to bound the memory of a building that runs indefinitely.
+        the capacity is kept, so a recorder that is trimmed regularly stops growing.
+        '''
+        discarded = int(np.searchsorted(self.__states[:self.__size, 0], run_timer))
+        if discarded:
+            self.__states[:self.__size - discarded] = self.__states[discarded:self.__size]
+            self.__size -= discarded
+
+    def states(self) -> np.ndarray:
+        # view of the recorded states, without copying them
+        return self.__states[:self.__size]
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.states(), columns=self.columns)
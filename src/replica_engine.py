@@ -0,0 +1,386 @@
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+from common.enums import Direction
+from src.event_log import DROP_OFF, PICK_UP, Event
+from src.passenger_store import MISSING_TIME
+from src.stats import PERCENTILES
+from src.vectorized_scheduler import NO_DIRECTION, get_min_trip_elevator_index, get_pick_up_times
+
+UP = Direction.UP.value
+DOWN = Direction.DOWN.value
+
+# states of a passenger
+NOT_ARRIVED, QUEUED, ON_BOARD, DROPPED_OFF = range(4)
+
+# dispatch queues, relative to the queue slot that is the CURRENT queue of an elevator (see ElevatorPassengerQueue)
+CURRENT, NEXT, FUTURE = range(3)
+
+# how often (in ticks) the window of passengers that can be queued or on board is moved up
+WINDOW_UPDATE_TICKS = 64
+
+
+class ReplicaEngine:
+
+    def __init__(self, no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int, replicas: List[Iterable[Dict]]) -> None:
+        '''
+        Runs many replicas of the same building, each with its own requests (e.g. traffic with different seeds), as
+        NumPy arrays that are advanced together one tick at a time.
+
+        The elevators of all replicas are (replicas, elevators) arrays of floors, directions, pick-up floors and loads,
+        with the passengers on board counted by end floor and the CURRENT, NEXT and FUTURE queues counted by pick-up
+        floor. The passengers are (replicas, passengers) arrays. Every tick applies the rules of Building.step to all
+        replicas at once: the elevators move, the requests that arrived are scheduled with the Scheduler's pick-up time
+        rules and tie-breaking, and the elevators drop off and pick up passengers and switch queues like
+        Dispatcher.dispatch. Only the loops over the elevators, and over the calls and re-schedules of a tick (which
+        depend on each other) are Python loops, so the cost of a tick hardly grows with the number of replicas.
+
+        Every replica gives the same pick-up and drop-off times as a Building with the Scheduler and the same requests.
+        '''
+        self.no_of_elevators = no_of_elevators
+        self.total_floors = no_of_floors
+        self.max_passengers = max_passengers_per_elevator
+
+        # passengers are numbered in the order of their arrival, like the RequestStream issues them
+        requests = [sorted(replica, key=lambda req: req['time']) for replica in replicas]
+        self.no_of_replicas = len(requests)
+        self.no_of_passengers = np.array([len(replica) for replica in requests], dtype=np.int64)
+        shape = (self.no_of_replicas, max(self.no_of_passengers.max(initial=0), 1))
+
+        self.ids = [[req['id'] for req in replica] for replica in requests]
+        self.start_floor = np.zeros(shape, dtype=np.int64)
+        self.end_floor = np.zeros(shape, dtype=np.int64)
+        self.start_time = np.full(shape, MISSING_TIME, dtype=np.int64)
+        for r, replica in enumerate(requests):
+            self.start_floor[r, :len(replica)] = [req['source'] for req in replica]
+            self.end_floor[r, :len(replica)] = [req['dest'] for req in replica]
+            self.start_time[r, :len(replica)] = [req['time'] for req in replica]
+
+        self.direction_of_passenger = np.where(self.end_floor < self.start_floor, DOWN, UP).astype(np.int8)
+        self.pick_up_time = np.full(shape, MISSING_TIME, dtype=np.int64)
+        self.end_time = np.full(shape, MISSING_TIME, dtype=np.int64)
+        self.state = np.full(shape, NOT_ARRIVED, dtype=np.int8)
+        self.elevator = np.full(shape, -1, dtype=np.int64)     # index of the assigned elevator
+        self.slot = np.zeros(shape, dtype=np.int64)             # queue slot the passenger is queued in
+        self.queued_at = np.zeros(shape, dtype=np.int64)        # order in which the passengers were queued
+        self.__sequence = 0
+
+        elevators = (self.no_of_replicas, no_of_elevators)
+        self.floor = np.ones(elevators, dtype=np.int64)
+        self.direction = np.full(elevators, NO_DIRECTION, dtype=np.int8)
+        self.passenger_direction = np.full(elevators, NO_DIRECTION, dtype=np.int8)
+        self.pick_up_floor = np.ones(elevators, dtype=np.int64)
+        self.is_idle = np.ones(elevators, dtype=bool)
+        self.load = np.zeros(elevators, dtype=np.int64)
+        self.current_slot = np.zeros(elevators, dtype=np.int64)
+        self.on_board = np.zeros(elevators + (no_of_floors + 1,), dtype=np.int32)       # by end floor
+        self.queued = np.zeros(elevators + (3, no_of_floors + 1), dtype=np.int32)      # by queue slot and pick-up floor
+        self.queue_length = np.zeros(elevators + (3,), dtype=np.int32)
+
+        self.run_timer = 0
+        self.finish_time = np.full(self.no_of_replicas, MISSING_TIME, dtype=np.int64)
+        self.reschedule_count = np.zeros(self.no_of_replicas, dtype=np.int64)
+        self.deferred_count = np.zeros(self.no_of_replicas, dtype=np.int64)
+        self.__next_arrival = np.zeros(self.no_of_replicas, dtype=np.int64)
+        # passengers before the window are dropped off in all replicas, passengers after it haven't arrived in any
+        self.__window_start = 0
+        self.__window_end = 0
+
+    @classmethod
+    def from_traffic(cls, traffic: Callable[..., Iterable[Dict]], seeds: Iterable[int], no_of_elevators: int, no_of_floors: int,
+                     max_passengers_per_elevator: int, **traffic_kwargs) -> 'ReplicaEngine':
+        # one replica per seed, with the requests of traffic(seed, no_of_floors, **traffic_kwargs), e.g. src.traffic.up_peak
+        replicas = [list(traffic(seed, no_of_floors, **traffic_kwargs)) for seed in seeds]
+        return cls(no_of_elevators, no_of_floors, max_passengers_per_elevator, replicas)
+
+    def __update_pick_up_floor(self, rows: np.ndarray, elevators, floors: np.ndarray, directions: np.ndarray):
+        pick_up_floor = self.pick_up_floor[rows, elevators]
+        self.pick_up_floor[rows, elevators] = np.where(directions == UP, np.minimum(pick_up_floor, floors),
+                                                       np.where(directions == DOWN, np.maximum(pick_up_floor, floors), pick_up_floor))
+
+    def __update_elevator_direction(self, rows: np.ndarray, elevators, floors: np.ndarray, directions: np.ndarray):
+        at_floor = self.floor[rows, elevators]
+        self.direction[rows, elevators] = np.where((directions == NO_DIRECTION) | (floors == at_floor), directions,
+                                                   np.where(floors < at_floor, DOWN, UP))
+
+    def __enqueue(self, rows: np.ndarray, elevators, passengers: np.ndarray, queues, floors: np.ndarray):
+        slots = (self.current_slot[rows, elevators] + queues) % 3
+        self.state[rows, passengers] = QUEUED
+        self.slot[rows, passengers] = slots
+        self.queued_at[rows, passengers] = self.__sequence + np.arange(len(rows))
+        self.__sequence += len(rows)
+        np.add.at(self.queued, (rows, elevators, slots, floors), 1)
+        np.add.at(self.queue_length, (rows, elevators, slots), 1)
+
+    def __schedule(self, rows: np.ndarray, passengers: np.ndarray):
+        # Scheduler.schedule_elevator and Dispatcher.add_passenger_to_elevator_queue, for one passenger of each of the rows
+        floors = self.start_floor[rows, passengers]
+        directions = self.direction_of_passenger[rows, passengers]
+        is_idle = self.is_idle[rows]
+        pick_up_times = get_pick_up_times(self.floor[rows], self.direction[rows], self.passenger_direction[rows], is_idle,
+                                          self.load[rows] == self.max_passengers, self.total_floors, floors[:, None], directions[:, None])
+        elevators = get_min_trip_elevator_index(pick_up_times, is_idle)
+        self.elevator[rows, passengers] = elevators
+
+        idle = self.is_idle[rows, elevators]
+        if idle.any():
+            idle_rows, idle_elevators = rows[idle], elevators[idle]
+            self.__update_pick_up_floor(idle_rows, idle_elevators, floors[idle], directions[idle])
+            self.__update_elevator_direction(idle_rows, idle_elevators, floors[idle], directions[idle])
+            self.passenger_direction[idle_rows, idle_elevators] = directions[idle]
+            self.current_slot[idle_rows, idle_elevators] = (self.current_slot[idle_rows, idle_elevators] + 1) % 3
+            self.is_idle[idle_rows, idle_elevators] = False
+
+        # ElevatorPassengerQueue.add_to_queue
+        at_floor = self.floor[rows, elevators]
+        passenger_direction = self.passenger_direction[rows, elevators]
+        same_direction = directions == passenger_direction
+        moving_in_pass_direction = self.direction[rows, elevators] == passenger_direction
+        is_ahead = np.where(passenger_direction == UP, at_floor <= floors, at_floor >= floors)
+        queues = np.where(same_direction, np.where(moving_in_pass_direction & ~is_ahead, FUTURE, CURRENT), NEXT)
+
+        moving_to_pick_up = same_direction & ~moving_in_pass_direction
+        if moving_to_pick_up.any():
+            self.__update_pick_up_floor(rows[moving_to_pick_up], elevators[moving_to_pick_up], floors[moving_to_pick_up], directions[moving_to_pick_up])
+
+        self.__enqueue(rows, elevators, passengers, queues, floors)
+
+    def __schedule_arrivals(self):
+        # the requests of a tick are scheduled one after the other, the k-th request of all replicas at once
+        while True:
+            next_arrival = self.__next_arrival
+            rows = np.flatnonzero(next_arrival < self.no_of_passengers)
+            rows = rows[self.start_time[rows, next_arrival[rows]] <= self.run_timer]
+            if not len(rows):
+                break
+
+            self.__schedule(rows, next_arrival[rows])
+            next_arrival[rows] += 1
+
+        self.__window_end = max(self.__window_end, int(self.__next_arrival.max(initial=0)))
+
+    def __passengers_at(self, mask: np.ndarray, order: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        # for each row the first counts.max() passengers of the window matching the mask, sorted by order
+        ranked = np.argsort(np.where(mask, order, np.iinfo(np.int64).max), axis=1, kind='stable')
+        return ranked[:, :counts.max(initial=0)] + self.__window_start
+
+    def __drop_off(self, rows: np.ndarray, elevators: np.ndarray, floors: np.ndarray):
+        self.load[rows, elevators] -= self.on_board[rows, elevators, floors]
+        self.on_board[rows, elevators, floors] = 0
+
+        window = slice(self.__window_start, self.__window_end)
+        mask = (self.state[rows, window] == ON_BOARD) & (self.elevator[rows, window] == elevators[:, None]) & \
+               (self.end_floor[rows, window] == floors[:, None])
+        dropped, passengers = np.nonzero(mask)
+        self.state[rows[dropped], passengers + self.__window_start] = DROPPED_OFF
+        self.end_time[rows[dropped], passengers + self.__window_start] = self.run_timer
+
+    def __pick_up(self, rows: np.ndarray, elevators: np.ndarray, floors: np.ndarray, reschedule: bool):
+        '''
+        pops the passengers waiting at the floors from the CURRENT queue of the elevators, and picks them up in the
+        order they were queued till the elevator is full. the rest are re-scheduled, or deferred to the FUTURE queue.
+        '''
+        slots = self.current_slot[rows, elevators]
+        counts = self.queued[rows, elevators, slots, floors].astype(np.int64)
+        self.queued[rows, elevators, slots, floors] = 0
+        self.queue_length[rows, elevators, slots] -= counts.astype(np.int32)
+
+        window = slice(self.__window_start, self.__window_end)
+        mask = (self.state[rows, window] == QUEUED) & (self.elevator[rows, window] == elevators[:, None]) & \
+               (self.slot[rows, window] == slots[:, None]) & (self.start_floor[rows, window] == floors[:, None])
+        passengers = self.__passengers_at(mask, self.queued_at[rows, window], counts)
+
+        picked_up = np.minimum(counts, self.max_passengers - self.load[rows, elevators])
+        picked, ranks = np.nonzero(np.arange(passengers.shape[1]) < picked_up[:, None])
+        picked_rows, picked_passengers = rows[picked], passengers[picked, ranks]
+        self.state[picked_rows, picked_passengers] = ON_BOARD
+        self.pick_up_time[picked_rows, picked_passengers] = self.run_timer
+        np.add.at(self.on_board, (picked_rows, elevators[picked], self.end_floor[picked_rows, picked_passengers]), 1)
+        self.load[rows, elevators] += picked_up
+
+        # the elevator is full, the passengers that are left are handled one after the other
+        for rank in range(int(picked_up.min()), passengers.shape[1]):
+            left = np.flatnonzero((rank >= picked_up) & (rank < counts))
+            if not len(left):
+                continue
+
+            if reschedule:
+                self.reschedule_count[rows[left]] += 1
+                self.__schedule(rows[left], passengers[left, rank])
+            else:
+                self.deferred_count[rows[left]] += 1
+                self.__enqueue(rows[left], elevators[left], passengers[left, rank], FUTURE, floors[left])
+
+    def __update_elevator_status(self, rows: np.ndarray, elevators: np.ndarray):
+        # Dispatcher.update_elevator_status: an elevator that served its CURRENT queue switches to the NEXT queue,
+        # otherwise to the FUTURE queue, otherwise it is idle
+        done = (self.load[rows, elevators] == 0) & (self.queue_length[rows, elevators, self.current_slot[rows, elevators]] == 0)
+        rows, elevators = rows[done], elevators[done]
+        for queue in (NEXT, FUTURE):
+            if not len(rows):
+                return
+
+            self.current_slot[rows, elevators] = (self.current_slot[rows, elevators] + 1) % 3
+            has_passengers = self.queue_length[rows, elevators, self.current_slot[rows, elevators]] > 0
+            switching_rows, switching_elevators = rows[has_passengers], elevators[has_passengers]
+            current = self.queued[switching_rows, switching_elevators, self.current_slot[switching_rows, switching_elevators]] > 0
+            min_floor = np.argmax(current, axis=1)
+            max_floor = current.shape[1] - 1 - np.argmax(current[:, ::-1], axis=1)
+            is_going_up = self.direction[switching_rows, switching_elevators] == UP
+
+            if queue == NEXT:
+                # move towards the first pick-up, and pick up the passengers from there on the way back
+                pick_up_floor = np.where(is_going_up, max_floor, min_floor)
+                passenger_direction = np.where(is_going_up, DOWN, UP).astype(np.int8)
+                self.__update_elevator_direction(switching_rows, switching_elevators, pick_up_floor, passenger_direction)
+            else:
+                # turn around, go to the furthest pick-up and pick up the passengers from there
+                pick_up_floor = np.where(is_going_up, min_floor, max_floor)
+                passenger_direction = np.where(is_going_up, UP, DOWN).astype(np.int8)
+                self.direction[switching_rows, switching_elevators] = np.where(is_going_up, DOWN, UP)
+
+            self.passenger_direction[switching_rows, switching_elevators] = passenger_direction
+            self.__update_pick_up_floor(switching_rows, switching_elevators, pick_up_floor, passenger_direction)
+            rows, elevators = rows[~has_passengers], elevators[~has_passengers]
+
+        self.is_idle[rows, elevators] = True
+        self.direction[rows, elevators] = NO_DIRECTION
+        self.passenger_direction[rows, elevators] = NO_DIRECTION
+
+    def __is_picking_up(self, rows: np.ndarray, elevators: np.ndarray) -> np.ndarray:
+        # turns the elevators at their pick-up floor, like is_moving_in_pass_direction, and returns for each elevator
+        # whether it picks up passengers from its CURRENT queue at its floor
+        floors = self.floor[rows, elevators]
+        slots = self.current_slot[rows, elevators]
+        has_current = self.queue_length[rows, elevators, slots] > 0
+        turning = has_current & (floors == self.pick_up_floor[rows, elevators]) & \
+                  (self.direction[rows, elevators] != self.passenger_direction[rows, elevators])
+        self.direction[rows[turning], elevators[turning]] = self.passenger_direction[rows[turning], elevators[turning]]
+
+        return has_current & (self.direction[rows, elevators] == self.passenger_direction[rows, elevators]) & \
+               (self.queued[rows, elevators, slots, floors] > 0)
+
+    def __dispatch_elevators(self, rows: np.ndarray, elevators: np.ndarray):
+        # the first loop of Dispatcher.dispatch, for distinct (row, elevator) pairs of non-idle elevators
+        floors = self.floor[rows, elevators]
+        dropping_off = self.on_board[rows, elevators, floors] > 0
+        if dropping_off.any():
+            self.__drop_off(rows[dropping_off], elevators[dropping_off], floors[dropping_off])
+
+        picking_up = self.__is_picking_up(rows, elevators)
+        if picking_up.any():
+            self.__pick_up(rows[picking_up], elevators[picking_up], floors[picking_up], reschedule=True)
+
+        self.__update_elevator_status(rows, elevators)
+
+    def __dispatch(self):
+        '''
+        the elevators of a replica only depend on each other within a tick when a full elevator re-schedules passengers,
+        which changes the queues of the elevators after it. so the elevators of all replicas in which no elevator would
+        re-schedule are dispatched at once, and the elevators of the other replicas one after the other, like the Dispatcher.
+        '''
+        rows, elevators = np.nonzero(~self.is_idle)
+        floors = self.floor[rows, elevators]
+        free = self.max_passengers - self.load[rows, elevators] + self.on_board[rows, elevators, floors]
+        # this only checks the state at the start of the tick, so the elevators aren't turned yet
+        current = self.queued[rows, elevators, self.current_slot[rows, elevators], floors]
+        is_rescheduling = np.zeros(self.no_of_replicas, dtype=bool)
+        is_rescheduling[rows[current > free]] = True
+
+        independent = ~is_rescheduling[rows]
+        if independent.any():
+            self.__dispatch_elevators(rows[independent], elevators[independent])
+
+        rescheduling_rows = np.flatnonzero(is_rescheduling)
+        for elevator in range(self.no_of_elevators):
+            rows = rescheduling_rows[~self.is_idle[rescheduling_rows, elevator]]
+            if len(rows):
+                self.__dispatch_elevators(rows, np.full(len(rows), elevator))
+
+        # Dispatcher.pick_up_passengers_left_behind, which only defers passengers to the queue of the same elevator
+        rows, elevators = np.nonzero(~self.is_idle)
+        floors = self.floor[rows, elevators]
+        left_behind = (self.direction[rows, elevators] == self.passenger_direction[rows, elevators]) & \
+                      (self.queued[rows, elevators, self.current_slot[rows, elevators], floors] > 0)
+        if left_behind.any():
+            self.__pick_up(rows[left_behind], elevators[left_behind], floors[left_behind], reschedule=False)
+
+    def __update_window(self):
+        # moves the start of the window up to the first passenger that is still queued or on board in any replica
+        window = slice(self.__window_start, self.__window_end)
+        is_active = ((self.state[:, window] == QUEUED) | (self.state[:, window] == ON_BOARD)).any(axis=0)
+        first_active = self.__window_start + (int(np.argmax(is_active)) if is_active.any() else len(is_active))
+        self.__window_start = min(first_active, int(self.__next_arrival.min(initial=self.__window_end)))
+
+    def is_finished(self) -> np.ndarray:
+        # for each replica, whether all its requests are completed and its elevators are idle
+        return (self.__next_arrival == self.no_of_passengers) & self.is_idle.all(axis=1)
+
+    def step(self):
+        # Building.step for all replicas: moves the elevators, schedules the requests that arrived and dispatches
+        moving = ~self.is_idle
+        self.floor += np.where(moving & (self.direction == UP), 1, 0) - np.where(moving & (self.direction == DOWN), 1, 0)
+
+        self.__schedule_arrivals()
+        self.__dispatch()
+        self.run_timer += 1
+
+        finished = self.is_finished() & (self.finish_time == MISSING_TIME)
+        self.finish_time[finished] = self.run_timer
+        if self.run_timer % WINDOW_UPDATE_TICKS == 0:
+            self.__update_window()
+
+    def run(self, max_ticks: int = None) -> bool:
+        # runs till all replicas are finished and returns True, like Building.schedule, or returns False after max_ticks
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            self.step()
+            ticks += 1
+            if self.is_finished().all():
+                return True
+
+        return False
+
+    def wait_times(self) -> np.ndarray:
+        # (replicas, passengers) wait times like Passenger.total_wait_time, MISSING_TIME for passengers not picked up
+        return np.where(self.pick_up_time != MISSING_TIME, self.pick_up_time - self.start_time + 1, MISSING_TIME)
+
+    def total_times(self) -> np.ndarray:
+        return np.where(self.end_time != MISSING_TIME, self.end_time - self.start_time + 1, MISSING_TIME)
+
+    def events(self, replica: int) -> List[Event]:
+        '''
+        pick-up and drop-off events of a replica, like the EventLog of a Building records them (the elevators are
+        named by their number from 1). the other kinds of events aren't tracked by the engine.
+        '''
+        events = []
+        for i in range(self.no_of_passengers[replica]):
+            elevator = str(self.elevator[replica, i] + 1)
+            if self.pick_up_time[replica, i] != MISSING_TIME:
+                events.append(Event(int(self.pick_up_time[replica, i]), PICK_UP, elevator, int(self.start_floor[replica, i]), str(self.ids[replica][i])))
+            if self.end_time[replica, i] != MISSING_TIME:
+                events.append(Event(int(self.end_time[replica, i]), DROP_OFF, elevator, int(self.end_floor[replica, i]), str(self.ids[replica][i])))
+
+        return events
+
+    @staticmethod
+    def distribution_stats(values: np.ndarray) -> Dict:
+        if not len(values):
+            return dict(Count=0, Min=None, Max=None, Mean=None, **dict(('P{}'.format(percentile), None) for percentile in PERCENTILES))
+
+        stats = dict(Count=len(values), Min=int(values.min()), Max=int(values.max()), Mean=float(values.mean()))
+        for percentile in PERCENTILES:
+            stats['P{}'.format(percentile)] = float(np.percentile(values, percentile))
+
+        return stats
+
+    def summary(self) -> List[Dict]:
+        # one row per scope (All replicas / each Replica) and metric, like PassengerStats.summary with exact percentiles
+        rows = []
+        for metric, times in [('WaitTime', self.wait_times()), ('TotalTime', self.total_times())]:
+            rows.append(dict(Scope='All', Key='all', Metric=metric, **self.distribution_stats(times[times != MISSING_TIME])))
+            for r in range(self.no_of_replicas):
+                rows.append(dict(Scope='Replica', Key=r, Metric=metric, **self.distribution_stats(times[r][times[r] != MISSING_TIME])))
+
+        return rows
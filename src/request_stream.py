@@ -0,0 +1,89 @@
+import csv
+import heapq
+import itertools
+import json
+from typing import Dict, Iterable, Iterator, List
+
+
+def read_csv_requests(path: str) -> Iterator[Dict]:
+    # reads requests from a .csv file with the columns time, id, source and dest
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            yield dict(time=int(row['time']), id=row['id'], source=int(row['source']), dest=int(row['dest']))
+
+
+def read_jsonl_requests(path: str) -> Iterator[Dict]:
+    # reads requests from a .jsonl file, with one request dict (time, id, source, dest) per line
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                request = json.loads(line)
+                yield dict(time=int(request['time']), id=str(request['id']), source=int(request['source']), dest=int(request['dest']))
+
+
+class RequestStream:
+
+    def __init__(self, requests: Iterable[Dict], buffer_size: int = 1024) -> None:
+        '''
+        Feeds requests to the building in the order of their arrival time.
+
+        Requests are read lazily from any iterable (list, generator, file reader) into a heap keyed on the arrival
+        time, which holds at most buffer_size requests. So requests that arrive out of order by less than buffer_size
+        positions are issued at their arrival time, and the memory used does not depend on the number of requests.
+        Requests that are read after their arrival time has passed are issued straight away.
+        '''
+        self.__requests = iter(requests)
+        self.__buffer_size = max(buffer_size, 1)
+        self.__heap = []
+        self.__sequence = 0     # keeps requests with the same arrival time in the order they were read
+        self.__read_count = 0   # requests read from the source, see resume
+        self.__exhausted = False
+
+    def __getstate__(self):
+        # the source of the requests can't be pickled (e.g. a generator or an open file), only how far it was read
+        state = self.__dict__.copy()
+        state['_RequestStream__requests'] = None
+        return state
+
+    def resume(self, requests: Iterable[Dict]):
+        '''
+        continues a stream restored from a pickle, with the requests it was created with.
+        the requests it had already read (into its heap or issued) are skipped, so they have to come in the same order.
+        '''
+        self.__requests = itertools.islice(iter(requests), self.__read_count, None)
+
+    def __fill(self):
+        while not self.__exhausted and len(self.__heap) < self.__buffer_size:
+            request = next(self.__requests, None)
+            if request is None:
+                self.__exhausted = True
+            else:
+                heapq.heappush(self.__heap, (request['time'], self.__sequence, request))
+                self.__sequence += 1
+                self.__read_count += 1
+
+    def push(self, request: Dict):
+        '''
+        adds a request that didn't come from the source, e.g. a live hall call.
+        it is issued by its arrival time like the other requests, and isn't counted as read from the source.
+        '''
+        heapq.heappush(self.__heap, (request['time'], self.__sequence, request))
+        self.__sequence += 1
+
+    def next_request_time(self):
+        self.__fill()
+        return self.__heap[0][0] if self.__heap else None
+
+    def pop_requests(self, run_timer: int) -> List[Dict]:
+        # returns all requests that arrived at or before the run timer
+        requests = []
+        self.__fill()
+        while self.__heap and self.__heap[0][0] <= run_timer:
+            requests.append(heapq.heappop(self.__heap)[2])
+            self.__fill()
+
+        return requests
+
+    def is_empty(self) -> bool:
+        self.__fill()
+        return not self.__heap
@@ -0,0 +1,64 @@
+import sys
+
+from common.enums import Direction
+from src.dispatcher import Dispatcher
+from src.elevator import Elevator
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+
+# added to the pick-up time of an elevator that has no room left for a call, so it's only picked if none has room
+OVERBOOKED_COST = sys.maxsize // 2
+
+
+class ReservationScheduler(Scheduler):
+    # times a passenger is re-scheduled before it waits for the full elevator to come back instead
+    MAX_RESCHEDULES = 1
+
+    def __init__(self, dispatcher: Dispatcher) -> None:
+        '''
+        Scheduler that doesn't assign more passengers to an elevator than it can take.
+
+        The Scheduler only avoids elevators that are full right now, so under a surge it queues passengers on elevators
+        that fill up before they get to them, and every passenger a full elevator can't take is scheduled again, often
+        onto another crowded elevator. This scheduler counts the load an elevator has committed to at the call's floor:
+        the passengers on board and queued in the sweep that serves the call (see ElevatorPassengerQueue) that are
+        picked up before the floor and go beyond it. An elevator whose committed load is at max passengers refuses the
+        call, so a burst of calls from a floor is split over the elevators as they fill up. If every elevator refuses,
+        the call goes to the one with the shortest pick-up time, like the Scheduler does.
+
+        A passenger that a full elevator still can't take is re-scheduled at most MAX_RESCHEDULES times, after that it
+        waits for that elevator to come back, so the scheduling work of a surge is bounded.
+        '''
+        super().__init__(dispatcher=dispatcher)
+
+    def _cost_state_key(self, elevator: Elevator):
+        # the committed load also depends on the queues of the elevator, which change without changing the elevator
+        return elevator.version, self.dispatcher.elevator_passenger_queue[elevator.name].version
+
+    def committed_load(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction) -> int:
+        # passengers the elevator will have on board when it leaves the floor, before it picks up a call from it
+        if elevator.is_idle():
+            return 0
+
+        elevator_passenger_queue = self.dispatcher.elevator_passenger_queue[elevator.name]
+        queue_key = elevator_passenger_queue.get_queue_key(pick_up_floor, pick_up_direction)
+        # every sweep goes in the direction of the passengers it picks up
+        load = elevator_passenger_queue.dispatch_queue[queue_key].count_riding_past(pick_up_floor, pick_up_direction)
+        if queue_key == 'CURRENT':
+            # the passengers on board are dropped off in the current sweep
+            load += elevator.count_drop_offs_beyond(pick_up_floor, pick_up_direction)
+
+        return load
+
+    def _get_elevator_pick_up_time(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction):
+        pick_up_time = super()._get_elevator_pick_up_time(elevator, pick_up_floor, pick_up_direction)
+        if pick_up_time != sys.maxsize and self.committed_load(elevator, pick_up_floor, pick_up_direction) >= elevator.max_passengers:
+            return OVERBOOKED_COST + pick_up_time
+
+        return pick_up_time
+
+    def reschedule_passenger(self, elevator: Elevator, passenger: Passenger) -> bool:
+        if passenger.reschedule_count >= self.MAX_RESCHEDULES:
+            return False
+
+        return super().reschedule_passenger(elevator, passenger)
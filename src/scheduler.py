@@ -1,5 +1,5 @@
 import sys
-from typing import List
+from typing import Dict, List, Tuple
 
 from src.elevator import Elevator
 from common.enums import Direction
@@ -11,14 +11,54 @@ import logging
 logger = logging.getLogger(__name__)
 
 class Scheduler:
+    # pick-up times cached per elevator, by (floor, direction); the oldest are evicted first
+    COST_CACHE_SIZE = 128
 
     def __init__(self, dispatcher: Dispatcher) -> None:
         self.dispatcher = dispatcher
+        # for each elevator: the state key the pick-up times were computed for, and the pick-up times by (floor, direction)
+        self.__cost_cache: Dict[str, Tuple[object, Dict[Tuple[int, int], int]]] = dict()
 
     def __str__(self) -> str:
         return '\n'.join([str(elevator) for elevator in self.dispatcher.elevators])
 
-    def __get_elevator_pick_up_time(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction):
+    def _cost_state_key(self, elevator: Elevator):
+        # the state the pick-up time of an elevator depends on, subclasses that use more state have to extend it
+        return elevator.version
+
+    def _get_cached_pick_up_times(self, elevators: List[Elevator], pick_up_floor: int, pick_up_direction: Direction) -> List[int]:
+        '''
+        pick-up times of the elevators, each of which is only computed again once the state of its elevator changed,
+        so calls from the same floor within a tick (e.g. a burst in the lobby) are scheduled without recomputing them.
+        the elevators are looked up in one loop, as this runs for every elevator on every call.
+        '''
+        cost_cache = self.__cost_cache
+        # keyed by the value of the direction, hashing the enum member is much slower than hashing an int
+        key = (pick_up_floor, pick_up_direction.value)
+        pick_up_times = []
+        for elevator in elevators:
+            state_key = self._cost_state_key(elevator)
+            cached = cost_cache.get(elevator.name)
+            if cached is None or cached[0] != state_key:
+                cached = (state_key, dict())
+                cost_cache[elevator.name] = cached
+
+            costs = cached[1]
+            cost = costs.get(key)
+            if cost is None:
+                cost = self._get_elevator_pick_up_time(elevator, pick_up_floor, pick_up_direction)
+                if len(costs) >= self.COST_CACHE_SIZE:
+                    del costs[next(iter(costs))]
+                costs[key] = cost
+
+            pick_up_times.append(cost)
+
+        return pick_up_times
+
+    def _get_cached_pick_up_time(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction) -> int:
+        return self._get_cached_pick_up_times([elevator], pick_up_floor, pick_up_direction)[0]
+
+    def _get_elevator_pick_up_time(self, elevator: Elevator, pick_up_floor: int, pick_up_direction: Direction):
         # function to get how much time it will for the elevator to pick up the passenger.
 
         if elevator.is_at_max_capacity():
@@ -86,8 +126,8 @@ class Scheduler:
     def __get_min_trip_elevator(self, start_floor: int, direction: Direction) -> Elevator:
         min_trip_time = sys.maxsize
         pick_up_elevator = None
-        for elevator in self.dispatcher.elevators:
-            t = self.__get_elevator_pick_up_time(elevator=elevator, pick_up_floor=start_floor, pick_up_direction=direction)
+        elevators = self.dispatcher.elevators
+        for elevator, t in zip(elevators, self._get_cached_pick_up_times(elevators, start_floor, direction)):
             if t < min_trip_time:
                 # found a faster time, setting to that elevator
                 pick_up_elevator = elevator
@@ -102,3 +142,11 @@ class Scheduler:
         for passenger in passengers:
             e = self.__get_min_trip_elevator(passenger.start_floor, passenger.direction())
             self.dispatcher.add_passenger_to_elevator_queue(e, passenger)
+
+    def reschedule_passenger(self, elevator: Elevator, passenger: Passenger) -> bool:
+        '''
+        called when the elevator got to the passenger's floor full. schedules the passenger again and returns True,
+        or returns False to let the passenger wait till the elevator comes back (see ReservationScheduler).
+        '''
+        self.schedule_elevator([passenger])
+        return True
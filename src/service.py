@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import json
+from typing import Dict, List, Set
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class DispatchService:
+
+    def __init__(self, building, tick_interval: float = 1.0, max_calls_per_tick: int = 64, max_pending_calls: int = 10000,
+                 subscriber_queue_size: int = 100, retention: int = 3600) -> None:
+        '''
+        Runs a building in real time, taking hall calls as they come in and publishing the state of the elevators.
+
+        Calls are submitted in-process (submit_call) or over a local socket (serve / serve_unix) into a bounded intake
+        queue. Every tick_interval seconds the service issues at most max_calls_per_tick of the pending calls, and runs
+        one tick of the building, so the time spent scheduling in a tick stays bounded however large a burst of calls
+        is; the rest of a burst is issued on the next ticks.
+
+        After every tick an update with the elevator positions, the assignments of the new calls and the dropped off
+        passengers is put on the queue of each subscriber. The subscriber queues are bounded and the oldest update is
+        dropped when a queue is full, so a slow subscriber only misses updates and never holds up the tick loop.
+
+        The building keeps the elevator states and completed passengers of at least the last retention ticks. Older
+        ones are discarded every retention ticks (see Building.discard_history), so a service that runs indefinitely
+        holds at most about twice that history. With retention None the whole history is kept.
+        '''
+        self.building = building
+        self.tick_interval = tick_interval
+        self.max_calls_per_tick = max_calls_per_tick
+        self.subscriber_queue_size = subscriber_queue_size
+        self.retention = retention
+        self.__discarded_before = building.run_timer
+        self.calls: asyncio.Queue = asyncio.Queue(maxsize=max_pending_calls)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.dropped_updates = 0
+        self.__call_ids = itertools.count(1)
+        self.__stopped = False
+
+    def submit_call(self, source: int, dest: int, id: str = None) -> str:
+        '''
+        queues a hall call from the source to the dest floor, and returns its id.
+        raises ValueError for an invalid call and asyncio.QueueFull when too many calls are pending.
+        '''
+        no_of_floors = self.building.total_floors
+        if not (1 <= source <= no_of_floors and 1 <= dest <= no_of_floors) or source == dest:
+            raise ValueError('Invalid call from floor {0} to floor {1}'.format(source, dest))
+
+        id = id or 'call_{}'.format(next(self.__call_ids))
+        self.calls.put_nowait(dict(id=id, source=source, dest=dest))
+        return id
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def __publish(self, update: Dict):
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_updates += 1
+            queue.put_nowait(update)
+
+    def elevator_positions(self) -> List[Dict]:
+        return [dict(name=elevator.name, floor=elevator.at_floor(), status=elevator.status.name,
+                     direction=elevator.direction.name if elevator.direction else None, passengers=elevator.passenger_count())
+                for elevator in self.building.dispatcher.elevators]
+
+    def tick(self) -> Dict:
+        # issues the pending calls (up to the limit), runs one tick of the building and publishes the update
+        run_timer = self.building.run_timer
+        for _ in range(min(self.calls.qsize(), self.max_calls_per_tick)):
+            self.building.requests.push(dict(self.calls.get_nowait(), time=run_timer))
+
+        passengers, dropped_passengers = self.building.step()
+        if self.retention is not None and self.building.run_timer - self.__discarded_before >= 2 * self.retention:
+            self.__discarded_before = self.building.run_timer - self.retention
+            self.building.discard_history(self.__discarded_before)
+        update = dict(tick=run_timer, elevators=self.elevator_positions(),
+                      assignments=[dict(id=passenger.id, elevator=passenger.assigned_elevator) for passenger in passengers],
+                      dropped_off=[passenger.id for passenger in dropped_passengers], pending_calls=self.calls.qsize())
+        self.__publish(update)
+        return update
+
+    async def run(self, ticks: int = None):
+        '''
+        runs the tick loop till stop() is called, or for the given number of ticks.
+        ticks are scheduled on a fixed clock, and a tick that overruns its interval delays the next one instead of
+        making the loop catch up with a burst of ticks.
+        '''
+        self.__stopped = False
+        loop = asyncio.get_running_loop()
+        next_tick_time = loop.time()
+        for _ in (itertools.count() if ticks is None else range(ticks)):
+            if self.__stopped:
+                break
+
+            self.tick()
+            next_tick_time = max(next_tick_time + self.tick_interval, loop.time())
+            await asyncio.sleep(next_tick_time - loop.time())
+
+    def stop(self):
+        self.__stopped = True
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''
+        line-delimited json protocol:
+        {"source": 1, "dest": 5, "id": "optional"} queues a call and is answered with {"id": ...} or {"error": ...}
+        {"subscribe": true} turns the connection into a stream of updates, one json line per tick
+        '''
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    message = json.loads(line)
+                    if message.get('subscribe'):
+                        await self.__stream_updates(reader, writer)
+                        break
+                    response = dict(id=self.submit_call(int(message['source']), int(message['dest']), message.get('id')))
+                except asyncio.QueueFull:
+                    response = dict(error='too many pending calls')
+                except ValueError as e:
+                    response = dict(error=str(e))
+                except (KeyError, TypeError, AttributeError) as e:
+                    response = dict(error='Invalid call: {}'.format(repr(e)))
+
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            logger.debug('Connection closed by the client')
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def __discard_until_closed(reader: asyncio.StreamReader, chunk_size: int = 4096):
+        # reader.read() would keep everything the client sends until it closes the connection
+        while await reader.read(chunk_size):
+            pass
+
+    async def __stream_updates(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # the connection only waits on its own queue, so a slow client doesn't hold up the tick loop.
+        # it stops streaming when the client closes the connection (anything else it sends is read in chunks and dropped)
+        queue = self.subscribe()
+        closed = asyncio.ensure_future(self.__discard_until_closed(reader))
+        try:
+            while not closed.done():
+                update = asyncio.ensure_future(queue.get())
+                await asyncio.wait([update, closed], return_when=asyncio.FIRST_COMPLETED)
+                if not update.done():
+                    update.cancel()
+                    break
+
+                writer.write((json.dumps(update.result()) + '\n').encode())
+                await writer.drain()
+        finally:
+            closed.cancel()
+            self.unsubscribe(queue)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.__handle_connection, host=host, port=port)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.__handle_connection, path=path)
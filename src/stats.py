@@ -0,0 +1,164 @@
+import math
+from typing import Dict, List
+
+from src.passenger import Passenger
+
+PERCENTILES = [50, 95, 99]
+
+
+class QuantileSketch:
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        '''
+        Mergeable quantile sketch of non-negative values (in the style of DDSketch).
+
+        Values are counted in logarithmic buckets, where bucket i holds the values in (gamma^(i-1), gamma^i] and
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy), so every quantile is estimated within the relative
+        accuracy of the true value. The number of buckets only grows with the log of the range of the values, and is
+        capped at max_buckets by collapsing the lowest buckets, so the memory stays bounded however many values are added.
+        Two sketches with the same relative accuracy are merged by adding up their bucket counts.
+        '''
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.buckets: Dict[int, int] = dict()
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self.__log_gamma)
+
+    def __collapse(self):
+        # merges the lowest buckets into one, so the low quantiles lose accuracy before the high ones
+        buckets = sorted(self.buckets)
+        excess = len(buckets) - self.max_buckets
+        collapsed = sum(self.buckets.pop(bucket) for bucket in buckets[:excess])
+        self.buckets[buckets[excess]] += collapsed
+
+    def add(self, value: float, count: int = 1):
+        if value > 0:
+            bucket = self.__bucket(value)
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self.__collapse()
+        else:
+            self.zero_count += count
+
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'QuantileSketch'):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Can not merge sketches with a relative accuracy of {0} and {1}'.format(self.relative_accuracy, other.relative_accuracy))
+
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self.__collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q: float):
+        # estimate of the q-quantile (0 <= q <= 1), None if the sketch is empty
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0
+
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if rank < seen:
+                # the value in the middle of the bucket, within the relative accuracy of any value in it
+                value = 2 * self.__gamma ** bucket / (self.__gamma + 1)
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+
+class PassengerStats:
+    METRICS = ['WaitTime', 'TotalTime']
+
+    def __init__(self, window_size: int = 3600, relative_accuracy: float = 0.01) -> None:
+        '''
+        Wait and total (journey) time sketches of the passengers, over the whole run, per elevator and per time window
+        (of window_size ticks, by the time of the request). They are updated as passengers are picked up and dropped
+        off, so the statistics are available at any point of a run, and the stats of several runs can be merged.
+        '''
+        self.window_size = window_size
+        self.relative_accuracy = relative_accuracy
+        self.overall = self.__new_sketches()
+        self.by_elevator: Dict[str, Dict[str, QuantileSketch]] = dict()
+        self.by_window: Dict[int, Dict[str, QuantileSketch]] = dict()
+
+    def __new_sketches(self) -> Dict[str, QuantileSketch]:
+        return dict((metric, QuantileSketch(relative_accuracy=self.relative_accuracy)) for metric in self.METRICS)
+
+    def __add(self, elevator_name: str, passenger: Passenger, metric: str, value: int):
+        window = passenger.start_time // self.window_size * self.window_size
+        if elevator_name not in self.by_elevator:
+            self.by_elevator[elevator_name] = self.__new_sketches()
+        if window not in self.by_window:
+            self.by_window[window] = self.__new_sketches()
+
+        self.overall[metric].add(value)
+        self.by_elevator[elevator_name][metric].add(value)
+        self.by_window[window][metric].add(value)
+
+    def record_pick_up(self, elevator_name: str, passenger: Passenger):
+        self.__add(elevator_name, passenger, 'WaitTime', passenger.total_wait_time())
+
+    def record_drop_off(self, elevator_name: str, passengers: List[Passenger]):
+        for passenger in passengers:
+            self.__add(elevator_name, passenger, 'TotalTime', passenger.total_time())
+
+    def merge(self, other: 'PassengerStats'):
+        if other.window_size != self.window_size:
+            raise ValueError('Can not merge stats with a window size of {0} and {1}'.format(self.window_size, other.window_size))
+
+        for metric in self.METRICS:
+            self.overall[metric].merge(other.overall[metric])
+        for scope, other_scope in [(self.by_elevator, other.by_elevator), (self.by_window, other.by_window)]:
+            for key, sketches in other_scope.items():
+                if key not in scope:
+                    scope[key] = self.__new_sketches()
+                for metric in self.METRICS:
+                    scope[key][metric].merge(sketches[metric])
+
+    @staticmethod
+    def sketch_stats(sketch: QuantileSketch) -> Dict:
+        stats = dict(Count=sketch.count, Min=sketch.min, Max=sketch.max, Mean=sketch.mean())
+        for percentile in PERCENTILES:
+            stats['P{}'.format(percentile)] = sketch.quantile(percentile / 100)
+
+        return stats
+
+    def summary(self) -> List[Dict]:
+        # one row per scope (All / Elevator / Window) and metric
+        rows = []
+        scopes = [('All', dict(all=self.overall)), ('Elevator', self.by_elevator), ('Window', dict(sorted(self.by_window.items())))]
+        for scope, sketches_by_key in scopes:
+            for key, sketches in sketches_by_key.items():
+                for metric in self.METRICS:
+                    rows.append(dict(Scope=scope, Key=key, Metric=metric, **self.sketch_stats(sketches[metric])))
+
+        return rows
@@ -0,0 +1,176 @@
+import json
+import numbers
+import os
+import struct
+from typing import List, Union
+
+import numpy as np
+
+# header: magic, version, header size (offset of the floors), number of elevators, first tick,
+# followed by the elevator names as a json list, padded to HEADER_ALIGNMENT bytes
+MAGIC = b'ELVTRACE'
+VERSION = 1
+HEADER = struct.Struct('<8sIIIq')
+HEADER_ALIGNMENT = 16
+
+FLOOR_DTYPE = np.dtype('<i2')
+MAX_FLOOR = int(np.iinfo(FLOOR_DTYPE).max)
+
+
+class TraceWriter:
+
+    def __init__(self, path: str, elevator_names: List[str], buffer_ticks: int = 4096) -> None:
+        '''
+        Writes the floor of each elevator at every tick to a binary trace file, as it is recorded.
+
+        The file has a small header, followed by one row of int16 floors per tick (one column per elevator), so the
+        tick of a row follows from its position. Rows are buffered and appended to the file every buffer_ticks ticks.
+        It has the same record / record_span interface as the ElevatorStateRecorder, so the Building can record
+        into either of them. Read the file with TraceReader.
+        '''
+        self.path = path
+        self.elevator_names = list(elevator_names)
+        self.__buffer = np.empty((max(buffer_ticks, 1), len(self.elevator_names)), dtype=FLOOR_DTYPE)
+        self.__size = 0
+        self.__ticks = 0
+        self.__file = None
+
+    def __len__(self) -> int:
+        return self.__ticks
+
+    def __write_header(self, first_tick: int):
+        names = json.dumps(self.elevator_names).encode()
+        header_size = HEADER.size + len(names)
+        header_size += -header_size % HEADER_ALIGNMENT
+
+        self.__file = open(self.path, 'wb')
+        self.__file.write(HEADER.pack(MAGIC, VERSION, header_size, len(self.elevator_names), first_tick))
+        self.__file.write(names.ljust(header_size - HEADER.size, b' '))
+
+    def __write(self, rows: np.ndarray):
+        # rows that don't fit into the buffer are written straight away
+        if self.__size + len(rows) > len(self.__buffer):
+            self.flush()
+            if len(rows) > len(self.__buffer):
+                self.__file.write(rows.astype(FLOOR_DTYPE).tobytes())
+                self.__ticks += len(rows)
+                return
+
+        self.__buffer[self.__size: self.__size + len(rows)] = rows
+        self.__size += len(rows)
+        self.__ticks += len(rows)
+
+    def record(self, run_timer: int, floors: List[int]):
+        if self.__file is None:
+            self.__write_header(run_timer)
+
+        self.__write(np.asarray(floors, dtype=FLOOR_DTYPE)[None, :])
+
+    def record_span(self, run_timer: int, floors: List[int], steps: List[int], ticks: int):
+        # records the states for the next ticks, in which every elevator moves steps[i] floors per tick
+        if self.__file is None:
+            self.__write_header(run_timer)
+
+        elapsed = np.arange(1, ticks + 1, dtype=np.int32)[:, None]
+        self.__write(np.asarray(floors, dtype=np.int32) + elapsed * np.asarray(steps, dtype=np.int32))
+
+    def flush(self):
+        if self.__file is not None and self.__size:
+            self.__file.write(self.__buffer[:self.__size].tobytes())
+            self.__size = 0
+        if self.__file is not None:
+            self.__file.flush()
+
+    def close(self):
+        if self.__file is None:
+            # nothing was recorded, still leave a valid (empty) trace behind
+            self.__write_header(0)
+
+        self.flush()
+        self.__file.close()
+
+
+class TraceReader:
+
+    def __init__(self, path: str) -> None:
+        '''
+        Reads a binary trace written by TraceWriter.
+
+        The floors are memory-mapped, so opening a trace doesn't load it, and slicing by tick range, elevator and step
+        returns a view into the file. Only the pages that are accessed are read from disk.
+        A trace that is still being written can be read up to its last complete tick.
+        '''
+        with open(path, 'rb') as f:
+            magic, version, header_size, no_of_elevators, first_tick = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError('{} is not an elevator trace'.format(path))
+            if version != VERSION:
+                raise ValueError('Unsupported trace version {0} in {1}'.format(version, path))
+
+            self.elevator_names = json.loads(f.read(header_size - HEADER.size).decode())
+
+        self.path = path
+        self.first_tick = first_tick
+        row_size = no_of_elevators * FLOOR_DTYPE.itemsize
+        ticks = (os.path.getsize(path) - header_size) // row_size if row_size else 0
+        if ticks:
+            self.__floors = np.memmap(path, dtype=FLOOR_DTYPE, mode='r', offset=header_size, shape=(ticks, no_of_elevators))
+        else:
+            self.__floors = np.empty((0, no_of_elevators), dtype=FLOOR_DTYPE)
+
+    def __len__(self) -> int:
+        return self.__floors.shape[0]
+
+    @property
+    def last_tick(self) -> int:
+        return self.first_tick + len(self) - 1
+
+    def __tick_slice(self, start_tick: int, end_tick: int, step: int) -> slice:
+        start = None if start_tick is None else max(start_tick - self.first_tick, 0)
+        end = None if end_tick is None else max(end_tick - self.first_tick, 0)
+        return slice(start, end, step)
+
+    def __elevator_index(self, elevator: Union[str, int]) -> int:
+        # numpy integers are numbers.Integral too, so indices taken from numpy arrays select a single elevator
+        return self.elevator_names.index(elevator) if isinstance(elevator, str) else int(elevator)
+
+    def floors(self, start_tick: int = None, end_tick: int = None, elevators: Union[str, int, List, slice] = None, step: int = 1) -> np.ndarray:
+        '''
+        floors of the elevators for the ticks in [start_tick, end_tick), keeping every step-th tick.
+
+        elevators: an elevator name or column index (returns a 1-d array), a list of them, or a slice of columns.
+        A single elevator or a slice of elevators is a view into the file, a list of elevators is copied.
+        '''
+        ticks = self.__tick_slice(start_tick, end_tick, step)
+        if elevators is None:
+            return self.__floors[ticks]
+        elif isinstance(elevators, slice):
+            return self.__floors[ticks, elevators]
+        elif isinstance(elevators, (str, numbers.Integral)):
+            return self.__floors[ticks, self.__elevator_index(elevators)]
+
+        return self.__floors[ticks][:, [self.__elevator_index(elevator) for elevator in elevators]]
+
+    def downsample(self, factor: int, start_tick: int = None, end_tick: int = None, elevators: Union[str, int, List, slice] = None,
+                   how: str = 'mean') -> np.ndarray:
+        '''
+        aggregates the floors of every factor ticks in [start_tick, end_tick) with how ('mean', 'min' or 'max').
+        Only the ticks in the range are read; a last group of less than factor ticks is dropped.
+        The run timer of each group's first tick is ticks(start_tick, end_tick, factor)[:len(result)].
+        '''
+        floors = self.floors(start_tick, end_tick, elevators)
+        groups = len(floors) // factor
+        grouped = floors[:groups * factor].reshape((groups, factor) + floors.shape[1:])
+        return getattr(grouped, how)(axis=1)
+
+    def ticks(self, start_tick: int = None, end_tick: int = None, step: int = 1) -> np.ndarray:
+        # run timer of each row returned by floors() with the same arguments
+        rows = range(len(self))[self.__tick_slice(start_tick, end_tick, step)]
+        return np.arange(rows.start, rows.stop, rows.step) + self.first_tick
+
+    def to_dataframe(self, start_tick: int = None, end_tick: int = None, step: int = 1):
+        # same layout as ElevatorStateRecorder.to_dataframe
+        import pandas as pd
+        states = pd.DataFrame(self.floors(start_tick, end_tick, step=step), columns=['Elevator {}'.format(name) for name in self.elevator_names])
+        states.insert(0, 'RunTimer', self.ticks(start_tick, end_tick, step))
+        return states
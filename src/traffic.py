@@ -0,0 +1,73 @@
+import random
+from typing import Dict, Iterator
+
+LOBBY_FLOOR = 1
+
+# share of passengers going up from the lobby and going down to the lobby for each traffic pattern,
+# the remaining passengers travel between two random floors
+TRAFFIC_MIX = dict(
+    up_peak=(0.85, 0.05),
+    lunch=(0.4, 0.4),
+    down_peak=(0.05, 0.85),
+    interfloor=(0.0, 0.0),
+)
+
+
+def generate_traffic(pattern: str, seed: int, no_of_floors: int, no_of_passengers: int = 1000, duration: int = 3600) -> Iterator[Dict]:
+    '''
+    Generates requests for a traffic pattern, sorted by time.
+    Passengers arrive as a poisson process with no_of_passengers / duration arrivals per tick on average.
+    The requests are generated lazily, so traces of any length can be streamed into a building.
+    The arguments are checked straight away though, not when the first request is generated.
+    '''
+    if pattern not in TRAFFIC_MIX:
+        raise ValueError('Unknown traffic pattern {}'.format(pattern))
+    if no_of_floors < 2:
+        raise ValueError('Traffic needs at least 2 floors, got {}'.format(no_of_floors))
+    if duration <= 0:
+        raise ValueError('The duration has to be at least one tick, got {}'.format(duration))
+
+    return _generate_traffic(pattern, seed, no_of_floors, no_of_passengers, duration)
+
+
+def _generate_traffic(pattern: str, seed: int, no_of_floors: int, no_of_passengers: int, duration: int) -> Iterator[Dict]:
+    up_share, down_share = TRAFFIC_MIX[pattern]
+    rnd = random.Random(seed)
+    arrival_rate = no_of_passengers / duration
+    time = 0.0
+
+    for i in range(no_of_passengers):
+        time += rnd.expovariate(arrival_rate)
+
+        trip_type = rnd.random()
+        if trip_type < up_share:
+            source, dest = LOBBY_FLOOR, rnd.randint(LOBBY_FLOOR + 1, no_of_floors)
+        elif trip_type < up_share + down_share:
+            source, dest = rnd.randint(LOBBY_FLOOR + 1, no_of_floors), LOBBY_FLOOR
+        else:
+            source, dest = rnd.sample(range(1, no_of_floors + 1), 2)
+
+        yield dict(time=int(time), id='{0}_{1}'.format(pattern, i), source=source, dest=dest)
+
+
+def up_peak(seed: int, no_of_floors: int, no_of_passengers: int = 1000, duration: int = 3600) -> Iterator[Dict]:
+    # morning rush: most passengers go up from the lobby
+    return generate_traffic('up_peak', seed, no_of_floors, no_of_passengers, duration)
+
+
+def lunch(seed: int, no_of_floors: int, no_of_passengers: int = 1000, duration: int = 3600) -> Iterator[Dict]:
+    # two-way traffic: passengers go down to the lobby and come back up
+    return generate_traffic('lunch', seed, no_of_floors, no_of_passengers, duration)
+
+
+def down_peak(seed: int, no_of_floors: int, no_of_passengers: int = 1000, duration: int = 3600) -> Iterator[Dict]:
+    # evening rush: most passengers go down to the lobby
+    return generate_traffic('down_peak', seed, no_of_floors, no_of_passengers, duration)
+
+
+def interfloor(seed: int, no_of_floors: int, no_of_passengers: int = 1000, duration: int = 3600) -> Iterator[Dict]:
+    # passengers travel between random floors
+    return generate_traffic('interfloor', seed, no_of_floors, no_of_passengers, duration)
+
+
+TRAFFIC_GENERATORS = dict(up_peak=up_peak, lunch=lunch, down_peak=down_peak, interfloor=interfloor)
@@ -0,0 +1,140 @@
+import sys
+from typing import List
+
+import numpy as np
+
+from common.enums import Direction
+from src.dispatcher import Dispatcher
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+
+NO_DIRECTION = 0
+
+
+def direction_code(direction: Direction) -> int:
+    return NO_DIRECTION if direction is None else direction.value
+
+
+def get_pick_up_times(at_floor: np.ndarray, direction: np.ndarray, passenger_direction: np.ndarray, is_idle: np.ndarray,
+                      is_full: np.ndarray, top_floor: np.ndarray, pick_up_floor, pick_up_direction) -> np.ndarray:
+    '''
+    vectorized version of the Scheduler's pick-up time rules, see Scheduler for a description of each case.
+    the elevator states are arrays of direction codes, floors and flags, and the pick-up floor and direction (code) are
+    scalars, or arrays that broadcast against them, e.g. one call per row of (replicas, elevators) states.
+    '''
+    # the elevator is moving to its first pick-up, or moving with its passengers, in the direction of the call
+    same_passenger_direction = passenger_direction == pick_up_direction
+    same_direction = direction == pick_up_direction
+    moving_to_pick_up = same_passenger_direction & ~same_direction
+    moving_with_passengers = same_passenger_direction & same_direction
+    # floors from the elevator to the pick-up floor, positive when the pick-up floor is above the elevator
+    floors_to_pick_up = pick_up_floor - at_floor
+
+    if np.ndim(pick_up_direction) == 0:
+        get_times = _get_up_pick_up_times if pick_up_direction == Direction.UP.value else _get_down_pick_up_times
+        pick_up_times = get_times(at_floor, top_floor, pick_up_floor, floors_to_pick_up, moving_to_pick_up, moving_with_passengers)
+    else:
+        pick_up_times = np.where(pick_up_direction == Direction.UP.value,
+                                 _get_up_pick_up_times(at_floor, top_floor, pick_up_floor, floors_to_pick_up, moving_to_pick_up, moving_with_passengers),
+                                 _get_down_pick_up_times(at_floor, top_floor, pick_up_floor, floors_to_pick_up, moving_to_pick_up, moving_with_passengers))
+
+    pick_up_times = np.where(is_idle, np.abs(floors_to_pick_up), pick_up_times)
+    return np.where(is_full, sys.maxsize, pick_up_times)
+
+
+# the pick-up time rules written as nested np.where over the floors to the pick-up floor, which takes fewer (and cheaper)
+# numpy passes than np.select over the cases, as the fixed cost of the passes dominates a call with a few hundred elevators
+
+def _get_up_pick_up_times(at_floor, top_floor, pick_up_floor, floors_to_pick_up, moving_to_pick_up, moving_with_passengers) -> np.ndarray:
+    via_bottom_floor = np.abs(1 - at_floor) + pick_up_floor
+    return np.where(moving_with_passengers,
+                    np.where(floors_to_pick_up >= 0, floors_to_pick_up, (top_floor - at_floor) + top_floor + pick_up_floor),
+                    np.where(moving_to_pick_up & (floors_to_pick_up <= 0), -floors_to_pick_up, via_bottom_floor))
+
+
+def _get_down_pick_up_times(at_floor, top_floor, pick_up_floor, floors_to_pick_up, moving_to_pick_up, moving_with_passengers) -> np.ndarray:
+    from_top_floor = top_floor - pick_up_floor
+    return np.where(moving_with_passengers,
+                    np.where(floors_to_pick_up <= 0, -floors_to_pick_up, np.abs(1 - at_floor) + top_floor + from_top_floor),
+                    np.where(moving_to_pick_up,
+                             np.where(floors_to_pick_up >= 0, floors_to_pick_up, np.abs(top_floor - at_floor) + from_top_floor),
+                             (top_floor - at_floor) + from_top_floor))
+
+
+def get_min_trip_elevator_index(pick_up_times: np.ndarray, is_idle: np.ndarray):
+    '''
+    index of the elevator with the min pick-up time along the last axis, with the same tie-breaking as the Scheduler:
+    the last moving elevator with the min time, otherwise the first (idle) elevator with the min time.
+    '''
+    candidates = pick_up_times == pick_up_times.min(axis=-1, keepdims=True)
+    moving_candidates = candidates & ~is_idle
+    last_moving_candidate = candidates.shape[-1] - 1 - np.argmax(moving_candidates[..., ::-1], axis=-1)
+    return np.where(moving_candidates.any(axis=-1), last_moving_candidate, np.argmax(candidates, axis=-1))
+
+
+class VectorizedScheduler(Scheduler):
+    # with fewer elevators the fixed cost of the numpy calls is more than computing the pick-up times one by one
+    MIN_VECTORIZED_ELEVATORS = 64
+
+    def __init__(self, dispatcher: Dispatcher) -> None:
+        '''
+        Scheduler that keeps the state of the elevators in numpy arrays, and computes the pick-up time of all
+        elevators for a passenger in a single vectorized pass.
+        It follows the same pick-up time rules and tie-breaking as the Scheduler, so both assign passengers
+        to the same elevators. Below MIN_VECTORIZED_ELEVATORS elevators it schedules like the Scheduler.
+
+        The arrays are kept between calls, and a call only reloads the rows of the elevators whose version changed
+        since they were loaded, so a call costs O(elevators) in numpy and only the changed elevators in Python.
+        '''
+        super().__init__(dispatcher=dispatcher)
+        # the elevators are added to the dispatcher after the scheduler is created, so the arrays are allocated on the first call
+        self.__versions = None
+
+    def __allocate_elevator_states(self):
+        elevators = self.dispatcher.elevators
+        self.__floor = np.empty(len(elevators), dtype=np.int64)
+        self.__direction = np.empty(len(elevators), dtype=np.int8)
+        self.__passenger_direction = np.empty(len(elevators), dtype=np.int8)
+        self.__is_idle = np.empty(len(elevators), dtype=bool)
+        self.__is_full = np.empty(len(elevators), dtype=bool)
+        self.__total_floors = np.array([elevator.total_number_of_floors for elevator in elevators], dtype=np.int64)
+        # version of each elevator when its row was loaded, -1 for rows that were never loaded
+        self.__versions = np.full(len(elevators), -1, dtype=np.int64)
+
+    def __refresh_elevator_states(self):
+        elevators = self.dispatcher.elevators
+        if self.__versions is None or len(self.__versions) != len(elevators):
+            self.__allocate_elevator_states()
+
+        versions = np.fromiter((elevator.version for elevator in elevators), dtype=np.int64, count=len(elevators))
+        for i in np.flatnonzero(versions != self.__versions).tolist():
+            self.__load_elevator_state(i)
+
+    def __load_elevator_state(self, i: int):
+        elevator = self.dispatcher.elevators[i]
+        self.__floor[i] = elevator.at_floor()
+        self.__direction[i] = direction_code(elevator.direction)
+        self.__passenger_direction[i] = direction_code(elevator.passenger_direction)
+        self.__is_idle[i] = elevator.is_idle()
+        self.__is_full[i] = elevator.is_at_max_capacity()
+        self.__versions[i] = elevator.version
+
+    def __get_min_trip_elevator_index(self, start_floor: int, direction: Direction):
+        pick_up_times = get_pick_up_times(self.__floor, self.__direction, self.__passenger_direction, self.__is_idle, self.__is_full,
+                                          self.__total_floors, start_floor, direction_code(direction))
+        # get_min_trip_elevator_index for a single call, which is cheaper on the indexes of the elevators with the min time
+        candidates = np.flatnonzero(pick_up_times == pick_up_times.min())
+        moving_candidates = candidates[~self.__is_idle[candidates]]
+        i = int(moving_candidates[-1]) if len(moving_candidates) else int(candidates[0])
+        return None if pick_up_times[i] == sys.maxsize and self.__is_idle[i] else i
+
+    def schedule_elevator(self, passengers: List[Passenger]):
+        if len(self.dispatcher.elevators) < self.MIN_VECTORIZED_ELEVATORS:
+            return super().schedule_elevator(passengers)
+
+        self.__refresh_elevator_states()
+        for passenger in passengers:
+            i = self.__get_min_trip_elevator_index(passenger.start_floor, passenger.direction())
+            self.dispatcher.add_passenger_to_elevator_queue(self.dispatcher.elevators[i], passenger)
+            # adding a passenger can change the state of an idle elevator
+            self.__load_elevator_state(i)
@@ -0,0 +1,182 @@
+from building import Building
+from src.replica_engine import ReplicaEngine
+from src.request_stream import read_csv_requests, read_jsonl_requests
+from src.stats import PassengerStats, PERCENTILES
+
+import datetime
+import itertools
+import os
+import signal
+import time
+import zlib
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Union
+
+import logging
+logger = logging.getLogger(__name__)
+
+# a traffic trace is a list of request dicts, the path to a .csv/.jsonl file of requests,
+# or a function (seed, no_of_floors) -> iterable of request dicts. functions have to be defined at module level,
+# so they can be sent to the worker processes.
+Traffic = Union[List[Dict], str, Callable[[int, int], Iterable[Dict]]]
+
+STAT_COLUMNS = ['PickUpTime', 'WaitTime', 'TotalTime']
+PERCENTILE_COLUMNS = ['WaitTime', 'TotalTime']
+
+
+def get_run_seed(seed: int, no_of_elevators: int, no_of_floors: int, max_passengers_per_elevator: int, traffic_name: str) -> int:
+    # the seed of a run only depends on its configuration, so it doesn't change with the order or the number of runs
+    return zlib.crc32('{0}:{1}:{2}:{3}:{4}'.format(seed, no_of_elevators, no_of_floors, max_passengers_per_elevator, traffic_name).encode())
+
+
+def get_requests(traffic: Traffic, seed: int, no_of_floors: int) -> Iterable[Dict]:
+    if callable(traffic):
+        return traffic(seed, no_of_floors)
+    elif isinstance(traffic, str):
+        return read_jsonl_requests(traffic) if traffic.endswith('.jsonl') else read_csv_requests(traffic)
+
+    return traffic
+
+
+def make_sweep_dir(output_dir: str) -> str:
+    # the directory of a sweep is named by the time it started, sweeps started in the same second get a numbered suffix
+    name = 'sweep_{}'.format(datetime.datetime.now().strftime('%Y%m%d_%H%M%S'))
+    os.makedirs(output_dir, exist_ok=True)
+    for attempt in itertools.count():
+        sweep_dir = os.path.join(output_dir, name if attempt == 0 else '{0}_{1}'.format(name, attempt))
+        try:
+            os.makedirs(sweep_dir, exist_ok=False)
+            return sweep_dir
+        except FileExistsError:
+            continue
+
+
+def raise_timeout(signum, frame):
+    raise TimeoutError()
+
+
+def run_scenario(scenario: Dict) -> Dict:
+    '''
+    Runs a single building configuration, and returns its passenger statistics as a row of the summary table.
+    The row also holds the PassengerStats of the run, so the sketches can be merged across runs.
+    Each run writes its output files into its own directory, so runs in parallel don't overwrite each other.
+    '''
+    row = dict(Run=scenario['run'], Traffic=scenario['traffic_name'], Elevators=scenario['no_of_elevators'], Floors=scenario['no_of_floors'],
+               MaxPassengers=scenario['max_passengers_per_elevator'], Seed=scenario['seed'])
+    os.makedirs(scenario['output_dir'], exist_ok=True)
+
+    timeout = scenario['timeout']
+    if timeout and hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start_time = time.perf_counter()
+    try:
+        building = Building(no_of_elevators=scenario['no_of_elevators'], no_of_floors=scenario['no_of_floors'],
+                            max_passengers_per_elevator=scenario['max_passengers_per_elevator'],
+                            request_list=get_requests(scenario['traffic'], scenario['seed'], scenario['no_of_floors']),
+                            output_dir=scenario['output_dir'], run_name='run', **scenario['building_kwargs'])
+        building.schedule()
+    except TimeoutError:
+        row.update(Status='timeout', RunTime=time.perf_counter() - start_time)
+        return row
+    except Exception as e:
+        logger.exception('Run {0} failed'.format(scenario['run']))
+        row.update(Status='error: {0}'.format(e), RunTime=time.perf_counter() - start_time)
+        return row
+    finally:
+        if timeout and hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    row.update(Status='completed', RunTime=time.perf_counter() - start_time, Ticks=building.run_timer)
+    row['Passengers'] = len(building.passengers)
+    stats = building.passengers.stats()
+    for column in STAT_COLUMNS:
+        if stats[column]:
+            row['{0}Min'.format(column)] = stats[column]['min']
+            row['{0}Max'.format(column)] = stats[column]['max']
+            row['{0}Mean'.format(column)] = stats[column]['mean']
+
+    for column in PERCENTILE_COLUMNS:
+        for percentile in PERCENTILES:
+            row['{0}P{1}'.format(column, percentile)] = building.passenger_stats.overall[column].quantile(percentile / 100)
+
+    row['PassengerStats'] = building.passenger_stats
+    return row
+
+
+def merge_passenger_stats(rows: List[Dict]) -> Dict[str, PassengerStats]:
+    # merges the passenger stats of the completed runs per traffic trace
+    merged = dict()
+    for row in rows:
+        stats = row.get('PassengerStats')
+        if stats is None:
+            continue
+
+        if row['Traffic'] not in merged:
+            merged[row['Traffic']] = PassengerStats(window_size=stats.window_size, relative_accuracy=stats.relative_accuracy)
+        merged[row['Traffic']].merge(stats)
+
+    return merged
+
+
+def sweep(no_of_elevators: List[int], no_of_floors: List[int], max_passengers_per_elevator: List[int], traffic: Dict[str, Traffic],
+          seed: int = 0, max_workers: int = None, timeout: float = None, output_dir: str = './outputs', **building_kwargs) -> pd.DataFrame:
+    '''
+    Runs every combination of the building parameters and traffic traces across a pool of processes, and returns
+    a summary table with one row of passenger statistics per run.
+
+    timeout: wall time in seconds after which a run is stopped (and reported with the status 'timeout').
+    building_kwargs: passed on to every Building, e.g. engine or scheduler_cls.
+
+    Run i writes its output files to <output_dir>/sweep_<timestamp>/run_<i>/ (i zero-padded to 4 digits, e.g. run_0007),
+    and the summary table is written to <output_dir>/sweep_<timestamp>/summary.csv. A sweep started in the same second
+    as another one in output_dir gets a numbered suffix (sweep_<timestamp>_1, ...), so it doesn't write into its directory.
+    The passenger stats of all runs of a traffic trace are merged, and written to passenger_stats.csv next to the
+    summary table. They are also kept in summary.attrs['passenger_stats'].
+    '''
+    sweep_dir = make_sweep_dir(output_dir)
+
+    scenarios = []
+    for i, (elevators, floors, max_passengers, traffic_name) in enumerate(itertools.product(no_of_elevators, no_of_floors, max_passengers_per_elevator, traffic)):
+        scenarios.append(dict(run=i, no_of_elevators=elevators, no_of_floors=floors, max_passengers_per_elevator=max_passengers,
+                              traffic_name=traffic_name, traffic=traffic[traffic_name],
+                              seed=get_run_seed(seed, elevators, floors, max_passengers, traffic_name),
+                              timeout=timeout, output_dir=os.path.join(sweep_dir, 'run_{:04d}'.format(i)), building_kwargs=building_kwargs))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        rows = list(executor.map(run_scenario, scenarios))
+
+    passenger_stats = merge_passenger_stats(rows)
+    summary = pd.DataFrame([dict((key, value) for key, value in row.items() if key != 'PassengerStats') for row in rows])
+    summary.attrs['passenger_stats'] = passenger_stats
+
+    summary.to_csv(os.path.join(sweep_dir, 'summary.csv'), index=False)
+    pd.DataFrame([dict(Traffic=traffic_name, **row) for traffic_name, stats in passenger_stats.items() for row in stats.summary()]) \
+        .to_csv(os.path.join(sweep_dir, 'passenger_stats.csv'), index=False)
+    return summary
+
+
+def monte_carlo(no_of_elevators: List[int], no_of_floors: List[int], max_passengers_per_elevator: List[int],
+                traffic: Dict[str, Callable[[int, int], Iterable[Dict]]], seeds: Iterable[int]) -> pd.DataFrame:
+    '''
+    Runs every combination of the building parameters and traffic functions once per seed, with all the seeds of a
+    combination run together by a ReplicaEngine, and returns the wait and total time distribution over the seeds
+    (one row per combination and metric).
+    '''
+    seeds = list(seeds)
+    rows = []
+    for elevators, floors, max_passengers, traffic_name in itertools.product(no_of_elevators, no_of_floors, max_passengers_per_elevator, traffic):
+        start_time = time.perf_counter()
+        engine = ReplicaEngine.from_traffic(traffic[traffic_name], seeds, elevators, floors, max_passengers)
+        engine.run()
+        run_time = time.perf_counter() - start_time
+
+        for row in engine.summary():
+            if row['Scope'] == 'All':
+                stats = dict((key, value) for key, value in row.items() if key not in ('Scope', 'Key'))
+                rows.append(dict(Traffic=traffic_name, Elevators=elevators, Floors=floors, MaxPassengers=max_passengers, Replicas=len(seeds),
+                                 RunTime=run_time, **stats))
+
+    return pd.DataFrame(rows)
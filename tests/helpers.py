@@ -0,0 +1,41 @@
+from building import Building
+from common.enums import Direction, Engine
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+from src.traffic import TRAFFIC_GENERATORS
+
+from typing import Dict, Iterable, List, Type
+
+# a run that doesn't finish within this many ticks is taken to loop forever
+MAX_TICKS = 200000
+
+
+def generate_requests(pattern: str, seed: int, no_of_floors: int, no_of_passengers: int = 200, duration: int = 600) -> List[Dict]:
+    return list(TRAFFIC_GENERATORS[pattern](seed, no_of_floors, no_of_passengers=no_of_passengers, duration=duration))
+
+
+def make_building(requests: List[Dict], no_of_elevators: int = 3, no_of_floors: int = 20, max_passengers_per_elevator: int = 6,
+                  engine: Engine = Engine.TICK, scheduler_cls: Type[Scheduler] = Scheduler, **building_kwargs) -> Building:
+    return Building(no_of_elevators=no_of_elevators, no_of_floors=no_of_floors, max_passengers_per_elevator=max_passengers_per_elevator,
+                    request_list=requests, engine=engine, scheduler_cls=scheduler_cls, write_outputs=False, **building_kwargs)
+
+
+def run(building: Building) -> Building:
+    # runs the building to the end, failing if it doesn't finish
+    assert building.schedule(until=MAX_TICKS), 'the run did not finish within {} ticks'.format(MAX_TICKS)
+    return building
+
+
+def passenger_timings(building: Building) -> Dict[str, tuple]:
+    # (pick-up time, end time) of every passenger by id
+    store = building.passengers
+    return dict(zip(store.ids, zip(store.column('PickUpTime').tolist(), store.column('EndTime').tolist())))
+
+
+def riding_past(passengers: Iterable[Passenger], floor: int, direction: Direction) -> int:
+    # brute force count_riding_past
+    if direction == Direction.UP:
+        return sum(1 for passenger in passengers if passenger.start_floor <= floor < passenger.end_floor)
+
+    return sum(1 for passenger in passengers if passenger.start_floor >= floor > passenger.end_floor)
+
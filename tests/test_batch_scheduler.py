@@ -0,0 +1,45 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from src.batch_scheduler import BatchScheduler, min_cost_assignment
+from src.passenger import Passenger
+from tests.helpers import generate_requests, make_building, run
+
+
+@pytest.mark.parametrize('rows, columns', [(1, 1), (3, 3), (3, 5), (5, 7)])
+def test_min_cost_assignment_is_optimal(rows, columns):
+    rnd = np.random.default_rng(rows * columns)
+    for _ in range(20):
+        cost = rnd.integers(0, 50, size=(rows, columns))
+        assignment = min_cost_assignment(cost)
+        best = min(sum(cost[i, j] for i, j in enumerate(columns_)) for columns_ in itertools.permutations(range(columns), rows))
+
+        assert len(set(assignment.tolist())) == rows
+        assert cost[np.arange(rows), assignment].sum() == best
+
+
+def test_batch_is_split_over_the_free_capacity():
+    # a lobby burst into idle elevators fills every elevator, where the Scheduler would give them all to one
+    building = make_building([], no_of_elevators=3, max_passengers_per_elevator=4, scheduler_cls=BatchScheduler)
+    building.scheduler.schedule_elevator([Passenger(str(i), 1, 10, 0) for i in range(12)])
+
+    queues = building.dispatcher.elevator_passenger_queue
+    assert [queues[elevator.name].get_passenger_queue().passenger_count() for elevator in building.dispatcher.elevators] == [4, 4, 4]
+
+
+def test_passengers_without_room_fall_back_to_the_scheduler():
+    building = make_building([], no_of_elevators=2, max_passengers_per_elevator=2, scheduler_cls=BatchScheduler)
+    passengers = [Passenger(str(i), 1, 10, 0) for i in range(5)]
+    building.scheduler.schedule_elevator(passengers)
+
+    assert all(passenger.assigned_elevator is not None for passenger in passengers)
+
+
+@pytest.mark.parametrize('pattern', ['up_peak', 'lunch'])
+def test_bursts_finish(pattern):
+    requests = generate_requests(pattern, seed=1, no_of_floors=30, no_of_passengers=150, duration=30)
+    building = run(make_building(requests, no_of_elevators=6, no_of_floors=30, max_passengers_per_elevator=10, scheduler_cls=BatchScheduler))
+
+    assert building.dispatcher.dropped_off_count == 150
@@ -0,0 +1,51 @@
+from benchmarks import bench_scaling
+from benchmarks.bench_scaling import DEFAULT_BUILDING, find_regressions, run_case
+from common.enums import Engine
+
+BASELINE = dict(case=dict(Ticks=100, Decisions=50, TicksPerCalibration=1000.0, DecisionsPerCalibration=500.0, PeakMemoryMB=1.0))
+
+
+def result(**metrics):
+    return dict(dict(Case='case', Ticks=100, Decisions=50, TicksPerCalibration=1000.0, DecisionsPerCalibration=500.0, PeakMemoryMB=1.0), **metrics)
+
+
+def test_changes_within_the_tolerance_pass():
+    assert find_regressions([result(TicksPerCalibration=850.0, DecisionsPerCalibration=425.0, PeakMemoryMB=1.1)], BASELINE, tolerance=0.2) == []
+
+
+def test_throughput_and_memory_beyond_the_tolerance_are_regressions():
+    regressions = find_regressions([result(TicksPerCalibration=700.0, PeakMemoryMB=1.5)], BASELINE, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith('case: TicksPerCalibration')
+    assert regressions[1].startswith('case: PeakMemoryMB')
+
+
+def test_any_change_of_the_simulated_counts_is_a_regression():
+    regressions = find_regressions([result(Ticks=101, Decisions=49)], BASELINE, tolerance=0.2)
+
+    assert regressions == ['case: Ticks 101 != baseline 100, the simulation behaves differently',
+                           'case: Decisions 49 != baseline 50, the simulation behaves differently']
+
+
+def test_cases_without_a_baseline_are_skipped():
+    assert find_regressions([result(Case='new', TicksPerCalibration=1.0, Ticks=1)], BASELINE, tolerance=0.2) == []
+
+
+def test_throughput_is_relative_to_the_calibration_loop(monkeypatch):
+    # a simulation twice as slow on the same machine halves the throughput, whatever the case
+    times = dict(calibration=2.0, run=4.0)
+    monkeypatch.setattr(bench_scaling, 'time_call', lambda function: times['calibration'])
+    monkeypatch.setattr(bench_scaling, 'time_run', lambda case, engine: (800, 400, times['run']))
+    case = dict(DEFAULT_BUILDING, pattern='lunch', passengers=50)
+
+    fast = run_case(case, Engine.TICK, repeat=2)
+    times['run'] = 8.0
+    slow = run_case(case, Engine.TICK, repeat=2)
+
+    assert (fast['TicksPerCalibration'], fast['DecisionsPerCalibration']) == (400.0, 200.0)
+    assert (slow['TicksPerCalibration'], slow['DecisionsPerCalibration']) == (200.0, 100.0)
+
+
+def test_calibration_loop_is_fixed():
+    assert bench_scaling.calibration_loop(1000) == bench_scaling.calibration_loop(1000)
@@ -0,0 +1,71 @@
+import multiprocessing
+
+import pytest
+
+from campus import Bank, Campus
+from common.enums import Engine
+from tests.helpers import generate_requests, make_building, passenger_timings, run
+from tests.test_cli import imported_modules
+
+
+@pytest.mark.parametrize('engine', [Engine.TICK, Engine.EVENT])
+@pytest.mark.parametrize('pattern', ['up_peak', 'lunch'])
+def test_one_bank_matches_a_building(engine, pattern):
+    requests = generate_requests(pattern, seed=2, no_of_floors=20)
+    building = run(make_building(requests, engine=engine))
+    trips = Campus([Bank('all', 3, range(1, 21), max_passengers_per_elevator=6)], transfer_time=7, engine=engine).run(requests)
+
+    assert trips['TripCompleted'].all()
+    assert (trips['Transfers'] == 0).all()
+    assert dict(zip(trips['Name'], zip(trips['PickUpTime'], trips['EndTime']))) == passenger_timings(building)
+
+
+def make_tower(transfer_time: int = 5) -> Campus:
+    # a low-rise bank, and a high-rise bank reached from the sky lobby at 10
+    return Campus([Bank('low', 2, range(1, 11)), Bank('high', 2, range(10, 21))], transfer_time=transfer_time)
+
+
+def test_routes_use_the_fewest_banks():
+    campus = make_tower()
+
+    assert campus.route(1, 8) == [('low', 1, 8)]
+    assert campus.route(12, 18) == [('high', 12, 18)]
+    assert campus.route(1, 15) == [('low', 1, 10), ('high', 10, 15)]
+    assert campus.route(15, 10) == [('high', 15, 10)]
+    assert campus.route(18, 3) == [('high', 18, 10), ('low', 10, 3)]
+
+
+def test_invalid_routes_and_transfer_times():
+    campus = Campus([Bank('low', 1, range(1, 11)), Bank('high', 1, range(12, 21))])
+    with pytest.raises(ValueError):
+        campus.route(1, 15)
+    with pytest.raises(ValueError):
+        campus.route(3, 3)
+    with pytest.raises(ValueError):
+        Campus([Bank('low', 1, range(1, 11))], transfer_time=0)
+
+
+def test_next_leg_starts_after_the_transfer_time():
+    requests = [dict(time=0, id='a', source=1, dest=15)]
+    trip, = make_tower(transfer_time=5).run(requests).to_dict('records')
+
+    # dropped off at the sky lobby at tick 9, so the high-rise leg is called at tick 9 + 5, like a request to a building of its own
+    assert (trip['Banks'], trip['Transfers'], trip['PickUpTime']) == ('low>high', 1, 0)
+    high = run(make_building([dict(time=14, id='a', source=10, dest=15)], no_of_elevators=2, no_of_floors=20))
+    assert trip['EndTime'] == passenger_timings(high)['a'][1]
+    assert trip['TotalTime'] == trip['EndTime'] + 1
+
+
+def test_banks_that_dont_finish_are_stopped():
+    requests = generate_requests('lunch', seed=0, no_of_floors=20, no_of_passengers=100)
+    with pytest.raises(TimeoutError):
+        make_tower().run(requests, max_ticks=50)
+
+    assert multiprocessing.active_children() == []
+
+
+def test_importing_the_campus_does_not_import_pandas():
+    modules = imported_modules('import campus')
+
+    assert 'building' in modules
+    assert 'pandas' not in modules
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from cli import SCHEDULERS, get_scheduler_cls, main
+from src.scheduler import Scheduler
+from tests.helpers import generate_requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(code: str) -> set:
+    # the modules a fresh interpreter has imported after running the code in the repo root (printed on the last line)
+    output = subprocess.run([sys.executable, '-c', code + '\nimport sys\nprint(" ".join(sys.modules))'], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return set(output.splitlines()[-1].split())
+
+
+@pytest.mark.parametrize('name', list(SCHEDULERS))
+def test_every_scheduler_name_resolves_to_a_scheduler(name):
+    assert issubclass(get_scheduler_cls(name), Scheduler)
+
+
+def test_help_does_not_import_the_simulation():
+    modules = imported_modules('import cli\ntry:\n    cli.main(["--help"])\nexcept SystemExit:\n    pass')
+
+    assert not {'building', 'pandas', 'src.scheduler', 'src.dispatcher'} & modules
+
+
+def test_a_run_without_outputs_does_not_import_pandas():
+    modules = imported_modules('import cli\ncli.main(["-t", "lunch", "--passengers", "20", "--duration", "50", "-f", "10", "--no-outputs"])')
+
+    assert 'building' in modules
+    assert 'pandas' not in modules
+
+
+def test_requests_and_traffic_are_exclusive(capsys):
+    with pytest.raises(SystemExit):
+        main(['-t', 'lunch', '-r', 'requests.csv'])
+    with pytest.raises(SystemExit):
+        main([])
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_runs_a_requests_file(tmp_path, capsys, extension):
+    requests = generate_requests('interfloor', 0, no_of_floors=10, no_of_passengers=30, duration=100)
+    path = str(tmp_path / 'requests.{}'.format(extension))
+    with open(path, 'w') as f:
+        if extension == 'csv':
+            f.write('time,id,source,dest\n')
+            f.writelines('{time},{id},{source},{dest}\n'.format(**request) for request in requests)
+        else:
+            f.writelines(json.dumps(request) + '\n' for request in requests)
+
+    assert main(['-r', path, '-f', '10', '-e', '2', '--no-outputs']) == 0
+    assert capsys.readouterr().out.startswith('Passengers: 30  Ticks: ')
+
+
+def test_writes_the_outputs_and_the_profile(tmp_path, capsys):
+    output_dir = str(tmp_path / 'outputs')
+    assert main(['-t', 'up_peak', '--passengers', '40', '--duration', '100', '-f', '12', '--scheduler', 'vectorized',
+                 '--engine', 'event', '-o', output_dir, '--run-name', 'test', '--profile']) == 0
+
+    assert {'passenger_states_test.csv', 'passenger_stats_test.csv', 'elevator_states_test.csv'} <= set(os.listdir(output_dir))
+    out = capsys.readouterr().out
+    assert out.startswith('Passengers: 40  Ticks: ')
+    assert 'WaitTime' in out
+
+
+def test_writes_a_trace(tmp_path, capsys):
+    trace_path = str(tmp_path / 'run.trace')
+    assert main(['-t', 'lunch', '--passengers', '20', '--duration', '50', '-f', '10', '--no-outputs', '--trace', trace_path]) == 0
+
+    assert os.path.getsize(trace_path) > 0
@@ -0,0 +1,49 @@
+import pytest
+
+from common.enums import Direction
+from tests.helpers import generate_requests, make_building, passenger_timings, run
+
+
+def test_switch_to_next_queue_heads_for_the_pick_up_floor():
+    # b calls going down from above the floor where a is dropped off, so the elevator has to keep going up to get b
+    requests = [dict(time=0, id='a', source=1, dest=5), dict(time=1, id='b', source=8, dest=2)]
+    building = make_building(requests, no_of_elevators=1, no_of_floors=10)
+    elevator = building.dispatcher.elevators[0]
+    for _ in range(5):
+        building.step()
+
+    assert elevator.at_floor() == 5
+    assert elevator.direction == Direction.UP
+    assert elevator.passenger_direction == Direction.DOWN
+
+    run(building)
+    assert passenger_timings(building) == dict(a=(0, 4), b=(7, 13))
+
+
+def test_passengers_at_the_floor_of_a_queue_switch_are_picked_up():
+    # b calls going down from the floor where a is dropped off, and gets on in the same tick
+    requests = [dict(time=0, id='a', source=1, dest=5), dict(time=1, id='b', source=5, dest=2)]
+    building = run(make_building(requests, no_of_elevators=1, no_of_floors=10))
+
+    assert passenger_timings(building) == dict(a=(0, 4), b=(4, 7))
+    assert building.dispatcher.deferred_count == 0
+
+
+def test_passengers_a_full_elevator_leaves_behind_wait_for_it():
+    # the only elevator is full, so b is re-scheduled onto it and waits at the lobby till it comes back
+    requests = [dict(time=0, id='a', source=1, dest=5), dict(time=0, id='b', source=1, dest=5)]
+    building = run(make_building(requests, no_of_elevators=1, no_of_floors=10, max_passengers_per_elevator=1))
+
+    assert passenger_timings(building) == dict(a=(0, 4), b=(8, 12))
+    assert building.dispatcher.reschedule_count == 1
+    assert building.dispatcher.deferred_count == 1
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_bursts_into_small_elevators_finish(seed):
+    # bursts used to leave passengers behind at the floor of an elevator, which then never finished
+    requests = generate_requests('up_peak', seed, no_of_floors=30, no_of_passengers=150, duration=30)
+    building = run(make_building(requests, no_of_elevators=6, no_of_floors=30, max_passengers_per_elevator=4))
+
+    assert building.dispatcher.dropped_off_count == 150
+    assert all(end_time >= pick_up_time for pick_up_time, end_time in passenger_timings(building).values())
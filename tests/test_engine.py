@@ -0,0 +1,39 @@
+import pytest
+
+from common.enums import Engine
+from tests.helpers import generate_requests, make_building, passenger_timings, run
+
+PATTERNS = ['up_peak', 'lunch', 'down_peak', 'interfloor']
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_event_engine_matches_tick_engine(pattern, seed):
+    requests = generate_requests(pattern, seed, no_of_floors=20)
+    tick = run(make_building(requests, engine=Engine.TICK))
+    event = run(make_building(requests, engine=Engine.EVENT))
+
+    assert event.run_timer == tick.run_timer
+    assert passenger_timings(event) == passenger_timings(tick)
+    assert (event.elevator_states.states() == tick.elevator_states.states()).all()
+
+
+def test_event_engine_skips_ticks_without_events():
+    # a single trip from the lobby to the top floor only has events at the pick-up, the drop-off and the end of the run
+    requests = [dict(time=0, id='a', source=1, dest=20)]
+    building = make_building(requests, no_of_elevators=1, engine=Engine.EVENT)
+    steps = []
+    step = building.step
+    building.step = lambda: steps.append(building.run_timer) or step()
+    run(building)
+
+    assert len(steps) < 5
+    assert passenger_timings(building) == dict(a=(0, 19))
+    assert len(building.elevator_states) == building.run_timer
+
+
+def test_ticks_to_next_event_stops_at_the_next_request():
+    building = make_building([dict(time=0, id='a', source=1, dest=20), dict(time=7, id='b', source=3, dest=1)], no_of_elevators=1)
+    building.step()
+
+    assert building.ticks_to_next_event() == 6
@@ -0,0 +1,25 @@
+import pytest
+
+from src.eta_scheduler import EtaScheduler
+from tests.helpers import generate_requests, make_building, passenger_timings, run
+
+
+@pytest.mark.parametrize('source, dest', [(6, 9), (4, 1), (11, 3), (3, 1)])
+def test_eta_of_a_call_is_its_wait(source, dest):
+    # an elevator taking a from 1 to 10 gets a call at tick 2: on its way up, above it, or below it going down
+    requests = [dict(time=0, id='a', source=1, dest=10), dict(time=2, id='b', source=source, dest=dest)]
+    building = make_building(requests, no_of_elevators=1, no_of_floors=12, scheduler_cls=EtaScheduler)
+    etas = []
+    get_pick_up_time = building.scheduler._get_elevator_pick_up_time
+    building.scheduler._get_elevator_pick_up_time = lambda *args: etas.append(get_pick_up_time(*args)) or etas[-1]
+    run(building)
+
+    assert passenger_timings(building)['b'][0] - 2 == etas[-1]
+
+
+@pytest.mark.parametrize('pattern', ['up_peak', 'lunch', 'interfloor'])
+def test_eta_scheduler_runs_finish(pattern):
+    requests = generate_requests(pattern, seed=4, no_of_floors=20, no_of_passengers=300)
+    building = run(make_building(requests, no_of_elevators=4, max_passengers_per_elevator=4, scheduler_cls=EtaScheduler))
+
+    assert building.passengers.trip_completed().all()
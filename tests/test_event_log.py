@@ -0,0 +1,92 @@
+import pytest
+
+from src.event_log import DIRECTION, DROP_OFF, KINDS, PICK_UP, Event, EventLog, canonical, first_divergence, read_csv, write_csv
+from src.profiler import Profiler
+from tests.helpers import generate_requests, make_building, passenger_timings, run
+
+LOGGED_METHODS = [('dispatcher', 'add_passenger_to_elevator_queue'), ('dispatcher', 'pick_up_passenger'), ('dispatcher', 'dispatch'),
+                  ('building', 'record_elevator_state')]
+
+
+def test_canonical_order_ignores_the_order_within_a_tick():
+    events = [Event(1, DROP_OFF, '2', 5, 'b'), Event(1, PICK_UP, '1', 3, 'a'), Event(0, PICK_UP, '2', 1, 'b'), Event(1, DROP_OFF, '1', 4, 'c')]
+
+    assert canonical(events) == [events[2], events[1], events[3], events[0]]
+    assert canonical(reversed(events)) == canonical(events)
+
+
+def test_first_divergence():
+    log = [Event(0, PICK_UP, '1', 1, 'a'), Event(3, DROP_OFF, '1', 4, 'a')]
+
+    assert first_divergence(log, list(log)) is None
+    assert first_divergence(log, [log[0], Event(4, DROP_OFF, '1', 4, 'a')]) == (1, log[1], Event(4, DROP_OFF, '1', 4, 'a'))
+    assert first_divergence(log, log[:1]) == (1, log[1], None)
+    assert first_divergence(log[:1], log) == (1, None, log[1])
+
+
+def test_csv_round_trip(tmp_path):
+    events = [Event(0, PICK_UP, '1', 1, 'a'), Event(2, DIRECTION, '1', 3, detail='UP/UP')]
+    write_csv(events, str(tmp_path / 'events.csv'))
+
+    assert read_csv(str(tmp_path / 'events.csv')) == events
+
+
+def test_logging_does_not_change_the_run():
+    requests = generate_requests('lunch', seed=2, no_of_floors=20, no_of_passengers=150)
+    event_log = EventLog()
+    logged = run(make_building(requests, max_passengers_per_elevator=3, event_log=event_log))
+
+    assert passenger_timings(logged) == passenger_timings(run(make_building(requests, max_passengers_per_elevator=3)))
+    counts = event_log.counts()
+    assert counts[PICK_UP] == counts[DROP_OFF] == 150
+    assert set(counts) == set(KINDS)
+    assert counts['ASSIGN'] == 150 + counts['RESCHEDULE']
+
+
+def test_pick_ups_and_drop_offs_match_the_passengers():
+    requests = generate_requests('interfloor', seed=1, no_of_floors=20, no_of_passengers=80)
+    event_log = EventLog()
+    building = run(make_building(requests, event_log=event_log))
+
+    timings = passenger_timings(building)
+    assert dict((event.passenger, event.time) for event in event_log.events if event.kind == PICK_UP) == \
+        dict((passenger, pick_up_time) for passenger, (pick_up_time, _) in timings.items())
+    assert dict((event.passenger, event.time) for event in event_log.events if event.kind == DROP_OFF) == \
+        dict((passenger, end_time) for passenger, (_, end_time) in timings.items())
+
+
+@pytest.mark.parametrize('detach_order', [('profiler', 'event_log'), ('event_log', 'profiler')])
+def test_profiler_and_event_log_detach_in_any_order(detach_order):
+    building = make_building(generate_requests('interfloor', seed=0, no_of_floors=20, no_of_passengers=50))
+    owners = dict(building=building, dispatcher=building.dispatcher)
+    methods = [getattr(owners[owner], method_name) for owner, method_name in LOGGED_METHODS]
+    hooks = dict(profiler=Profiler(), event_log=EventLog())
+    for hook in hooks.values():
+        hook.attach(building)
+
+    hooks[detach_order[0]].detach()
+    building.step()
+    hooks[detach_order[1]].detach()
+    building.step()
+
+    assert hooks['profiler'].calls['dispatch'] == (1 if detach_order[0] == 'event_log' else 0)
+    assert all(event.time <= 1 for event in hooks['event_log'].events)
+    if detach_order[0] == 'event_log':
+        assert hooks['event_log'].events == []
+    for (owner, method_name), method in zip(LOGGED_METHODS, methods):
+        assert method_name not in vars(owners[owner])
+        assert getattr(owners[owner], method_name) == method
+    for elevator_passenger_queue in building.dispatcher.elevator_passenger_queue.values():
+        assert 'defer_passenger' not in vars(elevator_passenger_queue)
+
+
+def test_detach_keeps_a_method_set_before_the_log():
+    building = make_building([])
+    dispatch = building.dispatcher.dispatch
+    wrapped_dispatch = lambda run_timer, scheduler: dispatch(run_timer, scheduler)
+    building.dispatcher.dispatch = wrapped_dispatch
+
+    event_log = EventLog()
+    event_log.attach(building)
+    event_log.detach()
+    assert building.dispatcher.dispatch is wrapped_dispatch
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from common.enums import Direction
+from src.floor_queue import FloorQueue
+from src.passenger import Passenger
+from tests.helpers import riding_past
+
+
+def random_operations(seed: int, queue: FloorQueue, check):
+    # adds and pops passengers at random, calling check after every operation
+    rnd = random.Random(seed)
+    passengers = dict()
+    for i in range(300):
+        if passengers and rnd.random() < 0.4:
+            floor = rnd.choice(sorted(passengers))
+            assert [passenger.id for passenger in queue.pop(floor)] == [passenger.id for passenger in passengers.pop(floor)]
+        else:
+            floor = rnd.randint(1, 20)
+            passenger = Passenger(str(i), floor, rnd.choice([end for end in range(1, 21) if end != floor]), i)
+            queue.add(floor, passenger)
+            passengers.setdefault(floor, []).append(passenger)
+        check(queue, passengers)
+
+
+def test_floors_are_kept_sorted():
+    def check(queue, passengers):
+        assert queue.keys() == sorted(passengers)
+        assert queue.passenger_count() == sum(len(floor_passengers) for floor_passengers in passengers.values())
+        if passengers:
+            assert (queue.min_floor(), queue.max_floor()) == (min(passengers), max(passengers))
+            assert queue.next_floor(10, Direction.UP) == min([floor for floor in passengers if floor > 10], default=None)
+            assert queue.next_floor(10, Direction.DOWN) == max([floor for floor in passengers if floor < 10], default=None)
+
+    random_operations(0, FloorQueue(), check)
+
+
+@pytest.mark.parametrize('first_query', [0, 50, 299])
+def test_end_floors_index_is_built_when_first_asked(first_query):
+    calls = [0]
+
+    def check(queue, passengers):
+        calls[0] += 1
+        if calls[0] <= first_query or not passengers:
+            return
+
+        end_floors = sorted(passenger.end_floor for floor_passengers in passengers.values() for passenger in floor_passengers)
+        assert (queue.min_end_floor(), queue.max_end_floor()) == (end_floors[0], end_floors[-1])
+        assert queue.count_end_floors_beyond(10, Direction.UP) == sum(1 for end_floor in end_floors if end_floor > 10)
+        assert queue.count_end_floors_beyond(10, Direction.DOWN) == sum(1 for end_floor in end_floors if end_floor < 10)
+
+    random_operations(1, FloorQueue(), check)
+
+
+def test_end_floors_are_only_kept_once_asked_for():
+    queue = FloorQueue()
+    queue.add(3, Passenger('a', 3, 8, 0))
+    assert queue._FloorQueue__end_floors is None
+
+    assert queue.max_end_floor() == 8
+    queue.add(5, Passenger('b', 5, 12, 0))
+    assert queue._FloorQueue__end_floors == [8, 12]
+
+
+@pytest.mark.parametrize('first_query', [0, 50, 299])
+def test_count_riding_past_matches_a_scan(first_query):
+    # the passengers go both ways, like a NEXT queue filled while the elevator was idle
+    calls = [0]
+
+    def check(queue, passengers):
+        calls[0] += 1
+        if calls[0] <= first_query:
+            return
+
+        queued = [passenger for floor_passengers in passengers.values() for passenger in floor_passengers]
+        for floor in range(1, 21):
+            for direction in (Direction.UP, Direction.DOWN):
+                assert queue.count_riding_past(floor, direction) == riding_past(queued, floor, direction)
+
+    random_operations(2, FloorQueue(), check)
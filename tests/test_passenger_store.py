@@ -0,0 +1,118 @@
+import pickle
+
+import numpy as np
+
+from src.passenger import Passenger
+from src.passenger_store import MISSING_TIME, PassengerStore
+from tests.helpers import generate_requests, make_building, run
+
+
+def make_passengers(count: int, start_time: int = 0):
+    return [Passenger('p{}'.format(i), 1, 2 + i % 5, start_time + i) for i in range(count)]
+
+
+def complete(passenger: Passenger, pick_up_time: int, end_time: int):
+    passenger.pick_up_time = pick_up_time
+    passenger.set_end_time(end_time)
+
+
+def test_columns_grow_past_the_capacity():
+    store = PassengerStore(capacity=2)
+    passengers = make_passengers(5)
+    store.add(passengers[:3])
+    store.add(passengers[3:])
+
+    assert len(store) == 5
+    assert store.ids == ['p0', 'p1', 'p2', 'p3', 'p4']
+    assert [passenger.index for passenger in passengers] == [0, 1, 2, 3, 4]
+    assert store.column('StartTime').tolist() == [0, 1, 2, 3, 4]
+    assert store.column('EndFloor').tolist() == [2, 3, 4, 5, 6]
+
+
+def test_timings_are_recorded_when_passengers_complete():
+    store = PassengerStore()
+    passengers = make_passengers(3)
+    store.add(passengers)
+    complete(passengers[1], 4, 9)
+    passengers[1].reschedule_count = 2
+    store.complete([passengers[1]])
+
+    assert store.trip_completed().tolist() == [False, True, False]
+    assert store.column('PickUpTime').tolist() == [MISSING_TIME, 4, MISSING_TIME]
+    assert store.column('Reschedules')[1] == 2
+    stats = store.stats()
+    assert stats['WaitTime'] == dict(min=4, max=4, mean=4.0)
+    assert stats['TotalTime'] == dict(min=9, max=9, mean=9.0)
+
+
+def test_stats_are_none_without_completed_trips():
+    store = PassengerStore()
+    store.add(make_passengers(2))
+
+    assert store.stats() == dict(PickUpTime=None, WaitTime=None, TotalTime=None)
+
+
+def test_dataframe_leaves_missing_timings_empty():
+    store = PassengerStore()
+    passengers = make_passengers(2)
+    store.add(passengers)
+    complete(passengers[0], 2, 5)
+    store.complete(passengers[:1])
+    df = store.to_dataframe()
+
+    assert df['Name'].tolist() == ['p0', 'p1']
+    assert df['TotalTime'][0] == 6
+    assert np.isnan(df['TotalTime'][1]) and np.isnan(df['PickUpTime'][1])
+    assert df['TripCompleted'].tolist() == [True, False]
+
+
+def test_pickle_keeps_only_the_logged_passengers():
+    store = PassengerStore(capacity=1000)
+    store.add(make_passengers(3))
+    restored = pickle.loads(pickle.dumps(store))
+
+    assert len(pickle.dumps(store)) < 1000
+    assert restored.column('StartTime').tolist() == [0, 1, 2]
+    restored.add(make_passengers(1, start_time=10))
+    assert restored.column('StartTime').tolist() == [0, 1, 2, 10]
+
+
+def test_store_matches_the_passengers_of_a_run():
+    building = make_building(generate_requests('lunch', seed=2, no_of_floors=20))
+    store = building.passengers
+    dropped = []
+    store_complete = store.complete
+    store.complete = lambda passengers: dropped.extend(passengers) or store_complete(passengers)
+    run(building)
+
+    assert store.trip_completed().all()
+    assert sorted(passenger.id for passenger in dropped) == sorted(store.ids)
+    for passenger in dropped:
+        assert store.ids[passenger.index] == passenger.id
+        assert store.wait_times()[passenger.index] == passenger.total_wait_time()
+        assert store.total_times()[passenger.index] == passenger.total_time()
+
+
+def test_discard_completed_before_stops_at_the_first_waiting_passenger():
+    store = PassengerStore(capacity=4)
+    passengers = make_passengers(5)
+    store.add(passengers)
+    for passenger, end_time in zip(passengers, [3, 5, 9]):
+        complete(passenger, passenger.start_time, end_time)
+    store.complete(passengers[:3])
+    store.discard_completed_before(6)
+
+    # p2 completed after the end time, so it keeps p3 and p4
+    assert store.ids == ['p2', 'p3', 'p4']
+    assert store.discarded == 2
+    assert store.trip_completed().tolist() == [True, False, False]
+
+    # the remaining passengers keep their indexes, and new ones continue them
+    complete(passengers[3], 4, 7)
+    store.complete([passengers[3]])
+    store.add(make_passengers(1, start_time=20))
+    assert store.column('EndTime').tolist() == [9, 7, MISSING_TIME, MISSING_TIME]
+    assert store.ids[-1] == 'p0' and store.column('StartTime')[-1] == 20
+
+    store.discard_completed_before(100)
+    assert store.ids == ['p4', 'p0']
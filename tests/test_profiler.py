@@ -0,0 +1,62 @@
+from common.enums import Engine
+from src.profiler import PHASES, Profiler
+from tests.helpers import generate_requests, make_building, passenger_timings, run
+
+
+def test_profiling_doesnt_change_the_run():
+    requests = generate_requests('lunch', seed=4, no_of_floors=20)
+    profiled = run(make_building(requests, profiler=Profiler()))
+
+    assert passenger_timings(profiled) == passenger_timings(run(make_building(requests)))
+
+
+def test_phases_are_counted():
+    profiler = Profiler()
+    building = run(make_building(generate_requests('up_peak', seed=0, no_of_floors=20), max_passengers_per_elevator=2, profiler=profiler))
+
+    assert profiler.calls['dispatch'] == building.run_timer
+    assert profiler.calls['record_elevator_state'] == building.run_timer
+    assert profiler.calls['schedule_elevator'] >= 1
+    assert all(wall_time >= 0 for wall_time in profiler.wall_time.values())
+
+    totals = profiler.totals()
+    assert totals['Ticks'] == building.run_timer
+    assert totals['PickedUp'] == totals['DroppedOff'] == len(building.passengers)
+    assert totals['Reschedules'] > 0
+    assert totals['RunTime'] > 0
+
+
+def test_event_engine_counts_the_skipped_ticks_once():
+    profiler = Profiler()
+    building = run(make_building([dict(time=0, id='a', source=1, dest=20)], no_of_elevators=1, engine=Engine.EVENT, profiler=profiler))
+
+    assert profiler.calls['dispatch'] < building.run_timer
+    assert profiler.calls['ticks_to_next_event'] > 0
+
+
+def test_hooks_get_every_phase_call():
+    calls = []
+    profiler = Profiler(hooks=[lambda phase, wall_time: calls.append(phase)])
+    run(make_building(generate_requests('interfloor', seed=1, no_of_floors=20, no_of_passengers=50), profiler=profiler))
+
+    assert len(calls) == sum(profiler.calls.values())
+    assert set(calls) <= set(PHASES)
+
+
+def test_report_lists_every_phase():
+    profiler = Profiler()
+    run(make_building(generate_requests('interfloor', seed=1, no_of_floors=20, no_of_passengers=50), profiler=profiler))
+    report = profiler.report()
+
+    assert all(phase in report for phase in PHASES)
+    assert 'TicksPerSecond' in report
+
+
+def test_detach_restores_the_methods():
+    profiler = Profiler()
+    building = make_building([], profiler=profiler)
+    profiler.detach()
+
+    assert 'dispatch' not in vars(building.dispatcher)
+    assert 'schedule_elevator' not in vars(building.scheduler)
+    assert 'record_elevator_state' not in vars(building)
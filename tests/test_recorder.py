@@ -0,0 +1,46 @@
+import pickle
+
+from src.recorder import ElevatorStateRecorder
+
+
+def test_record_grows_past_the_initial_capacity():
+    recorder = ElevatorStateRecorder(['1', '2'], capacity=2)
+    for tick in range(5):
+        recorder.record(tick, [tick + 1, 10 - tick])
+
+    assert len(recorder) == 5
+    assert recorder.states().tolist() == [[tick, tick + 1, 10 - tick] for tick in range(5)]
+    assert recorder.columns == ['RunTimer', 'Elevator 1', 'Elevator 2']
+
+
+def test_record_span_matches_recording_every_tick():
+    floors, steps = [3, 10, 5], [1, -1, 0]
+    span = ElevatorStateRecorder(['1', '2', '3'], capacity=1)
+    span.record_span(7, floors, steps, ticks=4)
+
+    ticks = ElevatorStateRecorder(['1', '2', '3'])
+    for i in range(4):
+        ticks.record(7 + i, [floor + (i + 1) * step for floor, step in zip(floors, steps)])
+
+    assert span.states().tolist() == ticks.states().tolist()
+
+
+def test_pickle_keeps_only_the_recorded_states():
+    recorder = ElevatorStateRecorder(['1'], capacity=1024)
+    recorder.record(0, [1])
+    recorder.record(1, [2])
+    restored = pickle.loads(pickle.dumps(recorder))
+
+    assert restored.states().tolist() == [[0, 1], [1, 2]]
+    restored.record(2, [3])
+    assert len(restored) == 3
+
+
+def test_discard_before_keeps_the_later_states():
+    recorder = ElevatorStateRecorder(['1'], capacity=4)
+    recorder.record_span(0, [1], [1], ticks=6)
+    recorder.discard_before(4)
+
+    assert recorder.states().tolist() == [[4, 6], [5, 7]]
+    recorder.record(6, [8])
+    assert recorder.states().tolist() == [[4, 6], [5, 7], [6, 8]]
@@ -0,0 +1,58 @@
+import argparse
+import os
+
+import pytest
+
+from replay import check_variant, diff, main, report
+from src.event_log import DROP_OFF, KINDS, PICK_UP
+from tests.helpers import generate_requests
+
+REQUESTS = generate_requests('lunch', seed=0, no_of_floors=15, no_of_passengers=120, duration=300)
+
+
+@pytest.mark.parametrize('candidate', ['event:default', 'tick:vectorized', 'event:vectorized'])
+def test_equivalent_variants_have_identical_logs(candidate):
+    result = diff('tick:default', candidate, REQUESTS, 3, 15, 4)
+
+    assert result['Divergence'] is None
+    assert result['Kinds'] == list(KINDS)
+    assert result['ReferenceLog'] == result['CandidateLog']
+    assert len(result['ReferenceLog']) > 240
+    assert 'The event logs are identical' in report(result)
+
+
+def test_replica_is_compared_on_pick_ups_and_drop_offs():
+    result = diff('tick:default', 'replica', REQUESTS, 3, 15, 4)
+
+    assert result['Kinds'] == [PICK_UP, DROP_OFF]
+    assert result['Divergence'] is None
+    assert len(result['CandidateLog']) == 240
+
+
+def test_report_shows_the_first_divergence():
+    requests = generate_requests('up_peak', seed=0, no_of_floors=15, no_of_passengers=60, duration=20)
+    result = diff('tick:default', 'tick:batch', requests, 3, 15, 4)
+    index, reference_event, candidate_event = result['Divergence']
+
+    assert result['ReferenceLog'][:index] == result['CandidateLog'][:index]
+    assert reference_event != candidate_event
+    lines = report(result, context=2).splitlines()
+    assert lines[2] == 'First divergence at event {}:'.format(index)
+    assert lines[3:-1] == ['    both       {}'.format(event) for event in result['ReferenceLog'][max(0, index - 2):index]] + \
+        ['    reference  {}'.format(reference_event), '    candidate  {}'.format(candidate_event)]
+
+
+@pytest.mark.parametrize('variant', ['tick', 'tick:', 'fast:default', 'event:unknown', 'replicas'])
+def test_bad_variants_are_rejected(variant):
+    with pytest.raises(argparse.ArgumentTypeError):
+        check_variant(variant)
+
+
+def test_main_exits_with_the_outcome_and_saves_the_logs(tmp_path, capsys):
+    args = ['-t', 'up_peak', '--passengers', '60', '--duration', '20', '-f', '15', '-e', '3', '-c', '4', '--save-logs', str(tmp_path)]
+
+    assert main(['tick:default', 'event:default'] + args) == 0
+    assert main(['tick:default', 'tick:batch'] + args) == 1
+    assert 'First divergence at event' in capsys.readouterr().out
+    assert sorted(os.listdir(tmp_path)) == ['event_log_candidate_event_default.csv', 'event_log_candidate_tick_batch.csv',
+                                            'event_log_reference_tick_default.csv']
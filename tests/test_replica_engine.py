@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.event_log import DROP_OFF, PICK_UP, EventLog
+from src.passenger_store import MISSING_TIME
+from src.replica_engine import ReplicaEngine
+from src.traffic import TRAFFIC_GENERATORS
+from tests.helpers import MAX_TICKS, generate_requests, make_building, passenger_timings, run
+
+
+def replica_timings(engine: ReplicaEngine, replica: int):
+    # (pick-up time, end time) of every passenger of a replica by id, like passenger_timings
+    count = engine.no_of_passengers[replica]
+    return dict(zip(engine.ids[replica], zip(engine.pick_up_time[replica, :count].tolist(), engine.end_time[replica, :count].tolist())))
+
+
+@pytest.mark.parametrize('pattern', ['up_peak', 'down_peak', 'lunch', 'interfloor'])
+@pytest.mark.parametrize('no_of_elevators, max_passengers', [(1, 4), (3, 6), (5, 2)])
+def test_every_replica_matches_a_building(pattern, no_of_elevators, max_passengers):
+    replicas = [generate_requests(pattern, seed, no_of_floors=15, no_of_passengers=120, duration=300) for seed in range(4)]
+    engine = ReplicaEngine(no_of_elevators, 15, max_passengers, replicas)
+    assert engine.run(max_ticks=MAX_TICKS)
+
+    for r, requests in enumerate(replicas):
+        building = run(make_building(requests, no_of_elevators=no_of_elevators, no_of_floors=15, max_passengers_per_elevator=max_passengers))
+        assert replica_timings(engine, r) == passenger_timings(building)
+
+
+def test_events_match_the_building():
+    requests = generate_requests('lunch', 3, no_of_floors=12, no_of_passengers=60, duration=200)
+    engine = ReplicaEngine(2, 12, 4, [requests])
+    engine.run()
+    building = run(make_building(requests, no_of_elevators=2, no_of_floors=12, max_passengers_per_elevator=4, event_log=EventLog()))
+
+    pick_ups_and_drop_offs = [event for event in building.event_log.events if event.kind in (PICK_UP, DROP_OFF)]
+    assert sorted(engine.events(0)) == sorted(pick_ups_and_drop_offs)
+
+
+def test_replicas_of_different_sizes_finish():
+    replicas = [generate_requests('up_peak', 0, no_of_floors=10, no_of_passengers=n, duration=100) for n in (0, 5, 50)]
+    engine = ReplicaEngine(2, 10, 4, replicas)
+
+    assert engine.run()
+    assert engine.is_finished().all()
+    assert (engine.total_times()[2] != MISSING_TIME).all()
+    assert (engine.total_times()[1, :5] != MISSING_TIME).all()
+
+
+def test_run_stops_after_max_ticks():
+    engine = ReplicaEngine.from_traffic(TRAFFIC_GENERATORS['up_peak'], [0, 1], 2, 10, 4, no_of_passengers=100, duration=100)
+
+    assert not engine.run(max_ticks=5)
+    assert not engine.is_finished().any()
+
+
+def test_summary_covers_every_replica():
+    engine = ReplicaEngine.from_traffic(TRAFFIC_GENERATORS['interfloor'], [0, 1, 2], 2, 10, 4, no_of_passengers=30, duration=100)
+    engine.run()
+    rows = engine.summary()
+
+    assert [(row['Scope'], row['Key'], row['Metric']) for row in rows] == \
+        [('All', 'all', 'WaitTime')] + [('Replica', r, 'WaitTime') for r in range(3)] + \
+        [('All', 'all', 'TotalTime')] + [('Replica', r, 'TotalTime') for r in range(3)]
+    assert rows[0]['Count'] == 90
+    assert rows[4]['Mean'] == pytest.approx(np.mean(engine.total_times()))
+
+
+def test_saturated_replicas_match_a_building():
+    # bursts much larger than the elevators can take, so full elevators re-schedule and defer passengers
+    replicas = [generate_requests('up_peak', seed, no_of_floors=20, no_of_passengers=400, duration=30) for seed in range(3)]
+    engine = ReplicaEngine(3, 20, 3, replicas)
+    assert engine.run(max_ticks=MAX_TICKS)
+
+    for r, requests in enumerate(replicas):
+        building = run(make_building(requests, no_of_elevators=3, max_passengers_per_elevator=3))
+        assert replica_timings(engine, r) == passenger_timings(building)
@@ -0,0 +1,56 @@
+import json
+
+from src.request_stream import RequestStream, read_csv_requests, read_jsonl_requests
+
+
+def request(time: int, id: str) -> dict:
+    return dict(time=time, id=id, source=1, dest=2)
+
+
+def test_requests_are_issued_in_the_order_of_their_time():
+    stream = RequestStream([request(5, 'c'), request(1, 'a'), request(3, 'b'), request(3, 'b2')])
+
+    assert stream.next_request_time() == 1
+    assert [req['id'] for req in stream.pop_requests(3)] == ['a', 'b', 'b2']
+    assert stream.pop_requests(4) == []
+    assert [req['id'] for req in stream.pop_requests(5)] == ['c']
+    assert stream.is_empty()
+
+
+def test_the_buffer_bounds_the_requests_read_ahead():
+    read = []
+
+    def requests():
+        for i in range(100):
+            read.append(i)
+            yield request(i, str(i))
+
+    stream = RequestStream(requests(), buffer_size=4)
+    stream.pop_requests(0)
+    assert len(read) <= 5
+
+
+def test_late_requests_are_issued_straight_away():
+    # a request that is read after its time has passed keeps its time, and is issued together with the request before it
+    stream = RequestStream([request(10, 'a'), request(2, 'late')], buffer_size=1)
+
+    assert stream.pop_requests(9) == []
+    assert [(req['id'], req['time']) for req in stream.pop_requests(10)] == [('a', 10), ('late', 2)]
+
+
+def test_push_adds_a_request_in_time_order():
+    stream = RequestStream([request(1, 'a'), request(9, 'c')])
+    stream.push(request(4, 'b'))
+
+    assert [req['id'] for req in stream.pop_requests(9)] == ['a', 'b', 'c']
+
+
+def test_read_requests_from_files(tmp_path):
+    csv_path = tmp_path / 'requests.csv'
+    csv_path.write_text('time,id,source,dest\n0,a,1,5\n3,b,4,2\n')
+    jsonl_path = tmp_path / 'requests.jsonl'
+    jsonl_path.write_text(json.dumps(dict(time=0, id='a', source=1, dest=5)) + '\n\n' + json.dumps(dict(time=3, id='b', source=4, dest=2)) + '\n')
+
+    expected = [dict(time=0, id='a', source=1, dest=5), dict(time=3, id='b', source=4, dest=2)]
+    assert list(read_csv_requests(str(csv_path))) == expected
+    assert list(read_jsonl_requests(str(jsonl_path))) == expected
@@ -0,0 +1,86 @@
+import pytest
+
+from common.enums import Direction, Engine
+from src.passenger import Passenger
+from src.reservation_scheduler import ReservationScheduler
+from src.scheduler import Scheduler
+from tests.helpers import generate_requests, make_building, passenger_timings, riding_past, run
+
+SURGE = generate_requests('up_peak', 0, no_of_floors=20, no_of_passengers=400, duration=30)
+
+
+def queued_counts(building):
+    queues = building.dispatcher.elevator_passenger_queue
+    return [queues[elevator.name].get_passenger_queue().passenger_count() for elevator in building.dispatcher.elevators]
+
+
+def test_burst_is_split_over_the_elevators_as_they_fill_up():
+    passengers = [Passenger(str(i), 1, 10, 0) for i in range(12)]
+    building = make_building([], no_of_elevators=3, max_passengers_per_elevator=4, scheduler_cls=ReservationScheduler)
+    building.scheduler.schedule_elevator(passengers)
+    assert queued_counts(building) == [4, 4, 4]
+
+    # the Scheduler queues them all on the first elevator
+    building = make_building([], no_of_elevators=3, max_passengers_per_elevator=4)
+    building.scheduler.schedule_elevator([Passenger(str(i), 1, 10, 0) for i in range(12)])
+    assert queued_counts(building) == [12, 0, 0]
+
+
+def test_calls_go_to_the_quickest_elevator_when_every_elevator_is_full():
+    building = make_building([], no_of_elevators=2, max_passengers_per_elevator=2, scheduler_cls=ReservationScheduler)
+    passengers = [Passenger(str(i), 1, 10, 0) for i in range(7)]
+    building.scheduler.schedule_elevator(passengers)
+
+    assert sorted(queued_counts(building)) == [2, 5]
+    assert all(passenger.assigned_elevator is not None for passenger in passengers)
+
+
+def test_committed_load_counts_the_queued_passengers_riding_past():
+    building = make_building(SURGE[:150], max_passengers_per_elevator=3, scheduler_cls=ReservationScheduler)
+    for _ in range(60):
+        building.step()
+        for elevator in building.dispatcher.elevators:
+            for queue in building.dispatcher.elevator_passenger_queue[elevator.name].dispatch_queue.values():
+                queued = [passenger for passengers in queue.values() for passenger in passengers]
+                for floor in range(1, 21, 3):
+                    for direction in (Direction.UP, Direction.DOWN):
+                        assert queue.count_riding_past(floor, direction) == riding_past(queued, floor, direction)
+
+
+def test_passengers_are_rescheduled_at_most_max_reschedules_times():
+    building = run(make_building(SURGE, max_passengers_per_elevator=3, scheduler_cls=ReservationScheduler))
+    reschedules = building.passengers.column('Reschedules')
+
+    assert reschedules.max() == ReservationScheduler.MAX_RESCHEDULES
+    assert reschedules.sum() == building.dispatcher.reschedule_count
+    assert building.dispatcher.deferred_count > 0
+    assert building.passengers.trip_completed().all()
+
+
+def test_the_scheduler_keeps_rescheduling():
+    building = run(make_building(SURGE, max_passengers_per_elevator=3))
+    reschedules = building.passengers.column('Reschedules')
+
+    assert reschedules.max() > ReservationScheduler.MAX_RESCHEDULES
+    assert reschedules.sum() == building.dispatcher.reschedule_count
+
+
+def test_reschedule_passenger_refuses_after_max_reschedules():
+    building = make_building([], no_of_elevators=2, scheduler_cls=ReservationScheduler)
+    elevator = building.dispatcher.elevators[0]
+    passenger = Passenger('a', 3, 8, 0)
+
+    assert building.scheduler.reschedule_passenger(elevator, passenger)
+    passenger.reschedule_count = ReservationScheduler.MAX_RESCHEDULES
+    assert not building.scheduler.reschedule_passenger(elevator, passenger)
+    assert Scheduler.reschedule_passenger(building.scheduler, elevator, passenger)
+
+
+@pytest.mark.parametrize('pattern', ['up_peak', 'lunch', 'down_peak'])
+def test_engines_match(pattern):
+    requests = generate_requests(pattern, 1, no_of_floors=20, no_of_passengers=300, duration=120)
+    timings = [passenger_timings(run(make_building(requests, no_of_elevators=4, max_passengers_per_elevator=4, engine=engine,
+                                                   scheduler_cls=ReservationScheduler)))
+               for engine in (Engine.TICK, Engine.EVENT)]
+
+    assert timings[0] == timings[1]
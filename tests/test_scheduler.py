@@ -0,0 +1,47 @@
+import pytest
+
+from src.event_log import EventLog
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+from tests.helpers import generate_requests, make_building, run
+
+
+class UncachedScheduler(Scheduler):
+
+    def _cost_state_key(self, elevator):
+        # a key that never matches, so every pick-up time is computed again
+        return object()
+
+
+@pytest.mark.parametrize('pattern', ['up_peak', 'lunch', 'interfloor'])
+def test_cached_pick_up_times_give_the_same_assignments(pattern):
+    requests = generate_requests(pattern, seed=8, no_of_floors=20, no_of_passengers=300)
+    logs = []
+    for scheduler_cls in [Scheduler, UncachedScheduler]:
+        logs.append(EventLog())
+        run(make_building(requests, no_of_elevators=4, max_passengers_per_elevator=3, scheduler_cls=scheduler_cls, event_log=logs[-1]))
+
+    assert logs[0].canonical() == logs[1].canonical()
+
+
+def test_pick_up_times_are_computed_once_per_elevator_state():
+    building = make_building([], no_of_elevators=5)
+    scheduler = building.scheduler
+    computed = []
+    get_pick_up_time = scheduler._get_elevator_pick_up_time
+    scheduler._get_elevator_pick_up_time = lambda elevator, *args: computed.append(elevator.name) or get_pick_up_time(elevator, *args)
+
+    scheduler.schedule_elevator([Passenger(str(i), 1, 10, 0) for i in range(4)])
+    # every elevator on the first call, then only the elevator that started moving for the first passenger.
+    # queueing more passengers at the same floor doesn't change the elevator, so its pick-up time stays cached
+    assert computed == ['1', '2', '3', '4', '5', '1']
+
+
+def test_cache_is_bounded():
+    building = make_building([], no_of_elevators=1, no_of_floors=300)
+    scheduler = building.scheduler
+    elevator = building.dispatcher.elevators[0]
+    for floor in range(2, 300):
+        scheduler._get_cached_pick_up_time(elevator, floor, Passenger('a', floor, 1, 0).direction())
+
+    assert len(scheduler._Scheduler__cost_cache['1'][1]) == Scheduler.COST_CACHE_SIZE
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+from src.service import DispatchService
+from tests.helpers import make_building
+
+
+def make_service(**service_kwargs) -> DispatchService:
+    return DispatchService(make_building([], no_of_elevators=2, no_of_floors=10), tick_interval=0, **service_kwargs)
+
+
+def run_async(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_invalid_calls_are_rejected():
+    async def submit():
+        service = make_service()
+        for source, dest in [(0, 5), (3, 11), (4, 4)]:
+            with pytest.raises(ValueError):
+                service.submit_call(source, dest)
+        return service.calls.qsize()
+
+    assert run_async(submit()) == 0
+
+
+def test_calls_are_issued_up_to_the_limit_per_tick():
+    async def burst():
+        service = make_service(max_calls_per_tick=3)
+        for _ in range(7):
+            service.submit_call(1, 5)
+        return [len(service.tick()['assignments']) for _ in range(4)]
+
+    assert run_async(burst()) == [3, 3, 1, 0]
+
+
+def test_slow_subscribers_drop_the_oldest_updates():
+    async def publish():
+        service = make_service(subscriber_queue_size=2)
+        queue = service.subscribe()
+        for _ in range(5):
+            service.tick()
+        return service.dropped_updates, [queue.get_nowait()['tick'] for _ in range(queue.qsize())]
+
+    assert run_async(publish()) == (3, [3, 4])
+
+
+def test_history_is_bounded_by_the_retention():
+    async def run_service():
+        service = make_service(retention=50)
+        sizes = []
+        for tick in range(1000):
+            if tick % 3 == 0:
+                service.submit_call(1 + tick % 10, 1 + (tick + 5) % 10)
+            service.tick()
+            sizes.append((len(service.building.elevator_states), len(service.building.passengers)))
+        return service, sizes
+
+    service, sizes = run_async(run_service())
+    assert max(states for states, _ in sizes) <= 100
+    assert max(passengers for _, passengers in sizes) <= 60
+    assert service.building.elevator_states.states()[-1, 0] == 999
+    # the stats still cover every passenger that was dropped off
+    assert service.building.passenger_stats.overall['TotalTime'].count == service.building.dispatcher.dropped_off_count > 300
+
+
+def test_history_is_kept_without_a_retention():
+    async def run_service():
+        service = make_service(retention=None)
+        for _ in range(300):
+            service.tick()
+        return len(service.building.elevator_states)
+
+    assert run_async(run_service()) == 300
+
+
+def test_calls_and_updates_over_a_socket(tmp_path):
+    async def serve():
+        service = make_service()
+        path = str(tmp_path / 'service.sock')
+        server = await service.serve_unix(path)
+
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'{"source": 1, "dest": 5, "id": "a"}\n{"source": 1}\n')
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+
+        subscriber_reader, subscriber_writer = await asyncio.open_unix_connection(path)
+        subscriber_writer.write(b'{"subscribe": true}\n')
+        while not service.subscribers:
+            await asyncio.sleep(0)
+        await service.run(ticks=2)
+        updates = [json.loads(await subscriber_reader.readline()) for _ in range(2)]
+
+        for stream_writer in [writer, subscriber_writer]:
+            stream_writer.close()
+            await stream_writer.wait_closed()
+        # let the connections of the service see that the clients are gone
+        while service.subscribers:
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return responses, updates
+
+    responses, updates = run_async(serve())
+    assert responses[0] == dict(id='a')
+    assert 'error' in responses[1]
+    assert updates[0]['assignments'] == [dict(id='a', elevator='1')]
+    assert [update['tick'] for update in updates] == [0, 1]
+
+
+def test_subscribers_that_keep_sending_are_read_in_bounded_chunks(tmp_path, monkeypatch):
+    read_sizes = []
+    read = asyncio.StreamReader.read
+
+    def recording_read(self, n=-1):
+        read_sizes.append(n)
+        return read(self, n)
+
+    monkeypatch.setattr(asyncio.StreamReader, 'read', recording_read)
+
+    async def serve():
+        service = make_service()
+        path = str(tmp_path / 'service.sock')
+        server = await service.serve_unix(path)
+
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'{"subscribe": true}\n')
+        while not service.subscribers:
+            await asyncio.sleep(0)
+        writer.write(b'x' * 100000)
+        await writer.drain()
+        await service.run(ticks=1)
+        update = json.loads(await reader.readline())
+
+        writer.close()
+        await writer.wait_closed()
+        while service.subscribers:
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return update
+
+    assert run_async(serve())['tick'] == 0
+    assert read_sizes and all(0 < n <= 4096 for n in read_sizes)
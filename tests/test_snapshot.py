@@ -0,0 +1,92 @@
+import pickle
+import zlib
+
+import pytest
+
+from building import Building
+from common.enums import Engine
+from src.profiler import Profiler
+from src.vectorized_scheduler import VectorizedScheduler
+from tests.helpers import MAX_TICKS, generate_requests, make_building, passenger_timings, run
+
+
+def restore(snapshot, requests, **building_kwargs):
+    return Building.restore(snapshot, requests, write_outputs=False, **building_kwargs)
+
+
+@pytest.mark.parametrize('engine', [Engine.TICK, Engine.EVENT])
+def test_restored_run_matches_the_uninterrupted_run(engine):
+    requests = generate_requests('lunch', seed=6, no_of_floors=20)
+    expected = run(make_building(requests, engine=engine))
+
+    building = make_building(requests, engine=engine)
+    assert building.schedule(until=150) is False
+    snapshot = building.snapshot()
+    # the snapshot can be restored many times, and the paused building continues as well
+    for resumed in [restore(snapshot, requests), restore(snapshot, requests), building]:
+        assert resumed.schedule(until=MAX_TICKS)
+        assert resumed.run_timer == expected.run_timer
+        assert passenger_timings(resumed) == passenger_timings(expected)
+        assert (resumed.elevator_states.states() == expected.elevator_states.states()).all()
+
+
+def test_restore_with_another_scheduler():
+    requests = generate_requests('up_peak', seed=2, no_of_floors=20)
+    building = make_building(requests)
+    building.schedule(until=100)
+    restored = run(restore(building.snapshot(), requests, scheduler_cls=VectorizedScheduler))
+
+    assert isinstance(restored.scheduler, VectorizedScheduler)
+    assert restored.passengers.trip_completed().all()
+
+
+def test_snapshot_with_a_profiler():
+    requests = generate_requests('lunch', seed=6, no_of_floors=20)
+    profiler = Profiler()
+    building = make_building(requests, profiler=profiler)
+    building.schedule(until=150)
+    snapshot = building.snapshot()
+    calls = profiler.calls['dispatch']
+
+    # the profiler is attached again after the snapshot, and a restored building gets its own
+    run(building)
+    assert profiler.calls['dispatch'] == building.run_timer > calls
+    restored_profiler = Profiler()
+    restored = run(restore(snapshot, requests, profiler=restored_profiler))
+    assert restored_profiler.calls['dispatch'] == restored.run_timer - 150
+    assert passenger_timings(restored) == passenger_timings(building)
+
+
+def test_detach_restores_the_previous_method():
+    building = make_building([])
+    dispatch = building.dispatcher.dispatch
+    wrapped_dispatch = lambda run_timer, scheduler: dispatch(run_timer, scheduler)
+    building.dispatcher.dispatch = wrapped_dispatch
+
+    profiler = Profiler()
+    profiler.attach(building)
+    assert building.dispatcher.dispatch is not wrapped_dispatch
+    profiler.detach()
+    assert building.dispatcher.dispatch is wrapped_dispatch
+
+
+@pytest.mark.parametrize('detach_order', [(0, 1), (1, 0)])
+def test_profilers_detach_in_any_order(detach_order):
+    building = make_building(generate_requests('interfloor', seed=0, no_of_floors=20, no_of_passengers=50))
+    profilers = [Profiler(), Profiler()]
+    for profiler in profilers:
+        profiler.attach(building)
+
+    profilers[detach_order[0]].detach()
+    building.step()
+    assert profilers[detach_order[0]].calls['dispatch'] == 0
+    assert profilers[detach_order[1]].calls['dispatch'] == 1
+
+    profilers[detach_order[1]].detach()
+    assert 'dispatch' not in vars(building.dispatcher)
+    assert 'schedule_elevator' not in vars(building.scheduler)
+
+
+def test_unsupported_snapshot_version():
+    with pytest.raises(ValueError):
+        Building.restore(zlib.compress(pickle.dumps(dict(version=0))), [])
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.stats import PassengerStats, QuantileSketch
+from tests.helpers import generate_requests, make_building, run
+
+
+def exact_quantile(values, q):
+    # the value at the rank the sketch estimates, q * (count - 1)
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+@pytest.mark.parametrize('q', [0.0, 0.5, 0.95, 0.99, 1.0])
+def test_quantiles_are_within_the_relative_accuracy(q):
+    values = np.random.default_rng(0).lognormal(3, 1, size=5000).tolist()
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.quantile(q) == pytest.approx(exact_quantile(values, q), rel=0.01)
+    assert sketch.count == 5000
+    assert sketch.mean() == pytest.approx(np.mean(values))
+
+
+def test_zeros_and_empty_sketches():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None and sketch.mean() is None
+
+    sketch.add(0, count=3)
+    sketch.add(10)
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1.0) == 10
+
+
+def test_merged_sketch_matches_a_sketch_of_all_values():
+    values = np.random.default_rng(1).integers(1, 500, size=2000).tolist()
+    merged, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        merged.add(value)
+        (first if i % 2 else second).add(value)
+    first.merge(second)
+
+    assert first.buckets == merged.buckets
+    assert (first.count, first.sum, first.min, first.max) == (merged.count, merged.sum, merged.min, merged.max)
+
+
+def test_sketches_of_different_accuracy_dont_merge():
+    with pytest.raises(ValueError):
+        QuantileSketch(relative_accuracy=0.01).merge(QuantileSketch(relative_accuracy=0.02))
+
+
+def test_buckets_are_capped():
+    sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=16)
+    for value in range(1, 10000):
+        sketch.add(value)
+
+    assert len(sketch.buckets) <= 16
+    # the high quantiles keep their accuracy, the low ones are collapsed first
+    assert sketch.quantile(0.99) == pytest.approx(exact_quantile(range(1, 10000), 0.99), rel=0.01)
+
+
+def test_passenger_stats_of_a_run():
+    building = run(make_building(generate_requests('lunch', seed=3, no_of_floors=20), stats_window=100))
+    stats = building.passenger_stats
+    wait_times = building.passengers.wait_times().tolist()
+
+    assert stats.overall['WaitTime'].count == stats.overall['TotalTime'].count == len(building.passengers)
+    assert stats.overall['WaitTime'].max == max(wait_times)
+    assert stats.overall['WaitTime'].quantile(0.95) == pytest.approx(exact_quantile(wait_times, 0.95), rel=0.01)
+    assert sum(sketches['WaitTime'].count for sketches in stats.by_elevator.values()) == len(building.passengers)
+    assert sorted(stats.by_window) == sorted(set(start_time // 100 * 100 for start_time in building.passengers.column('StartTime').tolist()))
+
+
+def test_passenger_stats_merge():
+    total = PassengerStats(window_size=100)
+    runs = [run(make_building(generate_requests('up_peak', seed=seed, no_of_floors=20, no_of_passengers=50), stats_window=100)) for seed in [0, 1]]
+    for building in runs:
+        total.merge(building.passenger_stats)
+
+    assert total.overall['TotalTime'].count == 100
+    assert total.overall['TotalTime'].max == max(building.passenger_stats.overall['TotalTime'].max for building in runs)
+    with pytest.raises(ValueError):
+        total.merge(PassengerStats(window_size=200))
+
+
+def test_summary_has_a_row_per_scope_and_metric():
+    building = run(make_building(generate_requests('interfloor', seed=0, no_of_floors=20, no_of_passengers=50), no_of_elevators=2))
+    rows = building.passenger_stats.summary()
+    stats = building.passenger_stats
+
+    assert len(rows) == 2 * (1 + len(stats.by_elevator) + len(stats.by_window))
+    assert set(rows[0]) == {'Scope', 'Key', 'Metric', 'Count', 'Min', 'Max', 'Mean', 'P50', 'P95', 'P99'}
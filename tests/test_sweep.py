@@ -0,0 +1,34 @@
+import functools
+import os
+
+from src.traffic import lunch, up_peak
+from sweep import make_sweep_dir, monte_carlo, sweep
+
+
+def test_sweeps_started_in_the_same_second_get_their_own_directory(tmp_path):
+    sweep_dirs = [make_sweep_dir(str(tmp_path)) for _ in range(3)]
+
+    assert len(set(sweep_dirs)) == 3
+    assert all(os.path.isdir(sweep_dir) for sweep_dir in sweep_dirs)
+
+
+def test_every_run_writes_to_its_own_directory(tmp_path):
+    traffic = dict(up_peak=functools.partial(up_peak, no_of_passengers=40, duration=100),
+                   lunch=functools.partial(lunch, no_of_passengers=40, duration=100))
+    summary = sweep([1, 2], [10], [4], traffic, max_workers=2, output_dir=str(tmp_path))
+
+    assert len(summary) == 4
+    assert (summary['Status'] == 'completed').all()
+    assert (summary['Passengers'] == 40).all()
+
+    sweep_dir, = [os.path.join(tmp_path, name) for name in os.listdir(tmp_path)]
+    assert sorted(os.listdir(sweep_dir)) == ['passenger_stats.csv', 'run_0000', 'run_0001', 'run_0002', 'run_0003', 'summary.csv']
+
+
+def test_monte_carlo_has_a_row_per_combination_and_metric():
+    traffic = dict(lunch=functools.partial(lunch, no_of_passengers=30, duration=100))
+    summary = monte_carlo([1, 2], [10], [4], traffic, seeds=range(3))
+
+    assert list(zip(summary['Elevators'], summary['Metric'])) == [(1, 'WaitTime'), (1, 'TotalTime'), (2, 'WaitTime'), (2, 'TotalTime')]
+    assert (summary['Count'] == 90).all()
+    assert (summary['Replicas'] == 3).all()
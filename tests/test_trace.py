@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from common.enums import Engine
+from src.trace import TraceReader, TraceWriter
+from tests.helpers import generate_requests, make_building, run
+
+
+@pytest.mark.parametrize('engine', [Engine.TICK, Engine.EVENT])
+def test_trace_matches_the_recorded_states(tmp_path, engine):
+    requests = generate_requests('lunch', seed=1, no_of_floors=20)
+    recorded = run(make_building(requests, engine=engine)).elevator_states.states()
+    run(make_building(requests, engine=engine, trace_path=str(tmp_path / 'run.trace')))
+    trace = TraceReader(str(tmp_path / 'run.trace'))
+
+    assert trace.elevator_names == ['1', '2', '3']
+    assert trace.ticks().tolist() == recorded[:, 0].tolist()
+    assert trace.floors().tolist() == recorded[:, 1:].tolist()
+
+
+def write_trace(path, ticks: int = 10, buffer_ticks: int = 4096):
+    # elevator 'a' goes up a floor per tick, 'b' goes down
+    writer = TraceWriter(str(path), ['a', 'b'], buffer_ticks=buffer_ticks)
+    for tick in range(ticks):
+        writer.record(5 + tick, [1 + tick, 50 - tick])
+    writer.close()
+    return TraceReader(str(path))
+
+
+def test_slicing_by_tick_elevator_and_step(tmp_path):
+    trace = write_trace(tmp_path / 'run.trace')
+
+    assert (trace.first_tick, trace.last_tick, len(trace)) == (5, 14, 10)
+    assert trace.floors(7, 10, 'a').tolist() == [3, 4, 5]
+    assert trace.floors(7, 10, 1).tolist() == [48, 47, 46]
+    assert trace.floors(5, 11, ['b', 'a'], step=2).tolist() == [[50, 1], [48, 3], [46, 5]]
+    assert trace.ticks(5, 11, step=2).tolist() == [5, 7, 9]
+    assert isinstance(trace.floors(elevators='a'), np.memmap)
+
+
+def test_numpy_integers_select_a_single_elevator(tmp_path):
+    trace = write_trace(tmp_path / 'run.trace')
+
+    assert trace.floors(7, 10, np.int64(1)).tolist() == [48, 47, 46]
+    assert trace.floors(7, 10, np.argmax([0, 1])).ndim == 1
+    assert trace.floors(7, 8, [np.int32(1), 'a']).tolist() == [[48, 3]]
+
+
+def test_downsample_drops_the_last_partial_group(tmp_path):
+    trace = write_trace(tmp_path / 'run.trace')
+
+    assert trace.downsample(4, elevators='a').tolist() == [2.5, 6.5]
+    assert trace.downsample(4, elevators='b', how='min').tolist() == [47, 43]
+
+
+def test_spans_and_rows_larger_than_the_buffer(tmp_path):
+    writer = TraceWriter(str(tmp_path / 'run.trace'), ['a'], buffer_ticks=3)
+    writer.record(0, [1])
+    writer.record_span(0, [1], [1], ticks=5)
+    writer.record(6, [4])
+    writer.close()
+
+    assert TraceReader(str(tmp_path / 'run.trace')).floors(elevators='a').tolist() == [1, 2, 3, 4, 5, 6, 4]
+
+
+def test_trace_can_be_read_while_it_is_written(tmp_path):
+    writer = TraceWriter(str(tmp_path / 'run.trace'), ['a'], buffer_ticks=100)
+    for tick in range(3):
+        writer.record(tick, [tick + 1])
+    writer.flush()
+
+    assert TraceReader(str(tmp_path / 'run.trace')).floors(elevators='a').tolist() == [1, 2, 3]
+    writer.close()
+
+
+def test_empty_and_invalid_traces(tmp_path):
+    TraceWriter(str(tmp_path / 'empty.trace'), ['a']).close()
+    assert len(TraceReader(str(tmp_path / 'empty.trace'))) == 0
+
+    (tmp_path / 'other.trace').write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        TraceReader(str(tmp_path / 'other.trace'))
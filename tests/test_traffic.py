@@ -0,0 +1,40 @@
+import pytest
+
+from src.traffic import LOBBY_FLOOR, TRAFFIC_GENERATORS, generate_traffic, up_peak
+
+
+@pytest.mark.parametrize('pattern', sorted(TRAFFIC_GENERATORS))
+def test_traffic_is_seeded_and_sorted(pattern):
+    requests = list(TRAFFIC_GENERATORS[pattern](7, 20, no_of_passengers=300, duration=600))
+
+    assert requests == list(TRAFFIC_GENERATORS[pattern](7, 20, no_of_passengers=300, duration=600))
+    assert len(requests) == 300
+    assert [request['time'] for request in requests] == sorted(request['time'] for request in requests)
+    assert all(1 <= request['source'] <= 20 and 1 <= request['dest'] <= 20 and request['source'] != request['dest'] for request in requests)
+
+
+def test_up_peak_mostly_leaves_the_lobby():
+    requests = list(up_peak(0, 20, no_of_passengers=1000))
+
+    assert sum(request['source'] == LOBBY_FLOOR for request in requests) > 800
+
+
+@pytest.mark.parametrize('pattern', sorted(TRAFFIC_GENERATORS))
+def test_two_floors_are_enough(pattern):
+    requests = list(TRAFFIC_GENERATORS[pattern](0, 2, no_of_passengers=50))
+
+    assert all(sorted([request['source'], request['dest']]) == [1, 2] for request in requests)
+
+
+@pytest.mark.parametrize('pattern', sorted(TRAFFIC_GENERATORS))
+def test_a_single_floor_is_rejected(pattern):
+    # checked when the traffic is made, not when the first request is generated
+    with pytest.raises(ValueError):
+        TRAFFIC_GENERATORS[pattern](0, 1)
+
+
+def test_invalid_arguments_are_rejected():
+    with pytest.raises(ValueError):
+        generate_traffic('rush_hour', 0, 20)
+    with pytest.raises(ValueError):
+        generate_traffic('lunch', 0, 20, duration=0)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from common.enums import Direction
+from src.event_log import EventLog
+from src.passenger import Passenger
+from src.scheduler import Scheduler
+from src.vectorized_scheduler import VectorizedScheduler, direction_code, get_pick_up_times
+from tests.helpers import generate_requests, make_building, run
+
+
+class AlwaysVectorizedScheduler(VectorizedScheduler):
+    MIN_VECTORIZED_ELEVATORS = 0
+
+
+def event_log(requests, scheduler_cls, **building_kwargs):
+    log = EventLog()
+    run(make_building(requests, scheduler_cls=scheduler_cls, event_log=log, **building_kwargs))
+    return log.canonical()
+
+
+@pytest.mark.parametrize('pattern', ['up_peak', 'lunch', 'interfloor'])
+@pytest.mark.parametrize('no_of_elevators, max_passengers_per_elevator', [(2, 2), (5, 4), (12, 6)])
+def test_assignments_match_the_scheduler(pattern, no_of_elevators, max_passengers_per_elevator):
+    # small elevators make full elevators re-schedule their passengers, one call at a time
+    requests = generate_requests(pattern, seed=3, no_of_floors=20, no_of_passengers=300)
+    kwargs = dict(no_of_elevators=no_of_elevators, max_passengers_per_elevator=max_passengers_per_elevator)
+
+    assert event_log(requests, AlwaysVectorizedScheduler, **kwargs) == event_log(requests, Scheduler, **kwargs)
+
+
+def test_pick_up_times_match_the_scheduler_rules():
+    building = make_building(generate_requests('lunch', seed=5, no_of_floors=20), no_of_elevators=6, max_passengers_per_elevator=3)
+    scheduler = building.scheduler
+    elevators = building.dispatcher.elevators
+    for tick in range(400):
+        building.step()
+        if tick % 20:
+            continue
+
+        states = [np.array(values) for values in zip(*[(elevator.at_floor(), direction_code(elevator.direction), direction_code(elevator.passenger_direction),
+                                                        elevator.is_idle(), elevator.is_at_max_capacity(), elevator.total_number_of_floors)
+                                                       for elevator in elevators])]
+        for floor in range(1, 21):
+            for direction in Direction:
+                expected = [scheduler._get_elevator_pick_up_time(elevator, floor, direction) for elevator in elevators]
+                assert get_pick_up_times(*states, floor, direction.value).tolist() == expected
+
+
+def test_only_changed_elevators_are_reloaded():
+    building = make_building([], no_of_elevators=40, scheduler_cls=AlwaysVectorizedScheduler)
+    scheduler = building.scheduler
+    loaded = []
+    load = scheduler._VectorizedScheduler__load_elevator_state
+    scheduler._VectorizedScheduler__load_elevator_state = lambda i: loaded.append(i) or load(i)
+
+    scheduler.schedule_elevator([Passenger('a', 5, 9, 0)])
+    # every elevator is loaded on the first call, and the assigned one again after the assignment
+    assert len(loaded) == 41
+
+    loaded.clear()
+    scheduler.schedule_elevator([Passenger('b', 12, 3, 0)])
+    assert len(loaded) == 1
+
+    loaded.clear()
+    building.dispatcher.move_elevators()
+    scheduler.schedule_elevator([Passenger('c', 7, 2, 0)])
+    # the two moving elevators changed, and the assigned elevator is loaded after the assignment
+    assert len(loaded) == 3
+
+
+def test_falls_back_to_the_scheduler_with_few_elevators():
+    building = make_building([], no_of_elevators=VectorizedScheduler.MIN_VECTORIZED_ELEVATORS - 1, scheduler_cls=VectorizedScheduler)
+    building.scheduler.schedule_elevator([Passenger('a', 5, 9, 0)])
+
+    assert building.scheduler._VectorizedScheduler__versions is None
+    assert building.dispatcher.elevators[0].is_idle() is False